@@ -0,0 +1,100 @@
+# Steps many games at once with NumPy arrays. NumPy is only needed for this module
+from battleship.board import Board, MISS, HIT, SUNK, REPEAT, INVALID
+from battleship.placement import PlacementIndex
+import numpy as np
+import random
+
+
+class BatchBoards:
+    # The boards of n_games games, with the same rules and results as Board.fire_at.
+    # ship_id[game, cell] is the number of the ship on the cell (-1 for water),
+    # shot[game, cell] tells whether the cell has already been fired at.
+    # Cells are numbered row by row: cell = row * size + column.
+
+    def __init__(self, n_games, size=Board.SIZE, fleet=None):
+        if fleet is None:
+            fleet = Board.FLEET
+        self.n_games = n_games
+        self.size = size
+        self.fleet = dict(fleet)
+        n_ships = sum(self.fleet.values())
+        self.ship_id = np.full((n_games, size * size), -1, dtype=np.int16)
+        self.shot = np.zeros((n_games, size * size), dtype=bool)
+        self.ship_length = np.zeros((n_games, n_ships), dtype=np.int16)
+        # Cells of each ship that have not been hit yet
+        self.ship_left = np.zeros((n_games, n_ships), dtype=np.int16)
+        self.ships_afloat = np.zeros(n_games, dtype=np.int32)
+        self._games = np.arange(n_games)
+
+    @classmethod
+    def from_boards(cls, boards):
+        # Copies the ships (and previous shots) of scalar boards, which must share size and fleet
+        boards = list(boards)
+        batch = cls(len(boards), boards[0].SIZE, boards[0].FLEET)
+        for game, board in enumerate(boards):
+            for number, ship in enumerate(board.ships):
+                batch._set_ship(game, number, [row * batch.size + column for row, column in ship.position])
+                batch.ship_left[game, number] -= len(ship.hits)
+                if ship.is_sunk():
+                    batch.ships_afloat[game] -= 1
+            for row, column in board.hits | board.misses:
+                batch.shot[game, row * batch.size + column] = True
+        return batch
+
+    def _set_ship(self, game, number, cells):
+        self.ship_id[game, cells] = number
+        self.ship_length[game, number] = len(cells)
+        self.ship_left[game, number] = len(cells)
+        self.ships_afloat[game] += 1
+
+    def place_fleets(self, rng=random):
+        # Puts a random fleet (sampled with the placement index) on every board
+        index = PlacementIndex.shared(self.size, self.fleet)
+        for game in range(self.n_games):
+            for number, placement in enumerate(index.sample(rng)):
+                cells = [row * self.size + column for row, column in placement.positions]
+                self._set_ship(game, number, cells)
+        return self
+
+    def fire(self, rows, columns, games=None):
+        # Fires one shot in each selected game (all games by default).
+        # Returns the result codes (MISS, HIT, SUNK, REPEAT, INVALID) and the length of
+        # the sunk ship for SUNK results (0 otherwise), as arrays aligned with the shots
+        rows = np.asarray(rows)
+        columns = np.asarray(columns)
+        games = self._games if games is None else np.asarray(games)
+        size = self.size
+        invalid = (rows < 0) | (rows >= size) | (columns < 0) | (columns >= size)
+        cells = np.where(invalid, 0, rows * size + columns)
+        repeat = ~invalid & self.shot[games, cells]
+        fresh = ~invalid & ~repeat
+        self.shot[games[fresh], cells[fresh]] = True
+        ship = self.ship_id[games, cells]
+        hit = fresh & (ship >= 0)
+        ship = np.where(hit, ship, 0)
+        # A game gets one shot per call, so the (game, ship) pairs never repeat
+        self.ship_left[games[hit], ship[hit]] -= 1
+        sunk = hit & (self.ship_left[games, ship] == 0)
+        np.subtract.at(self.ships_afloat, games[sunk], 1)
+
+        codes = np.full(len(games), MISS, dtype=np.int8)
+        codes[hit] = HIT
+        codes[sunk] = SUNK
+        codes[repeat] = REPEAT
+        codes[invalid] = INVALID
+        sunk_length = np.where(sunk, self.ship_length[games, ship], 0)
+        return codes, sunk_length
+
+    def all_ships_sunk(self):
+        # Boolean array, True for the games whose fleet is entirely sunk
+        return self.ships_afloat == 0
+
+    def random_unshot_cells(self, generator=None):
+        # For every game, a random cell that has not been fired at yet, as (rows, columns).
+        # Games with no cell left get cell 0, which fire() reports as REPEAT
+        if generator is None:
+            generator = np.random.default_rng()
+        noise = generator.random(self.shot.shape)
+        noise[self.shot] = -1.0
+        cells = noise.argmax(axis=1)
+        return np.divmod(cells, self.size)
@@ -0,0 +1,212 @@
+from battleship.board import Board, grid_cells, MISS, HIT, SUNK, REPEAT, INVALID
+from battleship.ship import Ship
+from functools import lru_cache
+
+# Cells are numbered row by row: the cell (row, column) is bit number row * size + column
+
+
+def cell_index(coordinate, size):
+    # Converts a (row, column) tuple into the number of its bit
+    row, column = coordinate
+    return row * size + column
+
+
+def cell_coordinate(index, size):
+    # Converts the number of a bit back into a (row, column) tuple
+    return divmod(index, size)
+
+
+def mask_to_cells(mask, size):
+    # Returns the set of (row, column) tuples whose bit is set in the mask
+    table = grid_cells(size)
+    cells = set()
+    while mask:
+        low = mask & -mask
+        cells.add(table[low.bit_length() - 1])
+        mask ^= low
+    return cells
+
+
+def cells_to_mask(cells, size):
+    # Returns the mask with the bits of the given (row, column) tuples set
+    mask = 0
+    for row, column in cells:
+        mask |= 1 << (row * size + column)
+    return mask
+
+
+@lru_cache(maxsize=None)
+def _edge_masks(size):
+    # Masks used to shift cells sideways without wrapping around the row
+    full = (1 << (size * size)) - 1
+    first_column = 0
+    for row in range(size):
+        first_column |= 1 << (row * size)
+    last_column = first_column << (size - 1)
+    return full, full & ~first_column, full & ~last_column
+
+
+def neighbour_mask(mask, size):
+    # Returns the north/south/east/west neighbours of all cells in the mask (including the mask itself)
+    full, not_first_column, not_last_column = _edge_masks(size)
+    neighbours = (mask << size) | (mask >> size) | ((mask & not_last_column) << 1) | ((mask & not_first_column) >> 1)
+    return (mask | neighbours) & full
+
+
+@lru_cache(maxsize=None)
+def _line_masks(size, length):
+    # Masks of a horizontal and of a vertical ship starting at cell (0, 0)
+    horizontal = (1 << length) - 1
+    vertical = 0
+    for i in range(length):
+        vertical |= 1 << (i * size)
+    return horizontal, vertical
+
+
+@lru_cache(maxsize=4096)
+def ship_masks(size, length, start, orientation):
+    # The mask of the cells of a ship and the mask of its orthogonal halo (the cells that
+    # no other ship may occupy), or None if the ship does not fit in the grid.
+    # The cache holds every placement of a 10x10 board, larger boards compute them on the fly
+    row, column = start
+    if not (0 <= row < size and 0 <= column < size):
+        return None
+    horizontal, vertical = _line_masks(size, length)
+    if orientation == "H" and column + length <= size:
+        mask = horizontal << (row * size + column)
+    elif orientation == "V" and row + length <= size:
+        mask = vertical << (row * size + column)
+    else:
+        return None
+    return mask, neighbour_mask(mask, size) & ~mask
+
+
+def placement_masks(size, length):
+    # For every legal (start, orientation) of a ship of the given length, its cell and halo masks
+    masks = {}
+    for orientation in ("H", "V"):
+        for row in range(size):
+            for column in range(size):
+                ship = ship_masks(size, length, (row, column), orientation)
+                if ship is not None:
+                    masks[(row, column), orientation] = ship
+    return masks
+
+
+class BitBoard(Board):
+    # Same rules and API as Board, but occupancy, hits and misses are kept as integer bitmasks
+
+    def __init__(self, size=None, fleet=None):
+        self.forbidden_mask = 0
+        super().__init__(size, fleet)
+        self.occupied_mask = 0
+        self.hit_mask = 0
+        self.miss_mask = 0
+        # For each cell, the ship on it (or None) and the mask of that ship
+        self._cell_ship = [None] * (self.SIZE * self.SIZE)
+        self._cell_ship_mask = [0] * (self.SIZE * self.SIZE)
+
+    # hits and misses stay available as sets of tuples, built from the masks when requested
+    @property
+    def hits(self):
+        return mask_to_cells(self.hit_mask, self.SIZE)
+
+    @hits.setter
+    def hits(self, cells):
+        self.hit_mask = cells_to_mask(cells, self.SIZE)
+
+    @property
+    def misses(self):
+        return mask_to_cells(self.miss_mask, self.SIZE)
+
+    @misses.setter
+    def misses(self, cells):
+        self.miss_mask = cells_to_mask(cells, self.SIZE)
+
+    # The forbidden cells of Board, kept as a mask
+    @property
+    def forbidden(self):
+        return mask_to_cells(self.forbidden_mask, self.SIZE)
+
+    @forbidden.setter
+    def forbidden(self, cells):
+        self.forbidden_mask = cells_to_mask(cells, self.SIZE)
+
+    def place_ship(self, ship_type, start, orientation):
+        # Same checks as Board.place_ship, done with one lookup and one bitwise AND
+        if not issubclass(ship_type, Ship) or ship_type is Ship:
+            raise TypeError('ship_type must be a subclass of Ship')
+        orientation = orientation.upper()
+        # Out-of-grid starts and ends, and invalid orientations, have no masks
+        masks = ship_masks(self.SIZE, ship_type.LENGTH, tuple(start), orientation)
+        if masks is None:
+            return False
+        mask = masks[0]
+        # Overlap and spacing rule: the forbidden cells are the ships and their halos
+        if mask & self.forbidden_mask:
+            return False
+
+        self._add_ship(ship_type, mask_to_cells(mask, self.SIZE))
+        return True
+
+    def _forbid(self, positions):
+        # Done on the mask in _add_ship
+        pass
+
+    def _add_ship(self, ship_type, positions):
+        ship = super()._add_ship(ship_type, positions)
+        mask = cells_to_mask(positions, self.SIZE)
+        self.occupied_mask |= mask
+        self.forbidden_mask |= neighbour_mask(mask, self.SIZE)
+        for coordinate in positions:
+            index = cell_index(coordinate, self.SIZE)
+            self._cell_ship[index] = ship
+            self._cell_ship_mask[index] = mask
+        return ship
+
+    def fire_at(self, coordinates):
+        if not isinstance(coordinates, tuple) or len(coordinates) != 2:
+            raise TypeError('coordinates must be a 2-tuple')
+        row, column = coordinates
+        size = self.SIZE
+        if not (0 <= row < size and 0 <= column < size):
+            return ("Invalid", None)
+        index = row * size + column
+        bit = 1 << index
+        if (self.hit_mask | self.miss_mask) & bit:
+            return ("Repeat", None)
+        ship = self._cell_ship[index]
+        if ship is None:
+            self.miss_mask |= bit
+            return ("Miss", None)
+        self.hit_mask |= bit
+        # Keep the Ship object in sync for code that inspects it
+        ship.register_hit(coordinates)
+        ship_mask = self._cell_ship_mask[index]
+        if self.hit_mask & ship_mask == ship_mask:
+            self._register_sunk(ship)
+            return ("Sunk", ship)
+        return ("Hit", None)
+
+    def fire_at_cell(self, cell):
+        size = self.SIZE
+        if not 0 <= cell < size * size:
+            return INVALID, 0
+        bit = 1 << cell
+        if (self.hit_mask | self.miss_mask) & bit:
+            return REPEAT, 0
+        ship = self._cell_ship[cell]
+        if ship is None:
+            self.miss_mask |= bit
+            return MISS, 0
+        self.hit_mask |= bit
+        ship.register_hit(grid_cells(size)[cell])
+        ship_mask = self._cell_ship_mask[cell]
+        if self.hit_mask & ship_mask == ship_mask:
+            self._register_sunk(ship)
+            return SUNK, ship.length
+        return HIT, 0
+
+    def all_ships_sunk(self):
+        # Hits can only land on occupied cells, so the fleet is sunk when both masks coincide
+        return self.hit_mask == self.occupied_mask
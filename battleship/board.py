@@ -1,18 +1,51 @@
 from battleship.ship import Ship, Battleship, Cruiser, Destroyer, Submarine
+from functools import lru_cache
 import random
 
+# Integer codes of the results of a shot, for code that does not want to compare strings
+MISS, HIT, SUNK, REPEAT, INVALID = range(5)
+RESULT_NAMES = ("Miss", "Hit", "Sunk", "Repeat", "Invalid")
+RESULT_CODES = {name: code for code, name in enumerate(RESULT_NAMES)}
+
+
+@lru_cache(maxsize=None)
+def grid_cells(size):
+    # All (row, column) tuples of a board, in row order (cell number row * size + column).
+    # They are created once per size and shared, instead of every set building its own tuples
+    return tuple((row, column) for row in range(size) for column in range(size))
+
+
 class Board:
-    # This game considers a 10x10 board
+    # By default the game considers a 10x10 board
     SIZE = 10
     # This is needed for the random placement of the fleet
     MAX_TRIES = 1000
-    # The composition of the fleet
+    # The default composition of the fleet
     FLEET = {Battleship:1, Cruiser:2, Destroyer:3, Submarine:4}
-    def __init__(self):
+    # Called as listener(ship_type, attempts, fallback) after each ship of a random placement,
+    # when set (see battleship.instrument)
+    placement_listener = None
+    def __init__(self, size=None, fleet=None):
+        # Size and fleet can be chosen per board, otherwise the class defaults are used
+        if size is not None:
+            if not isinstance(size, int) or size < 1:
+                raise ValueError('size must be a positive integer')
+            self.SIZE = size
+        if fleet is not None:
+            for ship_type in fleet:
+                if not issubclass(ship_type, Ship) or ship_type is Ship:
+                    raise TypeError('fleet keys must be subclasses of Ship')
+            self.FLEET = dict(fleet)
         self.ships = []
         self.occupied = {}
+        # Cells where no new ship can go: the cells of the ships and their orthogonal neighbours,
+        # updated on each placement so that checking a placement is one lookup per cell
+        self.forbidden = set()
         self.hits = set()
         self.misses = set()
+        # Running fleet status, updated when ships are added and sunk
+        self.ships_afloat = 0
+        self.afloat = {ship_type: 0 for ship_type in self.FLEET}
 
 
     def in_grid(self, coordinate):
@@ -21,24 +54,6 @@ class Board:
         column = coordinate[1]
         return 0 <= row < self.SIZE and 0 <= column < self.SIZE
 
-    def _orthogonal_neighbors(self, coordinate):
-        # For each hit coordinate of a ship, compute the north/south/east/west neighbours
-        row, column = coordinate
-        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
-            if self.in_grid((row + dr, column + dc)):
-                yield (row + dr, column + dc)
-
-    def _has_orthogonal_conflict(self, position):
-        # There must be at least one-cell distance between ships in the orthogonal direction
-        # This method checks if there is a conflict
-        pos_set = set(position)
-        for pos in position:
-            for neighbor in self._orthogonal_neighbors(pos):
-                if neighbor not in pos_set and neighbor in self.occupied:
-                    return True # conflict
-        return False
-
-
     def place_ship(self, ship_type, start, orientation):
         # Given a ship type, its initial coordinate and orientation, we place the ship on the board
         # Check if the ship_type is allowed
@@ -53,49 +68,65 @@ class Board:
         if orientation not in {"H", "V"}:
             return False
 
-        # Check whether the end of the ship is in the grid
+        # Given a start point compute coordinates of the ship, checking whether its end is in the grid.
+        # They are a slice of the shared cell tuples: a row, or every size-th cell for a column
+        size = self.SIZE
+        length = ship_type.LENGTH
+        first = start_row * size + start_column
         if orientation == "H":
-            if not self.in_grid((start_row, start_column + ship_type.LENGTH - 1)):
+            if start_column + length > size:
                 return False
+            new_positions = grid_cells(size)[first:first + length]
         else:
-            if not self.in_grid((start_row + ship_type.LENGTH - 1, start_column)):
+            if start_row + length > size:
                 return False
+            new_positions = grid_cells(size)[first:first + length * size:size]
 
-        # Given a start point compute coordinates of the ship
-        new_positions = []
-        for i in range(ship_type.LENGTH):
-            if orientation == "H":
-                # Horizontal orientation
-                row = start_row
-                column = start_column + i
-                # Check for overlaps with other ships
-                if (row, column) in self.occupied:
-                    return False
-                new_positions.append((row, column))
-            else:
-                # Vertical orientation
-                row = start_row + i
-                column = start_column
-                if (row, column) in self.occupied:
-                    return False
-                new_positions.append((row, column))
-
-        if self._has_orthogonal_conflict(new_positions):
-            return False
+        # Overlaps with other ships and the spacing rule, in one check
+        forbidden = self.forbidden
+        for coordinate in new_positions:
+            if coordinate in forbidden:
+                return False
+
+        self._add_ship(ship_type, new_positions)
+        return True
 
+    def _add_ship(self, ship_type, positions):
+        # Puts a ship on already validated positions
         # Create the ship
-        ship = ship_type(set(new_positions))
+        ship = ship_type(set(positions))
         # Add ship to the list of ships for the Board
         self.ships.append(ship)
         # Add the coordinates to the dictionary with occupancies
-        for coordinate in new_positions:
+        for coordinate in positions:
             self.occupied[coordinate] = ship
-        return True
+        self._forbid(positions)
+        self.ships_afloat += 1
+        self.afloat[ship_type] = self.afloat.get(ship_type, 0) + 1
+        return ship
+
+    def _forbid(self, positions):
+        # Adds the cells of a new ship and their orthogonal neighbours to the forbidden cells
+        size = self.SIZE
+        cells = grid_cells(size)
+        forbidden = self.forbidden
+        for row, column in positions:
+            number = row * size + column
+            forbidden.add(cells[number])
+            if row > 0:
+                forbidden.add(cells[number - size])
+            if row < size - 1:
+                forbidden.add(cells[number + size])
+            if column > 0:
+                forbidden.add(cells[number - 1])
+            if column < size - 1:
+                forbidden.add(cells[number + 1])
 
     def _place_ship_randomly(self):
         # Place the entire fleet on the board randomly
         # Our fleet - how many ships we need according to type
-        fleet = Board.FLEET
+        fleet = self.FLEET
+        listener = self.placement_listener
 
         for ship_type, count in fleet.items():
             for _ in range(count):
@@ -118,7 +149,8 @@ class Board:
                         # If the ship is placed exit
                         break
 
-                if not placed:
+                fallback = not placed
+                if fallback:
                     # Proceed with deterministic approach
                     # Take the first place possible
                     for direction in ["H", "V"]:
@@ -145,6 +177,10 @@ class Board:
                     if not placed:
                         raise RuntimeError('Failed to place ship')
 
+                if listener is not None:
+                    # Random attempts made, and whether the deterministic fallback placed the ship
+                    listener(ship_type, self.MAX_TRIES if fallback else attempt + 1, fallback)
+
 
     def place_fleet(self):
         # Public interface to place all ships automatically
@@ -171,6 +207,7 @@ class Board:
             ship.register_hit(coordinates)
             # Check whether the ship is sunk
             if ship.is_sunk():
+                self._register_sunk(ship)
                 return ("Sunk", ship)
             else:
                 return ("Hit", None)
@@ -179,7 +216,35 @@ class Board:
             self.misses.add(coordinates)
             return ("Miss", None)
 
+    def fire_at_cell(self, cell):
+        # Same as fire_at, for bulk play: takes a cell number (row * size + column) and
+        # returns a result code (MISS, HIT, SUNK, REPEAT, INVALID) and the length of the sunk ship (0 otherwise)
+        if not 0 <= cell < self.SIZE * self.SIZE:
+            return INVALID, 0
+        coordinates = grid_cells(self.SIZE)[cell]
+        if coordinates in self.hits or coordinates in self.misses:
+            return REPEAT, 0
+        ship = self.occupied.get(coordinates)
+        if ship is None:
+            self.misses.add(coordinates)
+            return MISS, 0
+        self.hits.add(coordinates)
+        ship.register_hit(coordinates)
+        if ship.is_sunk():
+            self._register_sunk(ship)
+            return SUNK, ship.length
+        return HIT, 0
+
+    def _register_sunk(self, ship):
+        # Update the running fleet status
+        self.ships_afloat -= 1
+        self.afloat[type(ship)] -= 1
+
+    def fleet_status(self):
+        # Number of ships still afloat for each ship type
+        return dict(self.afloat)
+
     def all_ships_sunk(self):
         # returns True if all ships are sunk, False otherwise
-        return all(ship.is_sunk() for ship in self.ships)
+        return self.ships_afloat == 0
 
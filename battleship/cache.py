@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from functools import lru_cache
+import random
+
+# Transposition cache for the decisions of the computer players. Games often reach the same
+# knowledge state (the same misses, hits and sunk ships), and a player with a cache answers
+# such a state with the shot it chose the first time, instead of computing it again.
+#
+# States are identified by a Zobrist hash: every cell has a random 64-bit key for each of its
+# known states (miss, hit, sunk), and the hash of a state is the XOR of the keys of its cells.
+# A shot changes the hash with one XOR (a sinking with one XOR per cell of the ship).
+
+MISS_STATE, HIT_STATE, SUNK_STATE = range(3)
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size):
+    # keys[state][cell], the same in every process for a given board size
+    rng = random.Random(f"zobrist:{size}")
+    return tuple(tuple(rng.getrandbits(64) for _ in range(size * size)) for _ in range(3))
+
+
+class TranspositionCache:
+    # Least recently used mapping from (scope, state hash) to a cell number.
+    # A cache can be shared by any number of players and games in the same process.
+
+    # Approximate memory of an entry (key tuple, int value and the OrderedDict node), in bytes
+    ENTRY_BYTES = 200
+    _shared = None
+
+    def __init__(self, max_entries=100000, max_bytes=None):
+        # The memory cap can be given as a number of entries or (approximately) in bytes
+        if max_bytes is not None:
+            max_entries = max(1, max_bytes // self.ENTRY_BYTES)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def shared(cls):
+        # The process-wide cache, created the first time it is needed
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def get(self, key):
+        cell = self._entries.get(key)
+        if cell is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return cell
+
+    def put(self, key, cell):
+        entries = self._entries
+        entries[key] = cell
+        entries.move_to_end(key)
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hit_rate}
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,58 @@
+from battleship.board import grid_cells
+from functools import lru_cache
+
+# Labels of the cells, like "B7": the row as letters and the column as a number from 1.
+# Rows after Z go on as in spreadsheets (Z, AA, AB, ..., AZ, BA, ...), so any board size works.
+# The labels of a board size are computed once, and translating a label to a coordinate
+# (or back) is a single dictionary lookup.
+
+
+def row_label(row):
+    # 0 -> "A", 25 -> "Z", 26 -> "AA", 27 -> "AB", ...
+    label = ""
+    row += 1
+    while row:
+        row, letter = divmod(row - 1, 26)
+        label = chr(ord("A") + letter) + label
+    return label
+
+
+class CoordinateTable:
+
+    def __init__(self, size):
+        self.size = size
+        # Row labels, and the width of the longest one (for drawing boards)
+        self.rows = tuple(row_label(row) for row in range(size))
+        self.row_width = len(self.rows[-1]) if size else 1
+        cells = grid_cells(size)
+        # Label of every cell, by cell number (row * size + column)
+        self.labels = tuple(f"{self.rows[row]}{column + 1}" for row, column in cells)
+        # Label -> the shared (row, column) tuple of grid_cells, and back
+        self.coordinates = dict(zip(self.labels, cells))
+        self.labels_by_coordinate = dict(zip(cells, self.labels))
+
+    def parse(self, text):
+        # (row, column) of a label, or None. Spaces around it and lower case letters are accepted
+        coordinate = self.coordinates.get(text)
+        if coordinate is None and isinstance(text, str):
+            coordinate = self.coordinates.get(text.strip().upper())
+        return coordinate
+
+    def label(self, coordinate):
+        # Label of a (row, column) tuple, or None if it is not on the board
+        return self.labels_by_coordinate.get(coordinate)
+
+    def cell(self, text):
+        # Cell number of a label, or None
+        coordinate = self.parse(text)
+        return None if coordinate is None else coordinate[0] * self.size + coordinate[1]
+
+    def cell_label(self, cell):
+        # Label of a cell number, or None if it is not on the board
+        return self.labels[cell] if 0 <= cell < len(self.labels) else None
+
+
+@lru_cache(maxsize=None)
+def coordinate_table(size):
+    # The shared table of a board size
+    return CoordinateTable(size)
@@ -0,0 +1,198 @@
+from battleship.bitboard import neighbour_mask, cell_index
+from battleship.board import grid_cells, MISS, HIT, SUNK
+from battleship.player import ComputerPlayer
+from functools import lru_cache
+import operator
+
+
+@lru_cache(maxsize=None)
+def placement_table(size, length):
+    # All distinct placements of a ship of the given length, as tuples of cell numbers,
+    # and for each cell the numbers of the placements covering it
+    placements = []
+    for orientation, step in (("H", 1), ("V", size)):
+        # A one-cell ship is the same horizontally and vertically
+        if length == 1 and orientation == "V":
+            break
+        for row in range(size - (length - 1 if orientation == "V" else 0)):
+            for column in range(size - (length - 1 if orientation == "H" else 0)):
+                start = row * size + column
+                placements.append(tuple(range(start, start + length * step, step)))
+    covering = [[] for _ in range(size * size)]
+    for number, cells in enumerate(placements):
+        for cell in cells:
+            covering[cell].append(number)
+    return tuple(placements), tuple(tuple(numbers) for numbers in covering)
+
+
+class DensityPlayer(ComputerPlayer):
+    # Fires at the cell covered by the largest number of ship placements that are still possible.
+    # A placement is possible if it covers no miss and does not touch (or overlap) a sunk ship.
+    # The density map is updated incrementally: each shot only removes the placements it rules out.
+
+    def __init__(self, board=None, size=None, fleet=None, compact=False, rng=None, cache=None):
+        super().__init__(board, size, fleet, compact, rng, cache=cache)
+        size = self.board.SIZE
+        self._size = size
+        self._tables = {length: placement_table(size, length) for length in self.counter}
+        # alive[length][number] tells whether that placement is still possible
+        self._alive = {length: bytearray(b"\x01") * len(self._tables[length][0]) for length in self.counter}
+        # coverage[length][cell]: possible placements of that length covering the cell
+        self._coverage = {}
+        for length, (placements, covering) in self._tables.items():
+            self._coverage[length] = [len(numbers) for numbers in covering]
+        # density[cell]: sum over the ship lengths of (ships left) * coverage
+        self._density = [0] * (size * size)
+        for length, count in self.counter.items():
+            coverage = self._coverage[length]
+            for cell in range(size * size):
+                self._density[cell] += count * coverage[cell]
+        # Hits that do not belong to a sunk ship yet, as cell numbers
+        self._open_hits = set()
+
+    def choose_cell(self):
+        # The density is kept per cell number, so this is the natural entry point
+        if self.cache is not None:
+            return super().choose_cell()
+        return self._density_cell()
+
+    def _decide_shot(self):
+        return grid_cells(self._size)[self._density_cell()]
+
+    def _density_cell(self):
+        if self._open_hits:
+            cell = self._target_density_cell()
+        else:
+            cell = self._hunt_density_cell()
+        coordinate = grid_cells(self._size)[cell]
+        self.untried.discard(coordinate)
+        self.parity_pos.discard(coordinate)
+        return cell
+
+    def density_map(self):
+        # Copy of the current hunt density, as a list of rows
+        size = self._size
+        return [self._density[row * size:(row + 1) * size] for row in range(size)]
+
+    def _hunt_density_cell(self):
+        density = self._density
+        best = max(density)
+        if best <= 0:
+            # No placement is left (this only happens with inconsistent results): shoot anywhere
+            return cell_index(self._hunt_cell(), self._size)
+        # A random cell among the tied best ones, all equally likely (the same draw as
+        # rng.choice of the tied cells). The list is counted and searched in C
+        number = self.rng.randrange(density.count(best))
+        cell = density.index(best)
+        for _ in range(number):
+            cell = density.index(best, cell + 1)
+        return cell
+
+    def _target_density_cell(self):
+        # Only placements through the open hits matter. They may not touch another open hit,
+        # since that one would belong to a different ship
+        open_hits = self._open_hits
+        scores = {}
+        for length, count in self.counter.items():
+            if count <= 0:
+                continue
+            placements, covering = self._tables[length]
+            alive = self._alive[length]
+            seen = set()
+            for hit in open_hits:
+                for number in covering[hit]:
+                    if number in seen or not alive[number]:
+                        continue
+                    seen.add(number)
+                    cells = placements[number]
+                    if self._touches_other_hits(cells):
+                        continue
+                    covered = sum(1 for cell in cells if cell in open_hits)
+                    weight = count * covered
+                    for cell in cells:
+                        if cell not in open_hits:
+                            scores[cell] = scores.get(cell, 0) + weight
+        if not scores:
+            return self._hunt_density_cell()
+        best = max(scores.values())
+        return self.rng.choice(sorted(cell for cell, score in scores.items() if score == best))
+
+    def _touches_other_hits(self, cells):
+        size = self._size
+        cell_set = set(cells)
+        for cell in cells:
+            row, column = divmod(cell, size)
+            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                r, c = row + dr, column + dc
+                if 0 <= r < size and 0 <= c < size:
+                    neighbour = r * size + c
+                    if neighbour not in cell_set and neighbour in self._open_hits:
+                        return True
+        return False
+
+    def _register(self, coordinates, code, sunk_len=None):
+        before = dict(self.counter)
+        super()._register(coordinates, code, sunk_len)
+        if code not in (HIT, SUNK, MISS):
+            return
+        # A sunk ship lowers the number of ships of its length. This is applied first,
+        # so that the placements removed below are subtracted with the new count
+        for length, count in self.counter.items():
+            if count != before[length]:
+                self._change_count(length, count - before[length])
+        cell = cell_index(coordinates, self._size)
+        if code == MISS:
+            self._remove_cell(cell)
+        elif code == HIT:
+            self._open_hits.add(cell)
+        else:
+            self._open_hits.add(cell)
+            self._sink(cell)
+
+    def _remove_cell(self, cell):
+        # Rules out every placement covering the cell
+        for length, (placements, covering) in self._tables.items():
+            alive = self._alive[length]
+            coverage = self._coverage[length]
+            count = self.counter[length]
+            density = self._density
+            for number in covering[cell]:
+                if alive[number]:
+                    alive[number] = 0
+                    for covered in placements[number]:
+                        coverage[covered] -= 1
+                        density[covered] -= count
+
+    def _sink(self, cell):
+        # The sunk ship is the group of open hits connected to the last shot:
+        # ships never touch orthogonally, so the group cannot contain other ships
+        size = self._size
+        ship = {cell}
+        stack = [cell]
+        while stack:
+            row, column = divmod(stack.pop(), size)
+            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                r, c = row + dr, column + dc
+                neighbour = r * size + c
+                if 0 <= r < size and 0 <= c < size and neighbour in self._open_hits and neighbour not in ship:
+                    ship.add(neighbour)
+                    stack.append(neighbour)
+        self._open_hits -= ship
+        mask = 0
+        for number in ship:
+            mask |= 1 << number
+        # No other ship can be on the sunk ship or next to it
+        blocked = neighbour_mask(mask, size)
+        while blocked:
+            low = blocked & -blocked
+            self._remove_cell(low.bit_length() - 1)
+            blocked ^= low
+
+    def _change_count(self, length, delta):
+        # Whole-list update, done with map so that large boards stay cheap
+        coverage = self._coverage[length]
+        if delta != -1:
+            coverage = [delta * value for value in coverage]
+            self._density = list(map(operator.add, self._density, coverage))
+        else:
+            self._density = list(map(operator.sub, self._density, coverage))
@@ -0,0 +1,96 @@
+from typing import NamedTuple
+
+# Events of a game, sent by Game to its sinks. The game itself never prints: what is shown,
+# logged or streamed is decided by the sinks.
+# A sink is any object with an emit(event) method. Players are numbered as shooters:
+# 0 is the human, who starts, and 1 the computer.
+
+
+class SetupStarted(NamedTuple):
+    # The players are about to place their fleets
+    pass
+
+
+class GameStarted(NamedTuple):
+    # Fleets are placed. boards: the boards of player 0 and player 1
+    boards: tuple
+
+
+class TurnStarted(NamedTuple):
+    # A new turn of the human, after the first one
+    player: int
+    round_number: int
+
+
+class ShotFired(NamedTuple):
+    player: int
+    name: str
+    coordinates: tuple
+
+
+class ShotResult(NamedTuple):
+    player: int
+    name: str
+    coordinates: tuple
+    result: str         # as returned by Board.fire_at: "Miss", "Hit", "Sunk", ...
+    sunk_length: int    # None unless the shot sank a ship
+
+
+class ShipSunk(NamedTuple):
+    player: int
+    name: str
+    coordinates: tuple
+    length: int
+
+
+class GameOver(NamedTuple):
+    winner: int
+    name: str
+    round_number: int
+
+
+class NullSink:
+    # Ignores everything. A game with only null sinks does not even create its events
+    def emit(self, event):
+        pass
+
+
+class RecorderSink:
+    # Adapts a recorder (start_game and record, e.g. a battleship.replay.ReplayWriter or
+    # a battleship.spectator.FeedRecorder) to the events
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def emit(self, event):
+        if type(event) is ShotResult:
+            self.recorder.record(event.player, event.coordinates, event.result, event.sunk_length)
+        elif type(event) is GameStarted:
+            self.recorder.start_game(event.boards)
+
+
+class TerminalSink:
+    # The terminal game: messages and boards printed with write (print by default).
+    # The boards are drawn by the game (Game.show_boards)
+    def __init__(self, game, write=print):
+        self.game = game
+        self.write = write
+
+    def emit(self, event):
+        kind = type(event)
+        if kind is ShotResult:
+            coordinate = self.game.human.convert_coordinate_back(event.coordinates)
+            self.write(f"{event.name} shoots at {coordinate} -> " + event.result.upper() + "!")
+        elif kind is TurnStarted:
+            self.game.show_boards()
+            # Only a human player is shown the enemy's fleet, as counted by the enemy's board
+            if hasattr(self.game.human, "show_enemy_fleet_status"):
+                self.game.human.show_enemy_fleet_status(self.game.computer.board.fleet_status())
+        elif kind is SetupStarted:
+            self.write("Welcome to Battleship!")
+            self.write("This is a small game implemented by V. Brugaletta")
+            self.write("Are you ready to defeat the fleet of your enemy? Then let's start!")
+        elif kind is GameStarted:
+            self.game.show_boards()
+        elif kind is GameOver:
+            self.write(f"And the winner is... {event.name}!")
+            self.write("Thanks for playing!")
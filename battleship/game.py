@@ -1,29 +1,49 @@
-from battleship.player import HumanPlayer, ComputerPlayer
+from battleship import strategies
+from battleship.coordinates import coordinate_table
+from battleship.events import (SetupStarted, GameStarted, TurnStarted, ShotFired, ShotResult, ShipSunk, GameOver,
+                               NullSink, RecorderSink, TerminalSink)
 class Game:
 
-    def __init__(self):
-        self.human = HumanPlayer()
-        self.computer = ComputerPlayer()
+    def __init__(self, size=None, fleet=None, recorder=None, human="human", computer="computer", renderer=None,
+                 sink=None):
+        # Both players use the same board size and fleet (the Board defaults if not given)
+        # Their strategies are chosen by name, see battleship.strategies
+        self.human = strategies.create(human, size=size, fleet=fleet)
+        self.computer = strategies.create(computer, size=size, fleet=fleet)
         self.current_player = None
         self.opponent = None
         self.round_number = 1
+        # Optional shot log, e.g. a battleship.replay.ReplayWriter
+        self.recorder = recorder
+        # Where the events of the game go (see battleship.events): the terminal by default.
+        # Null sinks are left out, so that a game without any other sink creates no events
+        if sink is None:
+            sink = TerminalSink(self)
+        self.sinks = [] if isinstance(sink, NullSink) else [sink]
+        if recorder is not None:
+            self.sinks.append(RecorderSink(recorder))
+        # Optional battleship.render.TerminalRenderer, which redraws only the cells that changed
+        self.renderer = renderer
+        if renderer is not None:
+            renderer.add_board(self.human.board, True, self.human.board.hits, self.human.board.misses, "YOUR BOARD")
+            renderer.add_board(self.computer.board, False, self.human.opponent_view["hits"],
+                               self.human.opponent_view["misses"], "COMPUTER")
 
     def setup(self):
-        self._initial_message()
+        if self.sinks:
+            self._emit(SetupStarted())
         # Both players place their fleets
         self.human.place_fleet()
         self.computer.place_fleet()
-        # Show boards
-        self.show_boards()
         # Human start first
         self.current_player = self.human
         self.opponent = self.computer
+        if self.sinks:
+            self._emit(GameStarted((self.human.board, self.computer.board)))
 
-    def _initial_message(self):
-        print("Welcome to Battleship!")
-        print("This is a small game implemented by V. Brugaletta")
-        print("Are you ready to defeat the fleet of your enemy? Then let's start!")
-
+    def _emit(self, event):
+        for sink in self.sinks:
+            sink.emit(event)
 
     def switch_turn(self):
         # Swap roles of current player and its opponent
@@ -34,23 +54,38 @@ class Game:
         self.round_number += 1
 
     def play_turn(self):
+        player = self.current_player
+        # The human always starts, so it is shooter 0
+        number = 0 if player is self.human else 1
         # Current player choose coordinate to shot at
-        coordinates = self.current_player.choose_shot()
+        coordinates = player.choose_shot()
+        if self.sinks:
+            self._emit(ShotFired(number, player.name, coordinates))
         # The board of the opponent is shot at the chosen coordinate
         result, ship = self.opponent.board.fire_at(coordinates)
-        # Show result
-        coord_string = self.current_player.convert_coordinate_back(coordinates)
-        print(f"{self.current_player.name} shoots at {coord_string} -> " + result.upper() + "!")
         # Register the result for the current player
-        self.current_player.register_result(coordinates, result, ship.length if (result.upper() == "SUNK" and ship is not None) else None)
+        sunk_len = ship.length if (result.upper() == "SUNK" and ship is not None) else None
+        player.register_result(coordinates, result, sunk_len)
+        if self.sinks:
+            self._emit(ShotResult(number, player.name, coordinates, result, sunk_len))
+            if sunk_len is not None:
+                self._emit(ShipSunk(number, player.name, coordinates, sunk_len))
         # Check if the entire fleet of the opponent is sunk
         return self.opponent.board.all_ships_sunk()
 
     def _final_message(self):
-        print(f"And the winner is... {self.current_player.name}!")
-        print("Thanks for playing!")
+        # The boards drawn by the renderer stay on the screen, below them the terminal scrolls again
+        if self.renderer is not None:
+            self.renderer.close()
+        # The end of the game, announced to the sinks
+        if self.sinks:
+            winner = 0 if self.current_player is self.human else 1
+            self._emit(GameOver(winner, self.current_player.name, self.round_number))
 
     def show_boards(self):
+        if self.renderer is not None:
+            self.renderer.render()
+            return
         # Show the two boards side by side
         left = self._render_human_board().splitlines()
         right = self._render_computer_board().splitlines()
@@ -75,15 +110,20 @@ class Game:
 
     def draw_boards(self, board, show_ships, hits, misses):
         size = board.SIZE
+        # Columns are wide enough for the largest column number
+        width = max(2, len(str(size)))
+        # Row labels are letters (two or more of them after Z on large boards)
+        labels = coordinate_table(size)
+        label_width = labels.row_width
         lines = []
 
         # Header
-        header_nums = " ".join(f"{i:>2}" for i in range(1, size + 1))
-        lines.append("  " + header_nums)
+        header_nums = " ".join(f"{i:>{width}}" for i in range(1, size + 1))
+        lines.append(" " * (label_width + 1) + header_nums)
 
         #Print rows
         for r in range(size):
-            row_header = chr(ord("A") + r)
+            row_header = f"{labels.rows[r]:<{label_width}}"
             cells = []
             for c in range(size):
                 coordinate = (r, c)
@@ -96,7 +136,7 @@ class Game:
                     cells.append("S")
                 else:
                     cells.append("~")
-            lines.append(f"{row_header} " + " ".join(f"{ch:>2}" for ch in cells))
+            lines.append(f"{row_header} " + " ".join(f"{ch:>{width}}" for ch in cells))
         return "\n".join(lines)
 
 
@@ -105,9 +145,8 @@ class Game:
         finish = self.play_turn()
         while not finish:
             self.switch_turn()
-            if self.current_player is self.human:
-                self.show_boards()
-                self.human.show_enemy_fleet_status()
+            if self.current_player is self.human and self.sinks:
+                self._emit(TurnStarted(0, self.round_number))
             finish = self.play_turn()
         self._final_message()
 
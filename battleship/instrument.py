@@ -0,0 +1,190 @@
+from battleship.bitboard import BitBoard
+from battleship.board import Board
+from battleship.game import Game
+from battleship.player import ComputerPlayer
+from battleship.simulation import play_headless
+from battleship import strategies
+from bisect import bisect_left
+from functools import wraps
+import argparse
+import time
+
+# Optional instrumentation of the hot paths: number of calls and time spent in the measured
+# methods, and the attempts burnt by the random placement of the fleets.
+# Nothing is changed while a profiler is off: enable() replaces the measured methods with
+# counting and timing wrappers and disable() puts the originals back. Placement attempts are
+# reported by Board through its placement_listener, which costs one check per ship when unset.
+# Run from the repository root with: python3 -m battleship.instrument --games 100
+
+# Methods measured by default, as (class, method name). The overrides of BitBoard are listed
+# too, since a wrapper on Board does not see them. Headless games shoot with fire_at_cell
+TARGETS = (
+    (Board, "place_ship"), (Board, "_place_ship_randomly"), (Board, "fire_at"), (Board, "fire_at_cell"),
+    (BitBoard, "place_ship"), (BitBoard, "fire_at"), (BitBoard, "fire_at_cell"),
+    (ComputerPlayer, "choose_shot"), (Game, "draw_boards"),
+)
+# Upper bounds of the buckets of the duration histograms, in nanoseconds (1 µs to 10 ms)
+TIME_BUCKETS = (1000, 10000, 100000, 1000000, 10000000)
+TIME_LABELS = ("<1us", "<10us", "<100us", "<1ms", "<10ms", ">=10ms")
+# Upper bounds of the buckets of the histogram of random attempts per fleet
+ATTEMPT_BUCKETS = (10, 20, 50, 100, 1000)
+
+
+class CallStats:
+    # Calls of one method: count, total time and histogram of the durations
+    __slots__ = ("calls", "total_ns", "histogram")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.histogram = [0] * (len(TIME_BUCKETS) + 1)
+
+    def add(self, nanoseconds):
+        self.calls += 1
+        self.total_ns += nanoseconds
+        self.histogram[bisect_left(TIME_BUCKETS, nanoseconds + 1)] += 1
+
+    @property
+    def mean_ns(self):
+        return self.total_ns / self.calls if self.calls else 0.0
+
+
+class Profiler:
+    # Usage:
+    #     with Profiler() as profiler:
+    #         ... play ...
+    #     print(profiler.report())
+    # Only one profiler should be enabled at a time.
+
+    def __init__(self, targets=TARGETS):
+        self.targets = tuple(targets)
+        self.reset()
+        # (class, name, original or None if it was inherited), to undo enable()
+        self._patched = []
+        self._listener = None
+
+    def reset(self):
+        self.calls = {f"{cls.__name__}.{name}": CallStats() for cls, name in self.targets}
+        self.fleets = 0
+        self.ships = 0
+        self.attempts = 0
+        self.fallbacks = 0
+        # Histogram of the random attempts made to place a whole fleet
+        self.fleet_attempts = [0] * (len(ATTEMPT_BUCKETS) + 1)
+        self._fleet = 0
+
+    @property
+    def enabled(self):
+        return bool(self._patched)
+
+    def enable(self):
+        if self._patched:
+            return self
+        for cls, name in self.targets:
+            self._patch(cls, name, self._timed(self.calls[f"{cls.__name__}.{name}"], getattr(cls, name)))
+        # The fleets are counted around the (possibly timed) placement
+        self._patch(Board, "_place_ship_randomly", self._counted_fleet(Board._place_ship_randomly))
+        self._listener = Board.placement_listener
+        Board.placement_listener = self._record_placement
+        return self
+
+    def disable(self):
+        if not self._patched:
+            return
+        Board.placement_listener = self._listener
+        self._listener = None
+        # Undo the patches, last first
+        while self._patched:
+            cls, name, original = self._patched.pop()
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def _patch(self, cls, name, replacement):
+        self._patched.append((cls, name, cls.__dict__.get(name)))
+        setattr(cls, name, replacement)
+
+    def _timed(self, stats, function):
+        clock = time.perf_counter_ns
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats.add(clock() - start)
+        return wrapper
+
+    def _counted_fleet(self, function):
+        @wraps(function)
+        def wrapper(board):
+            self._fleet = 0
+            result = function(board)
+            self.fleets += 1
+            self.fleet_attempts[bisect_left(ATTEMPT_BUCKETS, self._fleet)] += 1
+            return result
+        return wrapper
+
+    def _record_placement(self, ship_type, attempts, fallback):
+        self.ships += 1
+        self.attempts += attempts
+        self._fleet += attempts
+        if fallback:
+            self.fallbacks += 1
+
+    def stats(self):
+        # Everything measured, as plain values
+        return {
+            "calls": {name: {"calls": stats.calls, "total_ns": stats.total_ns, "mean_ns": stats.mean_ns,
+                             "histogram": dict(zip(TIME_LABELS, stats.histogram))}
+                      for name, stats in self.calls.items()},
+            "placement": {"fleets": self.fleets, "ships": self.ships, "attempts": self.attempts,
+                          "fallbacks": self.fallbacks,
+                          "attempts_per_fleet": self.attempts / self.fleets if self.fleets else 0.0,
+                          "fallback_rate": self.fallbacks / self.ships if self.ships else 0.0,
+                          "fleet_histogram": dict(zip(_attempt_labels(), self.fleet_attempts))},
+        }
+
+    def report(self):
+        # Human readable summary of the calls (methods never called are left out) and the placements
+        lines = [f"{'method':<28}{'calls':>10}{'total ms':>11}{'mean us':>10}  " + " ".join(f"{label:>7}" for label in TIME_LABELS)]
+        for name, stats in self.calls.items():
+            if stats.calls:
+                lines.append(f"{name:<28}{stats.calls:>10}{stats.total_ns / 1e6:>11.2f}{stats.mean_ns / 1e3:>10.2f}  "
+                             + " ".join(f"{count:>7}" for count in stats.histogram))
+        if self.fleets:
+            lines.append(f"fleets placed: {self.fleets}, ships: {self.ships}, random attempts: {self.attempts} "
+                         f"({self.attempts / self.fleets:.1f} per fleet, {self.attempts / self.ships:.2f} per ship)")
+            lines.append(f"deterministic fallback: {self.fallbacks} ships ({self.fallbacks / self.ships:.2%})")
+            lines.append("attempts per fleet: " + ", ".join(
+                f"{label}: {count}" for label, count in zip(_attempt_labels(), self.fleet_attempts)))
+        return "\n".join(lines)
+
+
+def _attempt_labels():
+    return tuple(f"<={bound}" for bound in ATTEMPT_BUCKETS) + (f">{ATTEMPT_BUCKETS[-1]}",)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile headless Battleship games.")
+    parser.add_argument("-n", "--games", type=int, default=100, help="number of games to play")
+    choices = strategies.names(interactive=False)
+    parser.add_argument("--first", default="computer", choices=choices, help="strategy of the first player")
+    parser.add_argument("--second", default="computer", choices=choices, help="strategy of the second player")
+    args = parser.parse_args(argv)
+    with Profiler() as profiler:
+        for _ in range(args.games):
+            play_headless(strategies.create(args.first), strategies.create(args.second))
+    print(profiler.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+from battleship.board import Board
+from battleship.placement import PlacementIndex
+from functools import lru_cache
+import random
+
+# A layout is a legal position of a whole fleet: ships are straight, inside the grid
+# and never orthogonally next to each other. Ships of the same type are interchangeable,
+# so a layout is determined by the cells it occupies.
+
+# Marker of a cell that belongs to a horizontal ship in the scan profile (see _count)
+_HORIZONTAL = 100
+
+
+def _fleet_lengths(fleet):
+    # Number of ships per length. Ship types are told apart by their length only
+    counts = {}
+    for ship_type, count in fleet.items():
+        if ship_type.LENGTH in counts:
+            raise ValueError("Ship types of a fleet must have different lengths.")
+        counts[ship_type.LENGTH] = count
+    return counts
+
+
+def count_layouts(size=Board.SIZE, fleet=None):
+    # Exact number of legal layouts of the fleet on a size x size board
+    if fleet is None:
+        fleet = Board.FLEET
+    counts = _fleet_lengths(fleet)
+    return _count(size, tuple(sorted(counts.items())))
+
+
+@lru_cache(maxsize=None)
+def _count(size, counts):
+    # Scans the board cell by cell, row by row, and keeps for every possible "profile"
+    # (the state of the last scanned cell of each column) the number of ways to get there.
+    # Profile values: 0 water, k vertical run of k cells so far, _HORIZONTAL a cell of a
+    # finished horizontal ship, _HORIZONTAL + k the end of a horizontal run of k cells.
+    # A ship is counted when its run cannot grow any further.
+    #
+    # The number of ways is kept separately for every combination of ships already completed.
+    # These counters are packed into one integer, one slot of `width` bits each, so that
+    # completing a ship of length L is a single mask and shift of that integer.
+    counts = dict(counts)
+    max_length = max((length for length, count in counts.items() if count > 0), default=0)
+    if max_length == 0:
+        return 1
+    lengths = range(1, max_length + 1)
+    limit = {length: counts.get(length, 0) for length in lengths}
+    # A counter can never exceed the number of ways to fill the scanned cells
+    width = size * size + 1
+    slot = (1 << width) - 1
+    stride = {}
+    n_slots = 1
+    for length in lengths:
+        stride[length] = n_slots
+        n_slots *= limit[length] + 1
+    keep = {}
+    for length in lengths:
+        mask = 0
+        for i in range(n_slots):
+            if (i // stride[length]) % (limit[length] + 1) < limit[length]:
+                mask |= slot << (i * width)
+        keep[length] = mask
+    shift = {length: stride[length] * width for length in lengths}
+
+    def complete(ways, length):
+        # Moves every counter to the slot with one more ship of that length (if any is left)
+        return (ways & keep[length]) << shift[length]
+
+    H = _HORIZONTAL
+    profiles = {(0,) * size: 1}
+    for row in range(size):
+        for column in range(size):
+            new = {}
+            last = column == size - 1
+            for profile, ways in profiles.items():
+                up = profile[column]
+                left = profile[column - 1] if column > 0 else 0
+                # Water: the vertical run above and the horizontal run on the left are finished
+                water = ways
+                cells = list(profile)
+                if 1 <= up < H:
+                    water = complete(water, up)
+                if left > H and water:
+                    water = complete(water, left - H)
+                    cells[column - 1] = H
+                if water:
+                    cells[column] = 0
+                    key = tuple(cells)
+                    new[key] = new.get(key, 0) + water
+                # Ship: it may continue the run above or the run on the left, never both
+                if up >= H:
+                    continue
+                cells = list(profile)
+                if up:
+                    if left or up >= max_length:
+                        continue
+                    cells[column] = up + 1
+                elif left == 0:
+                    cells[column] = 1
+                elif left == 1:
+                    if max_length < 2:
+                        continue
+                    cells[column - 1] = H
+                    cells[column] = H + 2
+                elif left > H:
+                    if left - H >= max_length:
+                        continue
+                    cells[column - 1] = H
+                    cells[column] = left + 1
+                else:
+                    # The cell on the left is part of a vertical run
+                    continue
+                ship = ways
+                if last and cells[column] > H:
+                    ship = complete(ship, cells[column] - H)
+                    cells[column] = H
+                if ship:
+                    key = tuple(cells)
+                    new[key] = new.get(key, 0) + ship
+            profiles = new
+
+    full = sum(limit[length] * stride[length] for length in lengths)
+    total = 0
+    for profile, ways in profiles.items():
+        # Vertical runs touching the bottom edge are finished too
+        for value in profile:
+            if 1 <= value < H:
+                ways = complete(ways, value)
+        total += (ways >> (full * width)) & slot
+    return total
+
+
+def iter_layouts(size=Board.SIZE, fleet=None):
+    # Streams every legal layout once, as a list of Placement (largest ships first)
+    if fleet is None:
+        fleet = Board.FLEET
+    _fleet_lengths(fleet)
+    index = PlacementIndex.shared(size, fleet)
+    order = index._order
+    layout = []
+
+    def place(ship, first, blocked):
+        if ship == len(order):
+            yield list(layout)
+            return
+        placements = order[ship]
+        for number in range(first, len(placements)):
+            placement = placements[number]
+            if placement.mask & blocked:
+                continue
+            layout.append(placement)
+            # Ships of the same type are placed in increasing order, so each layout appears once
+            same_type = ship + 1 < len(order) and order[ship + 1] is placements
+            yield from place(ship + 1, number + 1 if same_type else 0, blocked | placement.blocked)
+            layout.pop()
+
+    yield from place(0, 0, 0)
+
+
+class UniformFleetSampler:
+    # Draws layouts exactly uniformly over all legal layouts of the fleet.
+    # Every ship is drawn independently among all of its placements, and the whole draw is
+    # rejected as soon as a ship conflicts with the previous ones. Accepted draws are uniform
+    # over the (ordered) tuples of compatible placements, and every layout corresponds to the
+    # same number of such tuples, so layouts are uniform too.
+    # Unlike PlacementIndex.sample, this does not favour layouts that leave little room to later ships.
+
+    def __init__(self, size=Board.SIZE, fleet=None):
+        if fleet is None:
+            fleet = Board.FLEET
+        _fleet_lengths(fleet)
+        self.size = size
+        self.fleet = dict(fleet)
+        self.index = PlacementIndex.shared(size, fleet)
+
+    def sample(self, rng=random):
+        # Returns a list of Placement, one per ship of the fleet
+        draw = rng.random
+        order = self.index._order
+        while True:
+            blocked = 0
+            layout = []
+            for placements in order:
+                placement = placements[int(draw() * len(placements))]
+                if placement.mask & blocked:
+                    break
+                blocked |= placement.blocked
+                layout.append(placement)
+            else:
+                return layout
+
+    def sample_mask(self, rng=random):
+        # Returns only the occupied cells of a uniform layout, as a bitmask
+        mask = 0
+        for placement in self.sample(rng):
+            mask |= placement.mask
+        return mask
+
+    def place_fleet(self, board, rng=random):
+        # Puts a uniformly drawn fleet on an empty board
+        for placement in self.sample(rng):
+            board._add_ship(placement.ship_type, placement.positions)
+        return board
+
+    def count(self):
+        # Number of layouts the sampler draws from
+        return count_layouts(self.size, self.fleet)
@@ -0,0 +1,168 @@
+from battleship import strategies
+from battleship.server import GameServer, Session, Connection
+from battleship.ship import ship_types
+from typing import NamedTuple
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+
+# Load generator for the game server: many simulated clients, each driven by a computer
+# strategy, play complete games over TCP. It reports the latency of every move (from sending
+# a shot to receiving its result), the games finished per second and the memory of a session.
+# Run from the repository root with: python3 -m battleship.loadtest --games 2000 --concurrency 500
+
+
+class LoadTestReport(NamedTuple):
+    games: int
+    moves: int
+    seconds: float
+    latencies: list         # seconds per move, sorted
+    errors: int             # games that did not end with a sunk fleet
+    session_bytes: float    # server memory per session (0 if not measured)
+
+    @property
+    def games_per_second(self):
+        return self.games / self.seconds if self.seconds else 0.0
+
+    def latency(self, percent):
+        return percentile(self.latencies, percent)
+
+    def summary(self):
+        lines = [
+            f"games: {self.games} ({self.errors} not finished), moves: {self.moves}, time: {self.seconds:.2f} s",
+            f"games/s: {self.games_per_second:.1f}, moves/s: {self.moves / self.seconds if self.seconds else 0:.0f}",
+            "move latency (ms): " + ", ".join(
+                f"p{percent:g} {self.latency(percent) * 1e3:.2f}" for percent in (50, 90, 99, 100)),
+        ]
+        if self.session_bytes:
+            lines.append(f"memory per session: {self.session_bytes / 1024:.1f} kB")
+        return "\n".join(lines)
+
+
+def percentile(sorted_values, percent):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+async def play_client(host, port, strategy="computer", opponent="computer", latencies=None):
+    # Plays one game as a client driven by a computer strategy.
+    # Appends the latency of every move to latencies, returns the game_over message
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def send(message):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+    try:
+        await send({"type": "join", "opponent": opponent})
+        player = None
+        shot = None
+        sent = 0.0
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            message = json.loads(line)
+            kind = message["type"]
+            if kind == "start":
+                types = ship_types()
+                fleet = {types[name]: count for name, count in message["fleet"].items()}
+                player = strategies.create(strategy, size=message["size"], fleet=fleet)
+                me = message["player"]
+            elif kind == "your_turn":
+                shot = player.choose_shot()
+                sent = time.perf_counter()
+                await send({"type": "shot", "row": shot[0], "column": shot[1]})
+            elif kind == "result" and message["player"] == me:
+                if latencies is not None:
+                    latencies.append(time.perf_counter() - sent)
+                player.register_result(shot, message["result"], message["sunk"])
+            elif kind == "error":
+                # The server refused the shot: try another cell
+                shot = player.choose_shot()
+                await send({"type": "shot", "row": shot[0], "column": shot[1]})
+            elif kind == "game_over":
+                return message
+    finally:
+        writer.close()
+
+
+async def _run(n_games, concurrency, strategy, host, port, server_options):
+    server = None
+    if host is None:
+        server = await GameServer(**server_options).start()
+        host, port = server.host, server.port
+    latencies = []
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one_game():
+        async with limit:
+            return await play_client(host, port, strategy, "computer", latencies)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one_game() for _ in range(n_games)), return_exceptions=True)
+    seconds = time.perf_counter() - start
+    if server is not None:
+        await server.close()
+    errors = sum(1 for result in results if not isinstance(result, dict) or result.get("reason") != "fleet_sunk")
+    latencies.sort()
+    return LoadTestReport(n_games, len(latencies), seconds, latencies, errors, 0.0)
+
+
+def run_load_test(n_games=1000, concurrency=200, strategy="computer", host=None, port=None,
+                  measure_memory=True, **server_options):
+    # Plays n_games games, at most `concurrency` at the same time. Without a host, a server is
+    # started in this process (server_options are passed to GameServer); otherwise the clients
+    # connect to host:port
+    report = asyncio.run(_run(n_games, concurrency, strategy, host, port, server_options))
+    if measure_memory and host is None:
+        report = report._replace(session_bytes=session_bytes(
+            size=server_options.get("size"), fleet=server_options.get("fleet"),
+            compact=server_options.get("compact", True)))
+    return report
+
+
+def session_bytes(n_sessions=500, size=None, fleet=None, compact=True):
+    # Server-side memory of a game against the computer, fleets placed (socket buffers not included)
+    def sessions(count):
+        created = []
+        for number in range(count):
+            session = Session(number, [Connection(None, None), None], size, fleet, compact=compact)
+            for player in session.players:
+                player.place_fleet()
+            created.append(session)
+        return created
+    # Warm the shared caches first, so they are not counted per session
+    sessions(5)
+    gc.collect()
+    tracemalloc.start()
+    created = sessions(n_sessions)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del created
+    return used / n_sessions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Battleship game server.")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("-c", "--concurrency", type=int, default=200, help="games played at the same time")
+    parser.add_argument("--strategy", default="computer", choices=strategies.names(interactive=False), help="strategy of the clients")
+    parser.add_argument("--host", default=None, help="server to test (default: start one in this process)")
+    parser.add_argument("-p", "--port", type=int, default=8765)
+    parser.add_argument("--no-compact", action="store_true", help="use the default state mode in the local server")
+    args = parser.parse_args(argv)
+    options = {} if args.host else {"compact": not args.no_compact}
+    report = run_load_test(args.games, args.concurrency, args.strategy, args.host, args.port, **options)
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,21 @@
+from battleship import strategies
 from battleship.game import Game
+from battleship.render import TerminalRenderer
+import argparse
 
-game = Game()
+parser = argparse.ArgumentParser(description="Play Battleship against the computer.")
+parser.add_argument("--opponent", default="computer", choices=strategies.names(interactive=False),
+                    help="strategy of the computer player")
+parser.add_argument("--ansi", action="store_true",
+                    help="keep the boards at the top of the terminal and redraw only the cells that changed")
+args = parser.parse_args()
+
+renderer = TerminalRenderer() if args.ansi else None
+game = Game(computer=args.opponent, renderer=renderer)
 # Start the game
-game.play_game()
\ No newline at end of file
+try:
+    game.play_game()
+finally:
+    # The terminal gets its scrolling back even after Ctrl-C or the end of the input
+    if renderer is not None:
+        renderer.close()
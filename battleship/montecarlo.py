@@ -0,0 +1,207 @@
+from battleship.bitboard import neighbour_mask
+from battleship.board import MISS, HIT, SUNK
+from battleship.density import placement_table
+from battleship.player import ComputerPlayer
+from functools import lru_cache
+import time
+
+
+@lru_cache(maxsize=None)
+def sampling_table(size, length):
+    # The placements of density.placement_table, with the bitmask of each placement and the
+    # mask of the cells it blocks (the ship and its orthogonal neighbours)
+    placements, covering = placement_table(size, length)
+    masks = []
+    for cells in placements:
+        mask = 0
+        for cell in cells:
+            mask |= 1 << cell
+        masks.append(mask)
+    blocked = tuple(neighbour_mask(mask, size) for mask in masks)
+    return placements, tuple(masks), blocked, covering
+
+
+class MonteCarloPlayer(ComputerPlayer):
+    # Samples fleet layouts that agree with everything known about the enemy's board
+    # (misses, open hits, sunk ships and the ships left), and fires at the cell occupied
+    # in most samples.
+    #
+    # Samples are kept between turns: after a shot only the samples it contradicts are dropped,
+    # and the pool is filled up again before the next shot. Occupancy counts per cell are
+    # updated whenever a sample is added or removed.
+    # Samples are built hits first: ships covering the open hits are placed before the others,
+    # so that samples are found quickly while targeting (they are not exactly uniform).
+
+    # Failed attempts allowed per missing sample when there is no time budget
+    MAX_FAILURES = 20
+    # Random picks tried for a ship before filtering all of its placements
+    MAX_TRIES = 20
+
+    def __init__(self, board=None, size=None, fleet=None, compact=False, rng=None,
+                 samples=200, time_budget=None, cache=None):
+        super().__init__(board, size, fleet, compact, rng, cache=cache)
+        size = self.board.SIZE
+        self._size = size
+        # Number of samples to keep, and seconds that can be spent sampling per move (None: no limit)
+        self.max_samples = samples
+        self.time_budget = time_budget
+        self._tables = {length: sampling_table(size, length) for length in self.counter}
+        # Each sample is (occupied mask, [(length, placement number), ...]) for the ships left
+        self._samples = []
+        self._counts = [0] * (size * size)
+        # Cells that no ship left can occupy: misses, sunk ships and their neighbours
+        self._forbidden = 0
+        # Hits that do not belong to a sunk ship yet
+        self._open_hits = 0
+
+    def choose_cell(self):
+        if self.cache is not None:
+            return super().choose_cell()
+        return self._sampled_cell()
+
+    def _decide_shot(self):
+        return self._cells[self._sampled_cell()]
+
+    def _sampled_cell(self):
+        self._fill_samples()
+        if not self._samples:
+            # No layout found (inconsistent results or no time): play as the plain computer
+            row, column = super()._decide_shot()
+            return row * self._size + column
+        counts = self._counts
+        best = -1
+        ties = []
+        for cell in self.untried:
+            number = cell[0] * self._size + cell[1]
+            count = counts[number]
+            if count > best:
+                best = count
+                ties = [number]
+            elif count == best:
+                ties.append(number)
+        cell = self.rng.choice(sorted(ties))
+        coordinate = self._cells[cell]
+        self.untried.discard(coordinate)
+        self.parity_pos.discard(coordinate)
+        return cell
+
+    def _register(self, coordinates, code, sunk_len=None):
+        super()._register(coordinates, code, sunk_len)
+        if code not in (HIT, SUNK, MISS):
+            return
+        bit = 1 << (coordinates[0] * self._size + coordinates[1])
+        if code == MISS:
+            self._forbidden |= bit
+            self._keep_samples(lambda mask, layout: not mask & bit)
+            return
+        self._open_hits |= bit
+        if code == HIT:
+            self._keep_samples(lambda mask, layout: mask & bit)
+            return
+        # The sunk ship is the group of open hits connected to the last shot
+        ship = self._connected_hits(bit)
+        self._open_hits &= ~ship
+        self._forbidden |= neighbour_mask(ship, self._size)
+        masks = {length: table[1] for length, table in self._tables.items()}
+        kept = []
+        for mask, layout in self._samples:
+            # A sample survives if it has this very ship: the ship is removed from the sample
+            for position, (length, number) in enumerate(layout):
+                if masks[length][number] == ship:
+                    self._count(layout[position:position + 1], -1)
+                    kept.append((mask & ~ship, layout[:position] + layout[position + 1:]))
+                    break
+            else:
+                self._count(layout, -1)
+        self._samples = kept
+
+    def _connected_hits(self, bit):
+        # Flood fill over the open hits, starting from bit
+        group = bit
+        while True:
+            grown = neighbour_mask(group, self._size) & self._open_hits
+            if grown == group:
+                return group
+            group = grown
+
+    def _keep_samples(self, keep):
+        kept = []
+        for mask, layout in self._samples:
+            if keep(mask, layout):
+                kept.append((mask, layout))
+            else:
+                self._count(layout, -1)
+        self._samples = kept
+
+    def _count(self, layout, delta):
+        counts = self._counts
+        for length, number in layout:
+            for cell in self._tables[length][0][number]:
+                counts[cell] += delta
+
+    def _fill_samples(self):
+        # Adds samples until there are max_samples, or the time budget of the move is spent
+        missing = self.max_samples - len(self._samples)
+        if missing <= 0:
+            return
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        failures = 0
+        while missing > 0:
+            sample = self._sample()
+            if sample is not None:
+                self._samples.append(sample)
+                self._count(sample[1], 1)
+                missing -= 1
+            else:
+                failures += 1
+            if deadline is not None:
+                if time.perf_counter() > deadline:
+                    return
+            elif failures > self.MAX_FAILURES * self.max_samples:
+                return
+
+    def _sample(self):
+        # One layout of the ships left that covers every open hit, or None if the attempt failed
+        draw = self.rng.random
+        tables = self._tables
+        blocked = self._forbidden
+        occupied = 0
+        layout = []
+        left = [length for length, count in self.counter.items() for _ in range(count)]
+        uncovered = self._open_hits
+        while uncovered:
+            # A ship must cover the lowest uncovered hit: pick one of the placements that do
+            cell = (uncovered & -uncovered).bit_length() - 1
+            options = []
+            for length in set(left):
+                masks = tables[length][1]
+                for number in tables[length][3][cell]:
+                    if not masks[number] & blocked:
+                        options.append((length, number))
+            if not options:
+                return None
+            length, number = options[int(draw() * len(options))]
+            left.remove(length)
+            mask = tables[length][1][number]
+            layout.append((length, number))
+            occupied |= mask
+            blocked |= tables[length][2][number]
+            uncovered &= ~mask
+        # The other ships go anywhere they fit, largest first
+        for length in sorted(left, reverse=True):
+            masks = tables[length][1]
+            n = len(masks)
+            for _ in range(self.MAX_TRIES):
+                number = int(draw() * n)
+                if not masks[number] & blocked:
+                    break
+            else:
+                legal = [number for number in range(n) if not masks[number] & blocked]
+                if not legal:
+                    return None
+                number = legal[int(draw() * len(legal))]
+            # The open hits are all covered already, and blocked keeps these ships off them
+            layout.append((length, number))
+            occupied |= masks[number]
+            blocked |= tables[length][2][number]
+        return occupied, layout
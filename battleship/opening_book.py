@@ -0,0 +1,155 @@
+from battleship.board import Board
+from battleship.placement import PlacementIndex
+from array import array
+from functools import lru_cache
+import argparse
+import os
+import random
+import struct
+
+# Opening book: precomputed first shots for an empty board.
+# The book is a binary tree of moves. Node 1 is the first shot; after the shot of node n,
+# the next one is node 2n on a miss and node 2n + 1 on a hit. A book of depth K covers the
+# first K shots and has 2**K - 1 nodes, each holding a cell number (row * size + column)
+# or NO_MOVE where the book has nothing to say.
+#
+# File layout (little-endian): b"BSOB", version u8, depth u8, size u16, number of ship types u8,
+# then (length u8, count u8) per type, then 2**depth - 1 cells as u16.
+
+MAGIC = b"BSOB"
+VERSION = 1
+NO_MOVE = 0xFFFF
+# The book built for the default board and fleet, shipped with the package
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "opening_book.bin")
+
+
+def _fleet_signature(fleet):
+    # Ship lengths and counts, which is all the book depends on
+    counts = {}
+    for ship_type, count in fleet.items():
+        counts[ship_type.LENGTH] = counts.get(ship_type.LENGTH, 0) + count
+    return tuple(sorted(counts.items()))
+
+
+class OpeningBook:
+
+    def __init__(self, size, fleet, depth, moves):
+        self.size = size
+        self.fleet = _fleet_signature(fleet) if isinstance(fleet, dict) else tuple(fleet)
+        self.depth = depth
+        # moves[node - 1] is the cell of node
+        self.moves = moves
+
+    def matches(self, size, fleet):
+        return size == self.size and _fleet_signature(fleet) == self.fleet
+
+    def move(self, node):
+        # The cell to shoot at for a node, or None
+        if not 1 <= node <= len(self.moves):
+            return None
+        cell = self.moves[node - 1]
+        return None if cell == NO_MOVE else cell
+
+    def dumps(self):
+        header = struct.pack("<4sBBHB", MAGIC, VERSION, self.depth, self.size, len(self.fleet))
+        fleet = b"".join(struct.pack("<BB", length, count) for length, count in self.fleet)
+        return header + fleet + struct.pack(f"<{len(self.moves)}H", *self.moves)
+
+    @classmethod
+    def loads(cls, data):
+        magic, version, depth, size, n_types = struct.unpack_from("<4sBBHB", data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a Battleship opening book.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported opening book version {version}.")
+        offset = struct.calcsize("<4sBBHB")
+        fleet = tuple(struct.unpack_from("<BB", data, offset + 2 * i) for i in range(n_types))
+        offset += 2 * n_types
+        n_moves = 2 ** depth - 1
+        if len(data) < offset + 2 * n_moves:
+            raise ValueError("Truncated opening book.")
+        return cls(size, fleet, depth, array("H", struct.unpack_from(f"<{n_moves}H", data, offset)))
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.dumps())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.loads(file.read())
+
+
+@lru_cache(maxsize=None)
+def _default_book():
+    # Read from disk the first time it is needed only
+    if not os.path.exists(DEFAULT_PATH):
+        return None
+    return OpeningBook.load(DEFAULT_PATH)
+
+
+def default_book(size=Board.SIZE, fleet=None):
+    # The shipped book if it was built for this board size and fleet, otherwise None
+    if fleet is None:
+        fleet = Board.FLEET
+    book = _default_book()
+    if book is None or not book.matches(size, fleet):
+        return None
+    return book
+
+
+def build_book(size=Board.SIZE, fleet=None, depth=10, n_layouts=100000, min_layouts=50, rng=random):
+    # Builds a book from simulated fleets: n_layouts random layouts (placed like the computer
+    # places its own fleet) are drawn once. Each node shoots at the cell occupied in most of the
+    # layouts that agree with the shots so far, and the layouts are split between the miss and
+    # the hit child. Nodes with fewer than min_layouts layouts are left empty
+    if fleet is None:
+        fleet = Board.FLEET
+    index = PlacementIndex.shared(size, fleet)
+    layouts = []
+    for _ in range(n_layouts):
+        mask = index.sample_mask(rng)
+        cells = []
+        rest = mask
+        while rest:
+            low = rest & -rest
+            cells.append(low.bit_length() - 1)
+            rest ^= low
+        layouts.append((mask, cells))
+    moves = array("H", [NO_MOVE]) * (2 ** depth - 1)
+    # Nodes to fill: (node, layouts agreeing with its history, cells already shot)
+    pending = [(1, layouts, frozenset())]
+    while pending:
+        node, agreeing, shot = pending.pop()
+        if node > len(moves) or len(agreeing) < min_layouts:
+            continue
+        counts = [0] * (size * size)
+        for _, cells in agreeing:
+            for cell in cells:
+                counts[cell] += 1
+        cell = max((cell for cell in range(size * size) if cell not in shot), key=lambda c: (counts[c], -c))
+        moves[node - 1] = cell
+        bit = 1 << cell
+        misses = [layout for layout in agreeing if not layout[0] & bit]
+        hits = [layout for layout in agreeing if layout[0] & bit]
+        pending.append((2 * node, misses, shot | {cell}))
+        pending.append((2 * node + 1, hits, shot | {cell}))
+    return OpeningBook(size, fleet, depth, moves)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an opening book for the computer player.")
+    parser.add_argument("-o", "--output", default=DEFAULT_PATH, help="file to write (default: the shipped book)")
+    parser.add_argument("--size", type=int, default=Board.SIZE, help="board size (default fleet only)")
+    parser.add_argument("-d", "--depth", type=int, default=10, help="number of shots covered by the book")
+    parser.add_argument("-n", "--layouts", type=int, default=100000, help="number of simulated fleets")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="seed for reproducible books")
+    args = parser.parse_args(argv)
+    book = build_book(args.size, depth=args.depth, n_layouts=args.layouts, rng=random.Random(args.seed))
+    book.save(args.output)
+    filled = sum(1 for cell in book.moves if cell != NO_MOVE)
+    print(f"Wrote {args.output}: {filled} moves, {len(book.dumps())} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from battleship.bitboard import placement_masks, mask_to_cells
+from battleship.board import Board
+from typing import NamedTuple
+import random
+
+class Placement(NamedTuple):
+    # One legal position of a ship on an empty board
+    ship_type: type
+    start: tuple
+    orientation: str
+    mask: int       # cells of the ship
+    blocked: int    # cells of the ship and their orthogonal neighbours
+    positions: tuple
+
+
+class PlacementIndex:
+    # All legal placements of every ship type of a fleet, computed once per board size.
+    # A fleet is sampled ship by ship (largest first, as in Board._place_ship_randomly):
+    # each ship is uniform among the placements that do not conflict with the ships before it.
+    # Conflicts are a single AND against the mask of blocked cells.
+
+    # Random picks tried before falling back to filtering the full list
+    MAX_TRIES = 20
+    # Shared indices, one per (board size, fleet)
+    _cache = {}
+
+    def __init__(self, size=Board.SIZE, fleet=None):
+        if fleet is None:
+            fleet = Board.FLEET
+        self.size = size
+        self.fleet = dict(fleet)
+        self.placements = {}
+        for ship_type in self.fleet:
+            placements = []
+            seen = set()
+            for (start, orientation), (mask, halo) in placement_masks(size, ship_type.LENGTH).items():
+                # A one-cell ship is the same horizontally and vertically
+                if mask in seen:
+                    continue
+                seen.add(mask)
+                positions = tuple(sorted(mask_to_cells(mask, size)))
+                placements.append(Placement(ship_type, start, orientation, mask, mask | halo, positions))
+            self.placements[ship_type] = tuple(placements)
+        # The order in which ships are placed, one entry per ship
+        self._order = []
+        for ship_type in sorted(self.fleet, key=lambda ship: -ship.LENGTH):
+            self._order.extend([self.placements[ship_type]] * self.fleet[ship_type])
+
+    @classmethod
+    def shared(cls, size=Board.SIZE, fleet=None):
+        # Returns the index for a board size and fleet, building it only the first time
+        if fleet is None:
+            fleet = Board.FLEET
+        key = (size, tuple(fleet.items()))
+        index = cls._cache.get(key)
+        if index is None:
+            index = cls._cache[key] = cls(size, fleet)
+        return index
+
+    @classmethod
+    def for_board(cls, board):
+        # Returns the (shared) index matching the size and fleet of a board
+        return cls.shared(board.SIZE, board.FLEET)
+
+    def sample(self, rng=random):
+        # Returns a list of Placement, one per ship of the fleet
+        draw = rng.random
+        while True:
+            blocked = 0
+            layout = []
+            for placements in self._order:
+                n = len(placements)
+                for _ in range(self.MAX_TRIES):
+                    placement = placements[int(draw() * n)]
+                    if not placement.mask & blocked:
+                        break
+                else:
+                    legal = [p for p in placements if not p.mask & blocked]
+                    if not legal:
+                        # Dead end: start the fleet again
+                        break
+                    placement = legal[int(draw() * len(legal))]
+                blocked |= placement.blocked
+                layout.append(placement)
+            else:
+                return layout
+
+    def sample_mask(self, rng=random):
+        # Returns only the occupied cells of a random fleet, as a bitmask
+        mask = 0
+        for placement in self.sample(rng):
+            mask |= placement.mask
+        return mask
+
+    def place_fleet(self, board, rng=random):
+        # Puts a random fleet on an empty board, skipping the checks of Board.place_ship
+        for placement in self.sample(rng):
+            board._add_ship(placement.ship_type, placement.positions)
+        return board
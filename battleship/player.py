@@ -1,21 +1,149 @@
-from battleship.board import Board
+from battleship.board import Board, grid_cells, MISS, HIT, SUNK, INVALID, RESULT_CODES, RESULT_NAMES
+from battleship.coordinates import coordinate_table
+from battleship.cache import TranspositionCache, zobrist_keys, MISS_STATE, HIT_STATE, SUNK_STATE
+from battleship.opening_book import default_book
 from abc import ABC, abstractmethod
+from collections.abc import MutableSet
 import random
 
+
+class CellPool(MutableSet):
+    # A set of cells that can also return a random cell in constant time.
+    # The cells are kept in a list, a removed cell is replaced by the last one
+    __slots__ = ("_cells", "_position")
+
+    def __init__(self, cells=()):
+        self._cells = []
+        self._position = {}
+        for cell in cells:
+            self.add(cell)
+
+    def __contains__(self, cell):
+        return cell in self._position
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def add(self, cell):
+        if cell not in self._position:
+            self._position[cell] = len(self._cells)
+            self._cells.append(cell)
+
+    def discard(self, cell):
+        index = self._position.pop(cell, None)
+        if index is None:
+            return
+        last = self._cells.pop()
+        if index < len(self._cells):
+            self._cells[index] = last
+            self._position[last] = index
+
+    def choice(self, rng=random):
+        # Uniformly random cell of the pool
+        return self._cells[int(rng.random() * len(self._cells))]
+
+
+class CellSet(MutableSet):
+    # A set of cells of a size x size board, stored as the bits of a single integer
+    # (bit row * size + column). It uses a few bytes where a set of tuples uses kilobytes,
+    # at the price of slower operations, so it is used by players in compact mode
+    __slots__ = ("size", "mask")
+
+    def __init__(self, size, cells=()):
+        self.size = size
+        self.mask = 0
+        for cell in cells:
+            self.add(cell)
+
+    def _from_iterable(self, cells):
+        # Used by the set operators (&, |, -) of MutableSet
+        return CellSet(self.size, cells)
+
+    def _bit(self, cell):
+        # Number of the bit of a cell, or None if the cell is not on the board
+        try:
+            row, column = cell
+            if 0 <= row < self.size and 0 <= column < self.size:
+                return row * self.size + column
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    def __contains__(self, cell):
+        bit = self._bit(cell)
+        return bit is not None and self.mask >> bit & 1 == 1
+
+    def __iter__(self):
+        table = grid_cells(self.size)
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            yield table[low.bit_length() - 1]
+            mask ^= low
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def add(self, cell):
+        bit = self._bit(cell)
+        if bit is None:
+            raise ValueError(f"{cell} is not a cell of a {self.size}x{self.size} board")
+        self.mask |= 1 << bit
+
+    def discard(self, cell):
+        bit = self._bit(cell)
+        if bit is not None:
+            self.mask &= ~(1 << bit)
+
+    def choice(self, rng=random):
+        # Uniformly random cell of the set
+        n_cells = self.size * self.size
+        # Random cells are accepted if they are in the set, which is quick while the set is dense
+        for _ in range(8):
+            bit = int(rng.random() * n_cells)
+            if self.mask >> bit & 1:
+                return grid_cells(self.size)[bit]
+        # Otherwise pick one of the cells by its rank
+        count = len(self)
+        if count == 0:
+            raise IndexError("Cannot choose from an empty CellSet")
+        rank = int(rng.random() * count)
+        for number, cell in enumerate(self):
+            if number == rank:
+                return cell
+
+
 # I use an abstract class so Player cannot be instantiated on its own
 class Player(ABC):
 
-    def __init__(self, name):
+    def __init__(self, name, board=None, size=None, fleet=None, compact=False):
         self.name = name
-        self.board = Board()
+        # Any object with the Board API can be used, e.g. a BitBoard
+        # Otherwise a Board with the given size and fleet (or the default ones) is created
+        self.board = board if board is not None else Board(size, fleet)
+        # In compact mode the sets of cells are stored as bits, for simulations holding many games
+        self.compact = compact
+        # The shared coordinate tuples of the board, indexed by cell number
+        self._cells = grid_cells(self.board.SIZE)
+        # Labels of the cells ("B7"), shared by all players with the same board size
+        self._coordinates = coordinate_table(self.board.SIZE)
         # The idea you have of your opponent's board
         self.opponent_view = {
-            "hits": set(),
-            "misses": set(),
+            "hits": self._cell_set(),
+            "misses": self._cell_set(),
             # In the beginning is everything unknown
-            "unknown": {(row, column) for row in range(self.board.SIZE) for column in range(self.board.SIZE)}
+            "unknown": self._cell_set(grid_cells(self.board.SIZE))
         }
 
+    def _cell_set(self, cells=()):
+        # An empty (or filled) set of cells of the board, in the format chosen by the compact mode
+        if self.compact:
+            return CellSet(self.board.SIZE, cells)
+        return set(cells)
+
     def place_fleet(self):
         self.board.place_fleet()
 
@@ -26,104 +154,183 @@ class Player(ABC):
 
     def register_result(self, coordinates, result, sunk_len = None):
         # It registers the result after a shot
+        # The result is a name as returned by Board.fire_at ("Hit", "SUNK", ...), it is turned into its code
+        self._register(coordinates, RESULT_CODES.get(result.capitalize()), sunk_len)
+
+    # Lean protocol for bulk play: cells are numbers (row * size + column) and results are the
+    # integer codes of battleship.board, as returned by Board.fire_at_cell. No strings are involved
+    def choose_cell(self):
+        # A shot off the board is cell -1, which Board.fire_at_cell answers with INVALID like fire_at
+        # (row * size + column would be another cell of the board)
+        row, column = self.choose_shot()
+        size = self.board.SIZE
+        if not (0 <= row < size and 0 <= column < size):
+            return -1
+        return row * size + column
+
+    def observe(self, cell, code, sunk_length=0):
+        if code == INVALID:
+            # The cell may not even be on the board
+            return
+        if type(self).register_result is not Player.register_result:
+            # A subclass written for register_result gets the results there, as names
+            self.register_result(self._cells[cell], RESULT_NAMES[code], sunk_length or None)
+            return
+        self._register(self._cells[cell], code, sunk_length or None)
+
+    def _register(self, coordinates, code, sunk_len=None):
         # Check result
-        result = result.upper()
-        if result not in {"HIT", "SUNK", "MISS"}:
+        if code not in (HIT, SUNK, MISS):
             return
+        view = self.opponent_view
         # Remove the coordinates from the unknown set
-        self.opponent_view["unknown"].discard(coordinates)
-        if result in {"HIT", "SUNK"}:
-            self.opponent_view["hits"].add(coordinates)
+        view["unknown"].discard(coordinates)
+        if code != MISS:
+            view["hits"].add(coordinates)
             # To avoid contradictions
-            self.opponent_view["misses"].discard(coordinates)
+            view["misses"].discard(coordinates)
         else:
-            self.opponent_view["misses"].add(coordinates)
+            view["misses"].add(coordinates)
             # To avoid contradictions
-            self.opponent_view["hits"].discard(coordinates)
+            view["hits"].discard(coordinates)
 
     def convert_coordinate_back(self, numeric_coord:tuple[int, int]) -> str:
-        # It converts the coordinates from tuple to string (e.g. (0,0) -> A1)
-        row, column = numeric_coord
-        if not self.board.in_grid((row, column)):
-            return None
-        row_letter = chr(ord('A') + row)
-        col_number = column + 1
-        return f"{row_letter}{col_number}"
+        # It converts the coordinates from tuple to string (e.g. (0,0) -> A1), None if not on the board
+        if type(numeric_coord) is not tuple:
+            numeric_coord = tuple(numeric_coord)
+        return self._coordinates.labels_by_coordinate.get(numeric_coord)
 
 
 
 class HumanPlayer(Player):
 
-    def __init__(self):
-        super().__init__("Human")
+    def __init__(self, board=None, size=None, fleet=None, compact=False, read=input, write=print):
+        super().__init__("Human", board, size, fleet, compact)
+        # How the player is asked for coordinates and shown messages: the terminal by default,
+        # any read(prompt) -> answer and write(text) functions otherwise (e.g. in tests or a GUI)
+        self.read = read
+        self.write = write
         self.enemy_afloat = dict(self.board.FLEET)
+        # Ship types of each length, so that a sunk ship is found without scanning the fleet
+        self._types_by_length = {}
+        for ship_type in self.enemy_afloat:
+            self._types_by_length.setdefault(ship_type.LENGTH, []).append(ship_type)
 
 
     def convert_coordinates(self, user_input:str) -> tuple[int, int] | None:
         # Convert coordinates for human player
-        # The board goes from A to J on y-axis, and from 1 to 10 on the x-axis
-        s = user_input.strip().upper()
-        # Check if length of string is correct
-        if len(s) not in [2,3] or not s[1:].isnumeric():
-            return None
-        letter = s[0]
-        number = int(s[1:])
-        if not letter.isalpha() or not ord("A") <= ord(letter) <= ord("J"):
-            return None
-        if not 1 <= number <=10:
-            return None
-        row = ord(letter) - ord("A")
-        column = number-1
-        return (row, column)
+        # The board goes from A on y-axis (J for a 10x10 board, AA after Z on larger ones),
+        # and from 1 to the board size on the x-axis. None if the label is not on the board
+        return self._coordinates.parse(user_input)
 
     def choose_shot(self):
         # Asks for coordinates to be shot at via terminal input
         while True:
-            print("What coordinate would you like to fire at? Insert e.g. B7")
-            string_coordinate = input("Answer: ").strip()
+            self.write("What coordinate would you like to fire at? Insert e.g. B7")
+            string_coordinate = self.read("Answer: ").strip()
             coordinate = self.convert_coordinates(string_coordinate)
             # Check whether coordinate is valid, and if it has already been chosen
             if coordinate and coordinate in self.opponent_view["unknown"]:
                 return coordinate
-            print("Invalid coordinate, please try again.")
+            self.write("Invalid coordinate, please try again.")
 
     def _decrease_counter(self, counter:dict, ship_length:int):
         # If a ship is sunk, it decreases the counter of the remaining ships
         # Counter is like FLEET
-        for ship_type, count in counter.items():
-            if ship_type.LENGTH == ship_length and count > 0:
+        for ship_type in self._types_by_length.get(ship_length, ()):
+            count = counter.get(ship_type, 0)
+            if count > 0:
                 counter[ship_type] = count - 1
                 return
         # Only raise if we don't find a matching ship
         raise RuntimeError(f"No remaining ship of length {ship_length}.")
 
 
-    def register_result(self, coordinates, result, sunk_len = None):
+    def _register(self, coordinates, code, sunk_len=None):
         # This addition is needed for the opponent's fleet counter
-        super().register_result(coordinates, result)
+        super()._register(coordinates, code)
         if sunk_len is not None:
             self._decrease_counter(self.enemy_afloat, sunk_len)
 
-    def show_enemy_fleet_status(self):
+    def show_enemy_fleet_status(self, fleet_status=None):
         # It prints the status of the opponent's fleet at each turn
-        print("Enemy's fleet status:")
-        for ship_type, counter in self.enemy_afloat.items():
-            print(f"{ship_type.__name__} ({ship_type.LENGTH} cells): remaining {counter}")
+        # fleet_status: the counts of the opponent's board (Board.fleet_status()) when the game
+        # gives them, otherwise the ones this player keeps from the sunk ships it was told about
+        if fleet_status is None:
+            fleet_status = self.enemy_afloat
+        self.write("Enemy's fleet status:")
+        for ship_type, counter in fleet_status.items():
+            self.write(f"{ship_type.__name__} ({ship_type.LENGTH} cells): remaining {counter}")
 
 class ComputerPlayer(Player):
 
-    def __init__(self):
-        super().__init__("Computer")
-        self.untried = {(row, col) for row in range(self.board.SIZE) for col in range (self.board.SIZE)}
-        self.parity_pos = {(row, col) for (row, col) in self.untried if (row + col) % 2 == 0}
+    def __init__(self, board=None, size=None, fleet=None, compact=False, rng=None, book=None, cache=None):
+        super().__init__("Computer", board, size, fleet, compact)
+        # Source of randomness: the random module by default, or e.g. a seeded random.Random
+        self.rng = rng if rng is not None else random
+        # Optional opening book (see battleship.opening_book) for the first shots of the game,
+        # "default" for the shipped one. It is only used if it was built for this board and fleet.
+        # book_node is the current node of the book, 0 once the game has left the book
+        if book == "default":
+            book = default_book(self.board.SIZE, self.board.FLEET)
+        self.book = book if book is not None and book.matches(self.board.SIZE, self.board.FLEET) else None
+        self.book_node = 1 if self.book is not None else 0
+        cells = grid_cells(self.board.SIZE)
+        parity = [(row, col) for (row, col) in cells if (row + col) % 2 == 0]
+        # Pools instead of sets, so that a random cell can be drawn without copying them
+        # (in compact mode a CellSet, which can draw a random cell too)
+        if compact:
+            self.untried = CellSet(self.board.SIZE, cells)
+            self.parity_pos = CellSet(self.board.SIZE, parity)
+        else:
+            self.untried = CellPool(cells)
+            self.parity_pos = CellPool(parity)
         self.mode = "hunt"
         self.hit_seed = None
         self.connected_hits = set()
         self.candidates = set()
         self.orientation = None
-        self.counter = {4:1, 3:2, 2:3, 1:4} # Length:number of ships
+        # Length:number of ships, e.g. {4:1, 3:2, 2:3, 1:4} for the default fleet
+        self.counter = {}
+        for ship_type, count in self.board.FLEET.items():
+            self.counter[ship_type.LENGTH] = self.counter.get(ship_type.LENGTH, 0) + count
+        # Optional transposition cache (see battleship.cache), "shared" for the process-wide one.
+        # state_hash is the Zobrist hash of what the player knows about the enemy's board
+        if cache == "shared":
+            cache = TranspositionCache.shared()
+        self.cache = cache
+        self.state_hash = 0
+        # Decisions are only shared between players of the same kind, board and fleet
+        self._cache_scope = (type(self).__name__, self.board.SIZE, tuple(sorted(self.counter.items())),
+                             self.book is not None)
 
     def choose_shot(self):
+        if self.cache is not None:
+            return self._cached_shot()
+        return self._decide_shot()
+
+    def _cached_shot(self):
+        # The shot chosen the last time this knowledge state was met, if it is still untried
+        key = (self._cache_scope, self.state_hash)
+        cell = self.cache.get(key)
+        if cell is not None:
+            coordinate = self._cells[cell]
+            if coordinate in self.untried:
+                self.untried.discard(coordinate)
+                self.parity_pos.discard(coordinate)
+                self.candidates.discard(coordinate)
+                return coordinate
+        coordinate = self._decide_shot()
+        self.cache.put(key, coordinate[0] * self.board.SIZE + coordinate[1])
+        return coordinate
+
+    def _decide_shot(self):
+        if self.book_node:
+            # While the game follows the book, the next shot is a table lookup. After a hit too:
+            # the hit branches of the book choose among the cells the targeting would try
+            coordinate = self._book_cell()
+            if coordinate is not None:
+                return coordinate
         # "Hunt" is random choice, "Target" is deterministic once a ship has been hit
         # Searching for any ship
         if self.mode == "hunt":
@@ -139,14 +346,23 @@ class ComputerPlayer(Player):
         # Returns true if there are ships longer than 1 cell left
         return any(length > 1 and count > 0 for length, count in self.counter.items())
 
-    def register_result(self, coordinates, result, sunk_len=None):
+    def _register(self, coordinates, code, sunk_len=None):
         # It registers each shot's result
-        result = result.upper()
+        if self.cache is not None and coordinates in self.opponent_view["unknown"]:
+            self._update_state_hash(coordinates, code)
         # Call the code defined in the parent class
-        super().register_result(coordinates, result)
+        super()._register(coordinates, code)
+
+        if self.book_node:
+            # Follow the book to the child of this result, or leave it if the shot was not the book's
+            book_cell = self.book.move(self.book_node)
+            if book_cell is not None and self._cells[book_cell] == coordinates and code in (HIT, SUNK, MISS):
+                self.book_node = 2 * self.book_node + (code != MISS)
+            else:
+                self.book_node = 0
 
         # If there was a hit
-        if result == "HIT":
+        if code == HIT:
             if self.mode == "hunt":
                 # Switch to targeting
                 self._start_targeting(coordinates)
@@ -154,7 +370,8 @@ class ComputerPlayer(Player):
                 self.connected_hits.add(coordinates)
                 if len(self.connected_hits) >= 2:
                     # Check whether they are aligned
-                    hits = list(self.connected_hits)
+                    # (sorted, so that the result does not depend on the order of the set)
+                    hits = sorted(self.connected_hits)
                     hit1, hit2 = hits[0], hits[1]
                     if hit1[0] == hit2[0] or hit1[1] == hit2[1]:
                         self._update_orientation(hit1, hit2)
@@ -164,7 +381,7 @@ class ComputerPlayer(Player):
                     # if orientation is known, keep only candidates in the same line
                     if self.orientation == "H":
                         # Find the row
-                        row = next(iter(self.connected_hits))[0]
+                        row = min(self.connected_hits)[0]
                         # Filter out the candidates that are not on that row
                         self.candidates = {c for c in self.candidates if c[0] == row}
                         # Extend the line at both ends
@@ -180,7 +397,7 @@ class ComputerPlayer(Player):
                     else:
                         # Vertical orientation - Do the same for the columns
                         # Find the column
-                        column = next(iter(self.connected_hits))[1]
+                        column = min(self.connected_hits)[1]
                         # Filter out the candidates that are not in that column
                         self.candidates = {c for c in self.candidates if c[1] == column}
                         # Extend the line at both ends
@@ -195,7 +412,7 @@ class ComputerPlayer(Player):
                                 self.candidates.add(nxt)
 
         # Decrease the self.counter every time a ship is sunk
-        if result == "SUNK" and sunk_len is not None:
+        if code == SUNK and sunk_len is not None:
             if sunk_len in self.counter and self.counter[sunk_len] > 0:
                 self.counter[sunk_len] -= 1
             self._clear_target_state()
@@ -203,18 +420,57 @@ class ComputerPlayer(Player):
         self.untried.discard(coordinates)
         self.parity_pos.discard(coordinates)
 
+    def _update_state_hash(self, coordinates, code):
+        # XORs the keys of the cells whose state changes with this shot
+        keys = zobrist_keys(self.board.SIZE)
+        size = self.board.SIZE
+        cell = coordinates[0] * size + coordinates[1]
+        if code == MISS:
+            self.state_hash ^= keys[MISS_STATE][cell]
+        elif code == HIT:
+            self.state_hash ^= keys[HIT_STATE][cell]
+        elif code == SUNK:
+            self.state_hash ^= keys[SUNK_STATE][cell]
+            # The other cells of the ship are the hits connected to this one (ships never touch)
+            hits = self.opponent_view["hits"]
+            ship = {coordinates}
+            stack = [coordinates]
+            while stack:
+                row, column = stack.pop()
+                for neighbour in ((row - 1, column), (row + 1, column), (row, column - 1), (row, column + 1)):
+                    if neighbour in hits and neighbour not in ship:
+                        ship.add(neighbour)
+                        stack.append(neighbour)
+                        other = neighbour[0] * size + neighbour[1]
+                        self.state_hash ^= keys[HIT_STATE][other] ^ keys[SUNK_STATE][other]
+
+    def _book_cell(self):
+        # The shot of the current book node, or None (and the game leaves the book) if it has none.
+        # While targeting, the book is only followed to one of the candidates: the targeting
+        # follows one ship at a time, and a shot elsewhere could hit another one
+        cell = self.book.move(self.book_node)
+        coordinate = None if cell is None else self._cells[cell]
+        if (coordinate is None or coordinate not in self.untried
+                or (self.mode == "target" and coordinate not in self.candidates)):
+            self.book_node = 0
+            return None
+        self.parity_pos.discard(coordinate)
+        self.untried.discard(coordinate)
+        self.candidates.discard(coordinate)
+        return coordinate
+
     def _hunt_cell(self):
         # The coordinate to be shot at is chosen randomly
         # Choose the target cell depending on parity mode
         if self._use_parity():
-            # Parity untried cells
-            candidates = self.parity_pos & self.untried
+            # Parity untried cells (a parity cell is always discarded together with its untried cell)
+            candidates = self.parity_pos
         else:
             candidates = self.untried
         if not candidates:
             raise RuntimeError("No more cells to shoot at.")
 
-        coordinate = random.choice(list(candidates))
+        coordinate = candidates.choice(self.rng)
         self.parity_pos.discard(coordinate)
         self.untried.discard(coordinate)
         return coordinate
@@ -256,29 +512,29 @@ class ComputerPlayer(Player):
 
     def _target_cell(self):
         # Target mode - once a ship is hit, check the rest of it in the neighbouring cells
-        available_candidates = self.candidates & self.untried
+        available_candidates = {cell for cell in self.candidates if cell in self.untried}
         if self.orientation is None:
             if not available_candidates:
                 self.mode = "hunt"
                 return self._hunt_cell()
             # If orientation is not known, pick a random neighbour
-            coordinate = random.choice(list(available_candidates))
+            coordinate = self.rng.choice(sorted(available_candidates))
         elif self.orientation == "H":
             # If orientation is horizontal, pick a neighbour in the same row
-            ref_row = next(iter(self.connected_hits))[0]
+            ref_row = min(self.connected_hits)[0]
             horizontal_candidates = {cell for cell in available_candidates if cell[0] == ref_row}
             if not horizontal_candidates:
-                coordinate = random.choice(list(available_candidates))
+                coordinate = self.rng.choice(sorted(available_candidates))
             else:
-                coordinate = random.choice(list(horizontal_candidates))
+                coordinate = self.rng.choice(sorted(horizontal_candidates))
         else:
             # If orientation is vertical, pick a neighbour in the same column
-            ref_col = next(iter(self.connected_hits))[1]
+            ref_col = min(self.connected_hits)[1]
             vertical_candidates = {cell for cell in available_candidates if cell[1] == ref_col}
             if not vertical_candidates:
-                coordinate = random.choice(list(available_candidates))
+                coordinate = self.rng.choice(sorted(available_candidates))
             else:
-                coordinate = random.choice(list(vertical_candidates))
+                coordinate = self.rng.choice(sorted(vertical_candidates))
         self.parity_pos.discard(coordinate)
         self.untried.discard(coordinate)
         self.candidates.discard(coordinate)
@@ -0,0 +1,164 @@
+from battleship.coordinates import coordinate_table
+import shutil
+import sys
+
+# Incremental rendering of the boards on an ANSI terminal.
+# The boards are drawn side by side at the top of the screen and stay there: the first frame
+# is drawn in full, later frames only rewrite the cells shot at since the previous frame, with
+# cursor positioning. The lines below the boards are a scrolling region, so that the messages
+# of the game scroll without moving the boards. Each frame is sent with a single write.
+
+CSI = "\x1b["
+SAVE_CURSOR = "\x1b7"
+RESTORE_CURSOR = "\x1b8"
+HIT_SYMBOL, MISS_SYMBOL, SHIP_SYMBOL, WATER_SYMBOL = "X", "O", "S", "~"
+
+
+def _new_cells(cells, seen):
+    # Cells not drawn yet (a set difference, computed in C for plain sets)
+    if isinstance(cells, (set, frozenset)):
+        return cells - seen
+    return {cell for cell in cells if cell not in seen}
+
+
+class Panel:
+    # One board on the screen: the hits and misses to draw (live sets, e.g. a player's
+    # opponent_view, read at every frame) and whether the ships are shown
+    def __init__(self, board, show_ships, hits, misses, title, left):
+        self.board = board
+        self.show_ships = show_ships
+        self.hits = hits
+        self.misses = misses
+        self.title = title
+        size = board.SIZE
+        # Same layout as Game.draw_boards: a row label, then right-aligned cells separated by spaces
+        self.labels = coordinate_table(size)
+        self.width = max(2, len(str(size)))
+        # Columns before the first cell: the row label and a space
+        self.margin = self.labels.row_width + 1
+        self.columns = self.margin + size * (self.width + 1) - 1
+        # Screen column (0-based) of the first character of the panel
+        self.left = left
+        self.seen_hits = set()
+        self.seen_misses = set()
+
+    def symbol(self, coordinate):
+        if coordinate in self.hits:
+            return HIT_SYMBOL
+        if coordinate in self.misses:
+            return MISS_SYMBOL
+        if self.show_ships and coordinate in self.board.occupied:
+            return SHIP_SYMBOL
+        return WATER_SYMBOL
+
+    def lines(self):
+        # The full drawing of the board, header included
+        size = self.board.SIZE
+        width = self.width
+        label_width = self.margin - 1
+        lines = [" " * self.margin + " ".join(f"{i:>{width}}" for i in range(1, size + 1))]
+        for row in range(size):
+            cells = " ".join(f"{self.symbol((row, column)):>{width}}" for column in range(size))
+            lines.append(f"{self.labels.rows[row]:<{label_width}} {cells}")
+        self.seen_hits = set(self.hits)
+        self.seen_misses = set(self.misses)
+        return lines
+
+    def changes(self):
+        # (screen row, screen column, symbol) of the cells shot at since the last frame, 1-based
+        # like the ANSI cursor positions. The title is on row 1 and the column numbers on row 2
+        new_hits = _new_cells(self.hits, self.seen_hits)
+        new_misses = _new_cells(self.misses, self.seen_misses)
+        self.seen_hits |= new_hits
+        self.seen_misses |= new_misses
+        offset = self.left + self.margin - 1 + self.width
+        step = self.width + 1
+        changes = [(row + 3, offset + column * step, HIT_SYMBOL) for row, column in new_hits]
+        changes.extend((row + 3, offset + column * step, MISS_SYMBOL) for row, column in new_misses)
+        return changes
+
+
+class TerminalRenderer:
+    # Usage:
+    #     renderer = TerminalRenderer()
+    #     renderer.add_board(board, show_ships, hits, misses, "YOUR BOARD")
+    #     renderer.render()  # after every turn
+    #     renderer.close()
+
+    SPACING = 15
+
+    def __init__(self, stream=None, height=None, spacing=SPACING):
+        self.stream = stream if stream is not None else sys.stdout
+        # Lines of the terminal, for the scrolling region below the boards
+        self.height = height if height is not None else shutil.get_terminal_size().lines
+        self.spacing = spacing
+        self.panels = []
+        self._drawn = False
+
+    def add_board(self, board, show_ships, hits, misses, title=""):
+        left = 0
+        if self.panels:
+            last = self.panels[-1]
+            left = last.left + last.columns + self.spacing
+        self.panels.append(Panel(board, show_ships, hits, misses, title, left))
+        self._drawn = False
+
+    @property
+    def rows(self):
+        # Screen lines taken by the boards: title, column numbers and one line per board row
+        return 2 + max(panel.board.SIZE for panel in self.panels)
+
+    def frame(self):
+        # The text of the next frame: everything the first time, then the changed cells only
+        # ("" if nothing changed)
+        if not self._drawn:
+            return self._full_frame()
+        changes = [change for panel in self.panels for change in panel.changes()]
+        if not changes:
+            return ""
+        parts = [SAVE_CURSOR]
+        for row, column, symbol in changes:
+            parts.append(f"{CSI}{row};{column + 1}H{symbol}")
+        parts.append(RESTORE_CURSOR)
+        return "".join(parts)
+
+    def _full_frame(self):
+        self._drawn = True
+        drawings = [panel.lines() for panel in self.panels]
+        rows = self.rows
+        text = []
+        line = ""
+        for panel in self.panels:
+            line = line.ljust(panel.left) + panel.title
+        text.append(line)
+        for number in range(rows - 1):
+            line = ""
+            for panel, drawing in zip(self.panels, drawings):
+                if number < len(drawing):
+                    line = line.ljust(panel.left) + drawing[number]
+            text.append(line)
+        # Clear the screen, draw from the top left corner
+        parts = [f"{CSI}2J{CSI}H", "\n".join(text)]
+        if self.height > rows + 1:
+            # Messages scroll below the boards (setting the region moves the cursor home)
+            parts.append(f"{CSI}{rows + 1};{self.height}r")
+        parts.append(f"{CSI}{rows + 1};1H")
+        return "".join(parts)
+
+    def render(self):
+        text = self.frame()
+        if text:
+            self.stream.write(text)
+            self.stream.flush()
+
+    def redraw(self):
+        # The next frame is drawn in full, e.g. after the screen was cleared
+        self._drawn = False
+
+    def close(self):
+        # Gives the whole screen back to scrolling, with the cursor on the last line.
+        # Closing again does nothing, until the next frame
+        if self._drawn:
+            self._drawn = False
+            self.stream.write(f"{CSI}r{CSI}{self.height};1H\n")
+            self.stream.flush()
@@ -0,0 +1,191 @@
+from battleship.board import INVALID, RESULT_CODES, RESULT_NAMES
+from typing import NamedTuple
+import mmap
+import os
+import struct
+
+# Append-only log of the shots of many games, one fixed-width record per shot.
+# The file starts with a header (magic, version, record size), then the records follow in
+# the order they were played. The shots of a game are contiguous and games are numbered
+# in increasing order, so a game is found with a binary search on the memory-mapped file.
+#
+# Record (little-endian): game u32, shooter u8, row u16, column u16, result u8, sunk length u8, padding
+
+MAGIC = b"BSRL"
+VERSION = 1
+HEADER = struct.Struct("<4sBxH")
+RECORD = struct.Struct("<IBHHBBx")
+
+
+class Shot(NamedTuple):
+    game: int
+    shooter: int        # 0 for the player who started the game, 1 for the other one
+    row: int
+    column: int
+    result: int         # MISS, HIT, SUNK, REPEAT or INVALID (see battleship.board)
+    sunk_length: int    # length of the sunk ship, 0 if the shot did not sink one
+
+    @property
+    def coordinates(self):
+        return (self.row, self.column)
+
+    @property
+    def result_name(self):
+        return RESULT_NAMES[self.result]
+
+
+class ReplayWriter:
+    # Appends shots to a log file. Records are collected in memory and written in blocks.
+    # Call start_game() before the first shot of every game
+
+    # Records buffered before a write
+    BUFFER_RECORDS = 4096
+
+    def __init__(self, path):
+        self.path = path
+        self.game = -1
+        n_shots = None
+        if os.path.exists(path) and os.path.getsize(path):
+            # An existing file must be a log: it is checked before anything is written to it
+            with ReplayReader(path) as reader:
+                self.game = reader.n_games - 1
+                n_shots = len(reader)
+        self._file = open(path, "ab")
+        try:
+            if n_shots is None:
+                self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            else:
+                # Continue the numbering of the log, dropping a record cut short by an interrupted write
+                self._file.truncate(HEADER.size + n_shots * RECORD.size)
+        except BaseException:
+            self._file.close()
+            raise
+        self._buffer = bytearray()
+        self._buffered = 0
+
+    def start_game(self, boards=None):
+        # boards are the boards of the two players, for recorders that look at them (the log does not)
+        self.game += 1
+        return self.game
+
+    def record(self, shooter, coordinates, result, sunk_length=None):
+        # result is a name as returned by Board.fire_at ("Miss", "Hit", ...) or an integer code
+        if self.game < 0:
+            raise RuntimeError("start_game() must be called before recording shots.")
+        if isinstance(result, str):
+            result = RESULT_CODES[result.capitalize()]
+        if result == INVALID:
+            # A shot off the board (it may have negative coordinates) changes nothing: it is not logged
+            return
+        row, column = coordinates
+        self._buffer += RECORD.pack(self.game, shooter, row, column, result, sunk_length or 0)
+        self._buffered += 1
+        if self._buffered >= self.BUFFER_RECORDS:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+            self._buffered = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayReader:
+    # Reads a log through a memory map: only the pages that are accessed are loaded
+
+    # Records decoded at once when iterating
+    BLOCK_RECORDS = 65536
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError("Not a Battleship replay log.")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        magic, version, record_size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            if magic != MAGIC:
+                raise ValueError("Not a Battleship replay log.")
+            raise ValueError(f"Unsupported replay log version {version}.")
+        # A record cut short by an interrupted write is ignored
+        self._n_shots = (size - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        # Number of shots in the log
+        return self._n_shots
+
+    def shot(self, number):
+        if not 0 <= number < self._n_shots:
+            raise IndexError("shot number out of range")
+        return Shot(*RECORD.unpack_from(self._map, HEADER.size + number * RECORD.size))
+
+    def __iter__(self):
+        # All shots, in the order they were played, read a block of records at a time
+        end = HEADER.size + self._n_shots * RECORD.size
+        step = self.BLOCK_RECORDS * RECORD.size
+        for start in range(HEADER.size, end, step):
+            for fields in RECORD.iter_unpack(self._map[start:min(start + step, end)]):
+                yield Shot(*fields)
+
+    def _game_of(self, number):
+        return struct.unpack_from("<I", self._map, HEADER.size + number * RECORD.size)[0]
+
+    def _first_shot(self, game):
+        # Binary search for the first shot of a game number >= game
+        low, high = 0, self._n_shots
+        while low < high:
+            middle = (low + high) // 2
+            if self._game_of(middle) < game:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    @property
+    def n_games(self):
+        return self._game_of(self._n_shots - 1) + 1 if self._n_shots else 0
+
+    def game(self, game):
+        # The shots of one game, found without reading the rest of the log
+        first = self._first_shot(game)
+        last = self._first_shot(game + 1)
+        return [self.shot(number) for number in range(first, last)]
+
+    def iter_games(self):
+        # Streams (game number, shots) for every game of the log
+        shots = []
+        for shot in self:
+            if shots and shot.game != shots[0].game:
+                yield shots[0].game, shots
+                shots = []
+            shots.append(shot)
+        if shots:
+            yield shots[0].game, shots
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,323 @@
+from battleship import strategies
+from battleship.events import NullSink
+from battleship.game import Game
+from battleship.player import HumanPlayer
+import argparse
+import asyncio
+import itertools
+import json
+
+# Game server for playing over the network. Clients talk to it with JSON lines over TCP:
+# every message is one JSON object on one line, with a "type" field.
+#
+# Client -> server:
+#   {"type": "join", "opponent": "computer"}   play against the computer (or any other
+#                                              registered strategy, e.g. "density")
+#   {"type": "join", "opponent": "human"}      wait for another client and play against it
+#   {"type": "shot", "cell": "B7"}             (or {"type": "shot", "row": 1, "column": 6})
+# Server -> client:
+#   {"type": "waiting"}                        no other client to play with yet (if none comes
+#                                              within the pairing timeout, an error follows)
+#   {"type": "start", "game": 3, "player": 0, "size": 10, "fleet": {...}, "ships": [["A1", "A2"], ...]}
+#   {"type": "your_turn", "round": 5}
+#   {"type": "result", "player": 0, "cell": "B7", "result": "HIT", "sunk": null}
+#   {"type": "error", "message": "..."}        the message was not understood, the turn goes on
+#   {"type": "game_over", "winner": 0, "reason": "fleet_sunk" | "timeout" | "disconnect"}
+#
+# Each game is a task, and waiting for a client never blocks the other games.
+# Player 0 starts, as the human does in the terminal game.
+
+# Longest message accepted from a client
+LINE_LIMIT = 4096
+
+
+class ClientGone(Exception):
+    # The client disconnected or sent something that is not a message.
+    # seat: the number of its player in the game, when known
+    def __init__(self, seat=None):
+        super().__init__(seat)
+        self.seat = seat
+
+
+class Connection:
+    # One connected client, sending and receiving JSON lines
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, message):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            raise ClientGone()
+
+    async def receive(self, timeout=None):
+        # Next message of the client. Raises asyncio.TimeoutError if it takes longer than timeout
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), timeout)
+        except (ConnectionError, ValueError):
+            # ValueError: a line longer than the limit
+            raise ClientGone()
+        if not line:
+            raise ClientGone()
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return {"type": "invalid"}
+        return message if isinstance(message, dict) else {"type": "invalid"}
+
+    def close(self):
+        self.writer.close()
+
+
+class Session:
+    # One game between two seats. A seat is a Connection, or None for a computer player
+    # playing the given strategy
+
+    def __init__(self, number, seats, size=None, fleet=None, turn_timeout=None, compact=True, recorder=None,
+                 strategy="computer"):
+        self.number = number
+        self.seats = seats
+        self.turn_timeout = turn_timeout
+        # The recorder may be shared by the sessions of a server: the shots of the game are kept
+        # here and passed to it at the end, all at once (see _record)
+        self.recorder = recorder
+        self.shots = []
+        self.game = Game(size, fleet, sink=NullSink())
+        # The game is played by network clients and computers, never at the terminal
+        self.game.human, self.game.computer = [
+            HumanPlayer(size=size, fleet=fleet, compact=compact) if seat is not None
+            else strategies.create(strategy, size=size, fleet=fleet, compact=compact)
+            for seat in seats
+        ]
+        self.players = (self.game.human, self.game.computer)
+        self.winner = None
+        self.reason = None
+
+    async def _broadcast(self, message):
+        for seat in self.seats:
+            if seat is not None:
+                try:
+                    await seat.send(message)
+                except ClientGone:
+                    pass
+
+    async def _send(self, number, message):
+        try:
+            await self.seats[number].send(message)
+        except ClientGone:
+            raise ClientGone(number)
+
+    async def _receive(self, number, timeout):
+        try:
+            return await self.seats[number].receive(timeout)
+        except ClientGone:
+            raise ClientGone(number)
+
+    async def run(self):
+        game = self.game
+        for player in self.players:
+            player.place_fleet()
+        board = self.players[0].board
+        fleet = {ship_type.__name__: count for ship_type, count in board.FLEET.items()}
+        current = 0
+        try:
+            for number, seat in enumerate(self.seats):
+                if seat is not None:
+                    player = self.players[number]
+                    ships = [[player.convert_coordinate_back(cell) for cell in sorted(ship.position)]
+                             for ship in player.board.ships]
+                    await self._send(number, {"type": "start", "game": self.number, "player": number,
+                                     "size": board.SIZE, "fleet": fleet, "ships": ships})
+            while True:
+                coordinates = await self._choose_shot(current)
+                finished, message = self._play_shot(current, coordinates)
+                await self._broadcast(message)
+                if finished:
+                    self.winner, self.reason = current, "fleet_sunk"
+                    break
+                current = 1 - current
+                game.round_number += 1
+        except asyncio.TimeoutError:
+            self.winner, self.reason = 1 - current, "timeout"
+        except ClientGone as gone:
+            # The game goes to the other player of the one who left
+            self.winner, self.reason = 1 - gone.seat, "disconnect"
+        self._record()
+        await self._broadcast({"type": "game_over", "winner": self.winner, "reason": self.reason})
+        for seat in self.seats:
+            if seat is not None:
+                seat.close()
+        return self.winner
+
+    async def _choose_shot(self, number):
+        player = self.players[number]
+        seat = self.seats[number]
+        if seat is None:
+            return player.choose_shot()
+        await self._send(number, {"type": "your_turn", "round": self.game.round_number})
+        loop = asyncio.get_running_loop()
+        deadline = None if self.turn_timeout is None else loop.time() + self.turn_timeout
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            message = await self._receive(number, timeout)
+            coordinates = self._parse_shot(player, message)
+            # As in HumanPlayer.choose_shot, only cells not fired at yet are accepted
+            if coordinates is not None and coordinates in player.opponent_view["unknown"]:
+                return coordinates
+            await self._send(number, {"type": "error", "message": "Invalid coordinate, please try again."})
+
+    def _record(self):
+        # Recorders follow one game at a time, and a replay log keeps the shots of a game together:
+        # games played at the same time must not be recorded shot by shot. Nothing is awaited here,
+        # so no other session records in between
+        if self.recorder is None:
+            return
+        self.recorder.start_game(tuple(player.board for player in self.players))
+        for shot in self.shots:
+            self.recorder.record(*shot)
+
+    def _parse_shot(self, player, message):
+        if message.get("type") != "shot":
+            return None
+        if isinstance(message.get("cell"), str):
+            return player.convert_coordinates(message["cell"])
+        row, column = message.get("row"), message.get("column")
+        if type(row) is int and type(column) is int and player.board.in_grid((row, column)):
+            return (row, column)
+        return None
+
+    def _play_shot(self, number, coordinates):
+        # Same steps as Game.play_turn, without printing.
+        # Returns whether the game is over and the result message for the clients
+        game = self.game
+        player = self.players[number]
+        target = self.players[1 - number]
+        result, ship = target.board.fire_at(coordinates)
+        sunk_len = ship.length if (result.upper() == "SUNK" and ship is not None) else None
+        player.register_result(coordinates, result, sunk_len)
+        if self.recorder is not None:
+            self.shots.append((number, coordinates, result, sunk_len))
+        message = {"type": "result", "player": number, "cell": player.convert_coordinate_back(coordinates),
+                   "result": result.upper(), "sunk": sunk_len}
+        return target.board.all_ships_sunk(), message
+
+
+class GameServer:
+    # Accepts clients and runs their games concurrently, all in one event loop
+
+    def __init__(self, host="127.0.0.1", port=0, size=None, fleet=None, turn_timeout=60.0,
+                 join_timeout=10.0, compact=True, recorder=None, pair_timeout=60.0):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.fleet = fleet
+        self.turn_timeout = turn_timeout
+        self.join_timeout = join_timeout
+        # Seconds a client waits for another client to play with
+        self.pair_timeout = pair_timeout
+        self.compact = compact
+        self.recorder = recorder
+        self.sessions = {}
+        self.games_played = 0
+        self._numbers = itertools.count()
+        self._waiting = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port, limit=LINE_LIMIT)
+        # With port 0 the system picks a free port
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _handle_client(self, reader, writer):
+        connection = Connection(reader, writer)
+        try:
+            message = await connection.receive(self.join_timeout)
+        except (asyncio.TimeoutError, ClientGone):
+            connection.close()
+            return
+        opponent = message.get("opponent", "computer") if message.get("type") == "join" else None
+        if opponent in strategies.names(interactive=False):
+            await self._run_session([connection, None], opponent)
+        elif opponent == "human":
+            if self._waiting is None or self._waiting[0].reader.at_eof():
+                if self._waiting is not None:
+                    # The waiting client left: its handler is released and its connection closed
+                    stale, stale_done = self._waiting
+                    stale.close()
+                    if not stale_done.done():
+                        stale_done.set_result(None)
+                # The first client waits, the game is run by the handler of the second one
+                done = asyncio.get_running_loop().create_future()
+                self._waiting = (connection, done)
+                await connection.send({"type": "waiting"})
+                try:
+                    # Shielded: a game started just before the timeout is not cancelled
+                    await asyncio.wait_for(asyncio.shield(done), self.pair_timeout)
+                except asyncio.TimeoutError:
+                    if self._waiting is not None and self._waiting[0] is connection:
+                        self._waiting = None
+                        try:
+                            await connection.send({"type": "error", "message": "No opponent found."})
+                        except ClientGone:
+                            pass
+                        connection.close()
+                    elif not done.done():
+                        # Paired in the meantime: the game is played by the other handler
+                        await done
+                return
+            (first, done), self._waiting = self._waiting, None
+            try:
+                await self._run_session([first, connection])
+            finally:
+                done.set_result(None)
+        else:
+            await connection.send({"type": "error", "message": "Expected a join message."})
+            connection.close()
+
+    async def _run_session(self, seats, strategy="computer"):
+        number = next(self._numbers)
+        session = Session(number, seats, self.size, self.fleet, self.turn_timeout, self.compact, self.recorder, strategy)
+        self.sessions[number] = session
+        try:
+            await session.run()
+        finally:
+            del self.sessions[number]
+            self.games_played += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Battleship game server (JSON lines over TCP).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=8765)
+    parser.add_argument("--size", type=int, default=None, help="board size (default: 10)")
+    parser.add_argument("--turn-timeout", type=float, default=60.0, help="seconds a client has to fire a shot")
+    args = parser.parse_args(argv)
+    server = GameServer(args.host, args.port, size=args.size, turn_timeout=args.turn_timeout)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
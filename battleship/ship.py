@@ -1,12 +1,36 @@
 class Ship:
+    # Slots instead of a __dict__, since large simulations keep many ships alive
+    __slots__ = ("name", "length", "position", "cells_left", "_origin", "_cells", "_hit_bits")
 
     def __init__(self, name, length, position):
         self.name = name
         self.length = length
-        self.hits = set()
         if not isinstance(position, set):
             raise TypeError('position must be a set')
         self.position = frozenset(position)  # Position never changes
+        # Number of cells not hit yet, so that is_sunk does not compare sets
+        self.cells_left = len(self.position)
+        # Hits are stored as bits: bit i is the i-th cell of the ship in sorted order.
+        # For a straight ship that is the distance from the first cell (_origin); other shapes
+        # look the cell up in the sorted cells
+        cells = tuple(sorted(self.position))
+        straight = all(cell[0] - cells[0][0] + cell[1] - cells[0][1] == i
+                       and (cell[0] == cells[0][0] or cell[1] == cells[0][1])
+                       for i, cell in enumerate(cells))
+        self._origin = cells[0] if cells and straight else None
+        self._cells = None if straight else cells
+        self._hit_bits = 0
+
+    @property
+    def hits(self):
+        # The coordinates of the ship that have been hit
+        return {coordinate for coordinate in self.position if self._hit_bits >> self._offset(coordinate) & 1}
+
+    def _offset(self, coordinate):
+        origin = self._origin
+        if origin is not None:
+            return coordinate[0] - origin[0] + coordinate[1] - origin[1]
+        return self._cells.index(coordinate)
 
     def check_coordinates(self):
         # Check whether the number of coordinates is equal to length
@@ -20,16 +44,20 @@ class Ship:
     def register_hit(self, coordinate):
         # Returns True if the ship has been hit, otherwise False
         if coordinate in self.position:
-            self.hits.add(coordinate)
+            bit = 1 << self._offset(coordinate)
+            if not self._hit_bits & bit:
+                self._hit_bits |= bit
+                self.cells_left -= 1
             return True
         else:
             return False
 
     def is_sunk(self):
-        return self.position == self.hits
+        return self.cells_left == 0
 
 # The ship types belonging to the fleet
 class Battleship(Ship):
+    __slots__ = ()
     LENGTH = 4
     def __init__(self, position):
         # Takes the method from parent class
@@ -39,19 +67,34 @@ class Battleship(Ship):
         self.check_coordinates()
 
 class Cruiser(Ship):
+    __slots__ = ()
     LENGTH = 3
     def __init__(self, position):
         super().__init__("Cruiser", Cruiser.LENGTH, position)
         self.check_coordinates()
 
 class Destroyer(Ship):
+    __slots__ = ()
     LENGTH = 2
     def __init__(self, position):
         super().__init__("Destroyer", Destroyer.LENGTH, position)
         self.check_coordinates()
 
 class Submarine(Ship):
+    __slots__ = ()
     LENGTH = 1
     def __init__(self, position):
         super().__init__("Submarine", Submarine.LENGTH, position)
         self.check_coordinates()
+
+
+def ship_types():
+    # All ship types known to the program (including those defined elsewhere), by class name.
+    # Used to find a ship type again from a saved or transmitted name
+    types = {}
+    pending = [Ship]
+    while pending:
+        for subclass in pending.pop().__subclasses__():
+            types[subclass.__name__] = subclass
+            pending.append(subclass)
+    return types
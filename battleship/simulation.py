@@ -0,0 +1,77 @@
+from battleship import strategies
+from battleship.board import MISS, HIT, SUNK, INVALID
+from battleship.player import ComputerPlayer
+from typing import NamedTuple
+
+class GameStats(NamedTuple):
+    # Summary of one headless game. Per-player values are (first, second) tuples
+    winner: int
+    turns: int
+    shots: tuple
+    hits: tuple
+    misses: tuple
+
+    @property
+    def shots_to_win(self):
+        # Number of shots fired by the winner
+        return self.shots[self.winner]
+
+
+def play_headless(first, second, max_turns=None, recorder=None):
+    # Plays a full game between two Player instances without printing or reading input
+    # The first player starts, exactly as the human does in Game.
+    # Every shot is passed to the recorder (e.g. a battleship.replay.ReplayWriter), if given
+    first.place_fleet()
+    second.place_fleet()
+    if recorder is not None:
+        recorder.start_game((first.board, second.board))
+    players = (first, second)
+    boards = (second.board, first.board) # The board each player shoots at
+    shots = [0, 0]
+    hits = [0, 0]
+    misses = [0, 0]
+    if max_turns is None:
+        # Every cell of both boards can be shot at once, anything beyond is a stuck strategy
+        max_turns = 2 * first.board.SIZE * first.board.SIZE + 2 * second.board.SIZE * second.board.SIZE
+    current = 0
+    turns = 0
+    while True:
+        turns += 1
+        if turns > max_turns:
+            raise RuntimeError("Game did not finish within the maximum number of turns.")
+        shooter = players[current]
+        board = boards[current]
+        # Same semantics as Game.play_turn, with cell numbers and result codes instead of strings
+        cell = shooter.choose_cell()
+        code, sunk_length = board.fire_at_cell(cell)
+        shots[current] += 1
+        if recorder is not None and code != INVALID:
+            # (an invalid shot has no cell number: its coordinates are not known here)
+            recorder.record(current, divmod(cell, board.SIZE), code, sunk_length)
+        # "Invalid" and "Repeat" are passed on too but do not change the board
+        shooter.observe(cell, code, sunk_length)
+        if code == MISS:
+            misses[current] += 1
+        elif code == HIT:
+            hits[current] += 1
+        elif code == SUNK:
+            hits[current] += 1
+            if board.all_ships_sunk():
+                return GameStats(current, turns, tuple(shots), tuple(hits), tuple(misses))
+        current = 1 - current
+
+
+def iter_games(n_games, first_factory=ComputerPlayer, second_factory=ComputerPlayer, recorder=None):
+    # Lazily plays n_games games, building fresh players with the given factories each time
+    # A factory can also be the name of a registered strategy
+    if isinstance(first_factory, str):
+        first_factory = strategies.get(first_factory)
+    if isinstance(second_factory, str):
+        second_factory = strategies.get(second_factory)
+    for _ in range(n_games):
+        yield play_headless(first_factory(), second_factory(), recorder=recorder)
+
+
+def simulate_games(n_games, first_factory=ComputerPlayer, second_factory=ComputerPlayer, recorder=None):
+    # Plays n_games games and returns the list of their GameStats
+    return list(iter_games(n_games, first_factory, second_factory, recorder))
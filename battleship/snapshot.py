@@ -0,0 +1,316 @@
+from battleship.bitboard import BitBoard, neighbour_mask
+from battleship.board import Board
+from battleship.cache import TranspositionCache
+from battleship.density import DensityPlayer
+from battleship.game import Game
+from battleship.player import HumanPlayer, ComputerPlayer, CellPool, CellSet
+from battleship.ship import ship_types
+import struct
+
+# Binary snapshot of a game, so that it can be saved and resumed later.
+# Sets of cells are stored as bitmasks (one bit per cell, cell = row * size + column),
+# and every integer has a fixed width, so a 10x10 game takes a few hundred bytes
+# (plus 2.5 kB for each random generator state that is included).
+#
+# Layout (version 2), all integers little-endian:
+#   b"BSNP", version u8, size u16, fleet, round u32, current player u8, then two players
+#   fleet:  number of ship types u8, then per type: name length u8, name, count u16
+#   player: kind u8, compact u8, board, opponent view (hits, misses, unknown), kind-specific state
+#   computer players end with their transposition cache: none, shared or own u8, the maximum
+#           number of entries u32 and the state hash u64 (the entries themselves are not saved)
+#   board:  backend u8, number of ships u16, per ship: type u8, first cell u16, orientation u8,
+#           then the hits and misses masks
+
+MAGIC = b"BSNP"
+VERSION = 2
+
+_HUMAN, _COMPUTER, _DENSITY = range(3)
+_ORIENTATIONS = (None, "H", "V")
+_MODES = ("hunt", "target")
+_NO_CELL = 0xFFFF
+_NO_CACHE, _SHARED_CACHE, _OWN_CACHE = range(3)
+
+
+class _Writer:
+
+    def __init__(self, size):
+        self.size = size
+        self.n_bytes = (size * size + 7) // 8
+        self.parts = []
+
+    def pack(self, fmt, *values):
+        self.parts.append(struct.pack("<" + fmt, *values))
+
+    def mask(self, cells):
+        # A set of cells (or a bitmask) as a fixed number of bytes
+        if isinstance(cells, int):
+            mask = cells
+        else:
+            mask = 0
+            for row, column in cells:
+                mask |= 1 << (row * self.size + column)
+        self.parts.append(mask.to_bytes(self.n_bytes, "little"))
+
+    def cell_list(self, cells):
+        # An ordered list of cells, for containers whose order matters
+        cells = list(cells)
+        self.pack("H", len(cells))
+        self.pack(f"{len(cells)}H", *(row * self.size + column for row, column in cells))
+
+    def rng_state(self, rng):
+        version, internal, gauss = rng.getstate()
+        self.pack("B", version)
+        self.pack(f"{len(internal)}I", *internal)
+        self.pack("?d", gauss is not None, 0.0 if gauss is None else gauss)
+
+    def getvalue(self):
+        return b"".join(self.parts)
+
+
+class _Reader:
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+        self.size = None
+
+    def unpack(self, fmt):
+        values = struct.unpack_from("<" + fmt, self.data, self.offset)
+        self.offset += struct.calcsize("<" + fmt)
+        return values
+
+    def u8(self):
+        return self.unpack("B")[0]
+
+    def u16(self):
+        return self.unpack("H")[0]
+
+    def mask(self):
+        n_bytes = (self.size * self.size + 7) // 8
+        mask = int.from_bytes(self.data[self.offset:self.offset + n_bytes], "little")
+        self.offset += n_bytes
+        return mask
+
+    def cells(self):
+        # The cells of a mask, in row order
+        mask = self.mask()
+        return [divmod(bit, self.size) for bit in range(self.size * self.size) if mask >> bit & 1]
+
+    def cell_list(self):
+        n_cells = self.u16()
+        return [divmod(cell, self.size) for cell in self.unpack(f"{n_cells}H")]
+
+    def rng_state(self):
+        version = self.u8()
+        internal = self.unpack("625I")
+        has_gauss, gauss = self.unpack("?d")
+        return (version, internal, gauss if has_gauss else None)
+
+
+def dumps(game, include_rng=True):
+    # Encodes a Game as bytes. The computer's random generator state is included by default,
+    # so that the loaded game continues exactly as the original one would
+    size = game.human.board.SIZE
+    if size > 255:
+        raise ValueError("Snapshots support boards up to 255x255.")
+    writer = _Writer(size)
+    writer.parts.append(MAGIC)
+    writer.pack("BH", VERSION, size)
+    fleet = game.human.board.FLEET
+    writer.pack("B", len(fleet))
+    for ship_type, count in fleet.items():
+        name = ship_type.__name__.encode()
+        writer.pack("B", len(name))
+        writer.parts.append(name)
+        writer.pack("H", count)
+    players = (game.human, game.computer)
+    current = players.index(game.current_player) if game.current_player in players else 255
+    writer.pack("IB", game.round_number, current)
+    type_numbers = {ship_type: number for number, ship_type in enumerate(fleet)}
+    for player in players:
+        _dump_player(writer, player, type_numbers, include_rng)
+    return writer.getvalue()
+
+
+def _dump_player(writer, player, type_numbers, include_rng):
+    # Exact types only: a subclass may keep state that would be lost
+    kinds = {HumanPlayer: _HUMAN, ComputerPlayer: _COMPUTER, DensityPlayer: _DENSITY}
+    kind = kinds.get(type(player))
+    if kind is None or getattr(player, "book", None) is not None:
+        raise TypeError(f"Cannot save a player of type {type(player).__name__}.")
+    writer.pack("BB", kind, player.compact)
+    _dump_board(writer, player.board, type_numbers)
+    view = player.opponent_view
+    writer.mask(view["hits"])
+    writer.mask(view["misses"])
+    writer.mask(view["unknown"])
+    if kind == _HUMAN:
+        writer.pack(f"{len(type_numbers)}H", *(player.enemy_afloat.get(ship_type, 0) for ship_type in type_numbers))
+        return
+    hit_seed = _NO_CELL if player.hit_seed is None else player.hit_seed[0] * writer.size + player.hit_seed[1]
+    writer.pack("BHB", _MODES.index(player.mode), hit_seed, _ORIENTATIONS.index(player.orientation))
+    writer.mask(player.connected_hits)
+    writer.mask(player.candidates)
+    writer.pack("B", len(player.counter))
+    for length, count in player.counter.items():
+        writer.pack("HH", length, count)
+    # The order of the pools decides which cell a random draw picks
+    writer.cell_list(player.untried)
+    writer.cell_list(player.parity_pos)
+    if kind == _DENSITY:
+        open_hits = 0
+        for cell in player._open_hits:
+            open_hits |= 1 << cell
+        writer.mask(open_hits)
+    writer.pack("?", include_rng)
+    if include_rng:
+        writer.rng_state(player.rng)
+    cache = player.cache
+    if cache is None:
+        writer.pack("BIQ", _NO_CACHE, 0, 0)
+    else:
+        shared = cache is TranspositionCache._shared
+        writer.pack("BIQ", _SHARED_CACHE if shared else _OWN_CACHE, cache.max_entries, player.state_hash)
+
+
+def _dump_board(writer, board, type_numbers):
+    writer.pack("BH", isinstance(board, BitBoard), len(board.ships))
+    for ship in board.ships:
+        cells = sorted(ship.position)
+        first = cells[0]
+        orientation = "V" if len(cells) > 1 and cells[1][0] != first[0] else "H"
+        writer.pack("BHB", type_numbers[type(ship)], first[0] * writer.size + first[1], _ORIENTATIONS.index(orientation))
+    writer.mask(board.hits)
+    writer.mask(board.misses)
+
+
+def loads(data, rng=None):
+    # Rebuilds a Game from bytes made by dumps. The saved random state is restored into rng
+    # (the random module by default)
+    reader = _Reader(data)
+    if bytes(reader.data[:4]) != MAGIC:
+        raise ValueError("Not a Battleship snapshot.")
+    reader.offset = 4
+    version, size = reader.unpack("BH")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}.")
+    reader.size = size
+    classes = ship_types()
+    fleet = {}
+    for _ in range(reader.u8()):
+        name = bytes(reader.data[reader.offset + 1:reader.offset + 1 + reader.data[reader.offset]]).decode()
+        reader.offset += 1 + len(name)
+        if name not in classes:
+            raise ValueError(f"Unknown ship type {name}.")
+        fleet[classes[name]] = reader.u16()
+    round_number, current = reader.unpack("IB")
+    types = list(fleet)
+    game = Game(size, fleet)
+    game.human = _load_player(reader, size, fleet, types, rng)
+    game.computer = _load_player(reader, size, fleet, types, rng)
+    game.round_number = round_number
+    if current != 255:
+        players = (game.human, game.computer)
+        game.current_player = players[current]
+        game.opponent = players[1 - current]
+    return game
+
+
+def _load_player(reader, size, fleet, types, rng):
+    kind, compact = reader.unpack("BB")
+    board = _load_board(reader, size, fleet, types)
+    if kind == _HUMAN:
+        player = HumanPlayer(board=board, compact=bool(compact))
+    elif kind == _COMPUTER:
+        player = ComputerPlayer(board=board, compact=bool(compact), rng=rng)
+    elif kind == _DENSITY:
+        player = DensityPlayer(board=board, compact=bool(compact), rng=rng)
+    else:
+        raise ValueError(f"Unknown player kind {kind}.")
+    view = player.opponent_view
+    for key in ("hits", "misses", "unknown"):
+        view[key] = player._cell_set(reader.cells())
+    if kind == _HUMAN:
+        counts = reader.unpack(f"{len(types)}H")
+        player.enemy_afloat = dict(zip(types, counts))
+        return player
+    mode, hit_seed, orientation = reader.unpack("BHB")
+    player.mode = _MODES[mode]
+    player.hit_seed = None if hit_seed == _NO_CELL else divmod(hit_seed, size)
+    player.orientation = _ORIENTATIONS[orientation]
+    player.connected_hits = set(reader.cells())
+    player.candidates = set(reader.cells())
+    counter = {}
+    for _ in range(reader.u8()):
+        length, count = reader.unpack("HH")
+        counter[length] = count
+    untried = reader.cell_list()
+    parity = reader.cell_list()
+    if compact:
+        player.untried = CellSet(size, untried)
+        player.parity_pos = CellSet(size, parity)
+    else:
+        player.untried = CellPool(untried)
+        player.parity_pos = CellPool(parity)
+    if kind == _DENSITY:
+        _restore_density(player, reader.mask(), counter)
+    player.counter = counter
+    if reader.unpack("?")[0]:
+        player.rng.setstate(reader.rng_state())
+    cache, max_entries, state_hash = reader.unpack("BIQ")
+    if cache != _NO_CACHE:
+        # An own cache comes back empty, with the same size
+        player.cache = TranspositionCache.shared() if cache == _SHARED_CACHE else TranspositionCache(max_entries)
+        player.state_hash = state_hash
+    return player
+
+
+def _restore_density(player, open_hits, counter):
+    # The density only depends on the ships left, the misses and the sunk ships,
+    # so it is rebuilt by ruling out the same placements as during the game
+    for length, count in counter.items():
+        if count != player.counter[length]:
+            player._change_count(length, count - player.counter[length])
+            player.counter[length] = count
+    size = player._size
+    sunk = 0
+    for row, column in player.opponent_view["hits"]:
+        cell = row * size + column
+        if not open_hits >> cell & 1:
+            sunk |= 1 << cell
+    blocked = neighbour_mask(sunk, size)
+    for row, column in player.opponent_view["misses"]:
+        blocked |= 1 << (row * size + column)
+    while blocked:
+        low = blocked & -blocked
+        player._remove_cell(low.bit_length() - 1)
+        blocked ^= low
+    player._open_hits = {cell for cell in range(size * size) if open_hits >> cell & 1}
+
+
+def _load_board(reader, size, fleet, types):
+    backend, n_ships = reader.unpack("BH")
+    board = BitBoard(size, fleet) if backend else Board(size, fleet)
+    for _ in range(n_ships):
+        type_number, first, orientation = reader.unpack("BHB")
+        ship_type = types[type_number]
+        row, column = divmod(first, size)
+        if _ORIENTATIONS[orientation] == "H":
+            positions = [(row, column + i) for i in range(ship_type.LENGTH)]
+        else:
+            positions = [(row + i, column) for i in range(ship_type.LENGTH)]
+        board._add_ship(ship_type, positions)
+    # Firing again at the saved shots restores the ships and the fleet status too
+    for coordinate in reader.cells() + reader.cells():
+        board.fire_at(coordinate)
+    return board
+
+
+def save(game, path, include_rng=True):
+    with open(path, "wb") as file:
+        file.write(dumps(game, include_rng))
+
+
+def load(path, rng=None):
+    with open(path, "rb") as file:
+        return loads(file.read(), rng)
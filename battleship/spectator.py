@@ -0,0 +1,258 @@
+from battleship import strategies
+from battleship.board import RESULT_NAMES
+from battleship.simulation import play_headless
+from collections import deque
+import argparse
+import itertools
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+# Live feed of running games for spectators, as newline-delimited JSON events.
+# Games publish through a FeedRecorder, which fits wherever a recorder is accepted (Game,
+# play_headless, simulate_games, the server). Spectators subscribe with any binary stream
+# (a pipe, a file) or connect to a SpectatorServer over TCP or a Unix socket.
+#
+# Events:
+#   {"type":"start","game":3,"size":10,"ships":[[[[0,0],[0,1]], ...], [...]]}
+#                                   ships of player 0 and player 1 (when the boards are known)
+#   {"type":"shot","game":3,"player":0,"cell":[1,6],"result":"Hit","sunk":null}
+#   {"type":"game_over","game":3,"winner":0}
+#   {"type":"dropped","count":12}   the spectator was too slow and missed 12 events
+# A spectator draws the boards from the ships of the start event and the shots.
+#
+# Publishing never waits for a spectator: each one has a bounded queue emptied by its own
+# writer thread, and events that do not fit in a full queue are dropped (and counted) for
+# that spectator only. Without spectators, events are not even encoded.
+
+
+class Subscriber:
+    # One spectator: a queue of encoded events and the thread writing them to the stream
+
+    def __init__(self, stream, max_pending=10000, owns_stream=False):
+        self.stream = stream
+        self.max_pending = max_pending
+        # Close the stream when done (e.g. the file of a socket)
+        self.owns_stream = owns_stream
+        self.dropped = 0
+        self.closed = False
+        self._queue = deque()
+        self._missed = 0
+        self._closing = False
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def push(self, line):
+        if self.closed:
+            return
+        if len(self._queue) >= self.max_pending:
+            self._missed += 1
+            self.dropped += 1
+            return
+        self._queue.append(line)
+        if not self._ready.is_set():
+            self._ready.set()
+
+    def _run(self):
+        queue = self._queue
+        while not self.closed:
+            self._ready.wait()
+            self._ready.clear()
+            parts = []
+            while queue:
+                parts.append(queue.popleft())
+            # The events missed while the queue was full come after the ones written now
+            missed, self._missed = self._missed, 0
+            if missed:
+                parts.append(_encode({"type": "dropped", "count": missed}))
+            if parts:
+                try:
+                    self.stream.write(b"".join(parts))
+                    self.stream.flush()
+                except (OSError, ValueError):
+                    # The spectator went away (ValueError: the stream was closed)
+                    self.closed = True
+            if self._closing and not queue:
+                self.closed = True
+        if self.owns_stream:
+            try:
+                self.stream.close()
+            except OSError:
+                pass
+
+    def close(self, timeout=1.0):
+        # Writes what is still queued (waiting at most timeout seconds), then stops
+        self._closing = True
+        self._ready.set()
+        self._thread.join(timeout)
+
+
+def _encode(event):
+    return (json.dumps(event, separators=(",", ":")) + "\n").encode()
+
+
+class Feed:
+
+    def __init__(self, max_pending=10000):
+        # Events queued per spectator before its new events are dropped
+        self.max_pending = max_pending
+        # Replaced, never changed in place, so that publish can run while spectators join
+        self.subscribers = ()
+        self._lock = threading.Lock()
+        self._games = itertools.count()
+
+    def subscribe(self, stream, owns_stream=False, max_pending=None):
+        # max_pending: queue size of this spectator, if not the one of the feed
+        subscriber = Subscriber(stream, max_pending or self.max_pending, owns_stream)
+        with self._lock:
+            self.subscribers = self.subscribers + (subscriber,)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self.subscribers = tuple(other for other in self.subscribers if other is not subscriber)
+        subscriber.close()
+
+    def publish(self, event):
+        subscribers = self.subscribers
+        if not subscribers:
+            return
+        line = _encode(event)
+        for subscriber in subscribers:
+            if subscriber.closed:
+                self.unsubscribe(subscriber)
+            else:
+                subscriber.push(line)
+
+    def new_game(self):
+        # Number of the next game published to this feed
+        return next(self._games)
+
+    def recorder(self):
+        return FeedRecorder(self)
+
+    def close(self):
+        for subscriber in self.subscribers:
+            subscriber.close()
+        self.subscribers = ()
+
+
+class FeedRecorder:
+    # The recorder interface of Game and play_headless (start_game, record), publishing to a feed.
+    # One recorder follows one game at a time: games played at the same time need one each
+
+    def __init__(self, feed):
+        self.feed = feed
+        self.game = None
+        self.boards = None
+        # Ships sunk by each player in the current game
+        self.sunk = [0, 0]
+
+    def start_game(self, boards=None):
+        self.game = self.feed.new_game()
+        self.boards = boards
+        self.sunk = [0, 0]
+        event = {"type": "start", "game": self.game}
+        if boards is not None:
+            event["size"] = boards[0].SIZE
+            event["ships"] = [[sorted(ship.position) for ship in board.ships] for board in boards]
+        self.feed.publish(event)
+        return self.game
+
+    def record(self, shooter, coordinates, result, sunk_length=None):
+        # result is a name as returned by Board.fire_at ("Miss", "Hit", ...) or an integer code
+        name = RESULT_NAMES[result] if isinstance(result, int) else result.capitalize()
+        self.feed.publish({"type": "shot", "game": self.game, "player": shooter, "cell": list(coordinates),
+                           "result": name, "sunk": sunk_length or None})
+        if name == "Sunk" and self.boards is not None:
+            # Counted rather than read from the board, which may already be further into the game
+            # (the server records a game once it is over)
+            self.sunk[shooter] += 1
+            if self.sunk[shooter] == len(self.boards[1 - shooter].ships):
+                self.feed.publish({"type": "game_over", "game": self.game, "winner": shooter})
+
+
+class SpectatorServer:
+    # Accepts spectators on a TCP port, or on a Unix socket if a path is given, and subscribes
+    # each of them to the feed. Spectators only read: anything they send is ignored
+
+    def __init__(self, feed, host="127.0.0.1", port=0, path=None):
+        self.feed = feed
+        self.path = path
+        if path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.bind(path)
+            self._socket.listen()
+        else:
+            self._socket = socket.create_server((host, port))
+        self.address = self._socket.getsockname()
+        # accept() wakes up regularly to notice close()
+        self._socket.settimeout(0.2)
+        self._running = True
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    def _accept(self):
+        while self._running:
+            try:
+                connection, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            connection.settimeout(None)
+            # The file keeps the connection open until the subscriber closes it
+            stream = connection.makefile("wb")
+            connection.close()
+            self.feed.subscribe(stream, owns_stream=True)
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        self._socket.close()
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream simulated Battleship games to spectators.")
+    parser.add_argument("-n", "--games", type=int, default=100, help="number of games to play")
+    choices = strategies.names(interactive=False)
+    parser.add_argument("--first", default="computer", choices=choices, help="strategy of the first player")
+    parser.add_argument("--second", default="computer", choices=choices, help="strategy of the second player")
+    parser.add_argument("-p", "--port", type=int, default=8766, help="TCP port for spectators")
+    parser.add_argument("--unix", help="listen on this Unix socket instead of a TCP port")
+    parser.add_argument("--stdout", action="store_true", help="write the events to standard output instead")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds between two games")
+    args = parser.parse_args(argv)
+    feed = Feed()
+    server = None
+    if args.stdout:
+        feed.subscribe(sys.stdout.buffer)
+    else:
+        server = SpectatorServer(feed, port=args.port, path=args.unix)
+        print(f"Spectators can connect to {server.address}", file=sys.stderr)
+    recorder = feed.recorder()
+    try:
+        for _ in range(args.games):
+            play_headless(strategies.create(args.first), strategies.create(args.second), recorder=recorder)
+            if args.delay:
+                time.sleep(args.delay)
+    finally:
+        feed.close()
+        if server is not None:
+            server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from battleship.density import DensityPlayer
+from battleship.montecarlo import MonteCarloPlayer
+from battleship.player import HumanPlayer, ComputerPlayer
+from functools import partial
+
+# Player strategies by name, so that the game, the simulations and the command line tools
+# can choose them. A strategy is a factory (usually a Player subclass) accepting the keyword
+# arguments board, size, fleet and compact, and returning a Player.
+# Interactive strategies need someone at the terminal and are left out of headless play.
+
+_STRATEGIES = {}
+_INTERACTIVE = set()
+
+
+def register(name, factory=None, interactive=False):
+    # Adds a strategy. Can also be used as a class decorator: @register("name")
+    if factory is None:
+        return lambda factory: register(name, factory, interactive)
+    if name in _STRATEGIES and _STRATEGIES[name] is not factory:
+        raise ValueError(f"Strategy '{name}' is already registered.")
+    _STRATEGIES[name] = factory
+    if interactive:
+        _INTERACTIVE.add(name)
+    return factory
+
+
+def get(name):
+    try:
+        return _STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown strategy '{name}'.") from None
+
+
+def create(name, **options):
+    # A new player of the named strategy, e.g. create("density", size=12)
+    return get(name)(**options)
+
+
+def names(interactive=True):
+    # Sorted names of the registered strategies (without the interactive ones if interactive=False)
+    return sorted(name for name in _STRATEGIES if interactive or name not in _INTERACTIVE)
+
+
+register("human", HumanPlayer, interactive=True)
+register("computer", ComputerPlayer)
+# The computer player opening with the shipped book
+register("book", partial(ComputerPlayer, book="default"))
+register("density", DensityPlayer)
+register("montecarlo", MonteCarloPlayer)
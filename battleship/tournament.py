@@ -0,0 +1,124 @@
+from battleship import strategies
+from battleship.simulation import play_headless
+from collections import Counter
+from multiprocessing import Pool
+import argparse
+import os
+import random
+
+# Number of games handed to a worker at once
+CHUNK_SIZE = 1000
+
+
+class TournamentResult:
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        self.games = 0
+        self.wins = [0, 0]
+        # Histogram of shots needed to win, one per strategy
+        self.shots_to_win = [Counter(), Counter()]
+
+    def add_game(self, winner, shots_to_win):
+        self.games += 1
+        self.wins[winner] += 1
+        self.shots_to_win[winner][shots_to_win] += 1
+
+    def merge(self, other):
+        # Add the games of another (partial) result to this one
+        self.games += other.games
+        for i in range(2):
+            self.wins[i] += other.wins[i]
+            self.shots_to_win[i].update(other.shots_to_win[i])
+        return self
+
+    def win_rate(self, index):
+        if self.games == 0:
+            return 0.0
+        return self.wins[index] / self.games
+
+    def mean_shots_to_win(self, index):
+        if self.wins[index] == 0:
+            return None
+        histogram = self.shots_to_win[index]
+        return sum(shots * count for shots, count in histogram.items()) / self.wins[index]
+
+    def summary(self):
+        # Human readable report of the tournament
+        lines = [f"Games played: {self.games}"]
+        for i, name in enumerate(self.names):
+            mean = self.mean_shots_to_win(i)
+            mean_string = "-" if mean is None else f"{mean:.2f}"
+            lines.append(f"{name} (player {i + 1}): wins {self.wins[i]} "
+                         f"({100 * self.win_rate(i):.1f}%), mean shots to win {mean_string}")
+        lines.append("Shots to win histogram:")
+        shots = sorted(set(self.shots_to_win[0]) | set(self.shots_to_win[1]))
+        for n in shots:
+            lines.append(f"{n:>4}: " + "  ".join(f"{self.shots_to_win[i][n]:>8}" for i in range(2)))
+        return "\n".join(lines)
+
+
+def _play_chunk(task):
+    # Worker entry point: plays a chunk of games with its own seed
+    names, start, n_games, seed = task
+    factories = [strategies.get(name) for name in names]
+    # Seeding per chunk (and not per process) makes the result independent of the number of workers
+    random.seed(seed)
+    result = TournamentResult(names)
+    for game in range(start, start + n_games):
+        # The two strategies alternate who shoots first
+        swap = game % 2 == 1
+        if swap:
+            stats = play_headless(factories[1](), factories[0]())
+            result.add_game(1 - stats.winner, stats.shots_to_win)
+        else:
+            stats = play_headless(factories[0](), factories[1]())
+            result.add_game(stats.winner, stats.shots_to_win)
+    return result
+
+
+def _chunk_tasks(names, n_games, seed, chunk_size):
+    tasks = []
+    for index, start in enumerate(range(0, n_games, chunk_size)):
+        n_chunk = min(chunk_size, n_games - start)
+        tasks.append((tuple(names), start, n_chunk, f"{seed}:{index}"))
+    return tasks
+
+
+def run_tournament(first, second, n_games, workers=None, seed=0, chunk_size=CHUNK_SIZE):
+    # Plays n_games between two named strategies, spread over a pool of processes
+    for name in (first, second):
+        # Any registered strategy that does not need a terminal
+        if name not in strategies.names(interactive=False):
+            raise ValueError(f"Unknown strategy '{name}'.")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = _chunk_tasks((first, second), n_games, seed, chunk_size)
+    result = TournamentResult((first, second))
+    if workers <= 1 or len(tasks) <= 1:
+        # No need to pay for process start-up
+        for task in tasks:
+            result.merge(_play_chunk(task))
+        return result
+    with Pool(processes=workers) as pool:
+        for partial in pool.imap_unordered(_play_chunk, tasks):
+            result.merge(partial)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a computer-vs-computer Battleship tournament.")
+    parser.add_argument("first", nargs="?", default="computer", choices=strategies.names(interactive=False))
+    parser.add_argument("second", nargs="?", default="computer", choices=strategies.names(interactive=False))
+    parser.add_argument("-n", "--games", type=int, default=10000, help="number of games to play")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of processes (default: all cores)")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="seed for reproducible results")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="games handed to a worker at once")
+    args = parser.parse_args(argv)
+    result = run_tournament(args.first, args.second, args.games, args.workers, args.seed, args.chunk_size)
+    print(result.summary())
+    return result
+
+
+if __name__ == "__main__":
+    main()
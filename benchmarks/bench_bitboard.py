@@ -0,0 +1,56 @@
+# Compares the bitmask board backend with the default Board
+# Run from the repository root with: python3 -m benchmarks.bench_bitboard
+from battleship.bitboard import BitBoard
+from battleship.board import Board
+from battleship.player import ComputerPlayer
+from battleship.simulation import play_headless
+import random
+import timeit
+
+
+def _placed_board(board_class):
+    board = board_class()
+    board.place_fleet()
+    return board
+
+
+def bench_place_fleet(board_class, repeat):
+    return timeit.timeit(lambda: _placed_board(board_class), number=repeat) / repeat
+
+
+def bench_fire_at(board_class, repeat):
+    # Fires at every cell of a board in random order, checking for the end of the game after each shot
+    boards = [_placed_board(board_class) for _ in range(repeat)]
+    cells = [(row, column) for row in range(Board.SIZE) for column in range(Board.SIZE)]
+    random.shuffle(cells)
+
+    def run():
+        for board in boards:
+            for coordinate in cells:
+                board.fire_at(coordinate)
+                board.all_ships_sunk()
+    return timeit.timeit(run, number=1) / (repeat * len(cells))
+
+
+def bench_game(board_class, repeat):
+    def run():
+        play_headless(ComputerPlayer(board=board_class()), ComputerPlayer(board=board_class()))
+    return timeit.timeit(run, number=repeat) / repeat
+
+
+def main(repeat=2000):
+    random.seed(0)
+    benchmarks = [
+        ("place_fleet", bench_place_fleet, repeat),
+        ("fire_at + all_ships_sunk", bench_fire_at, repeat // 10),
+        ("headless game", bench_game, repeat // 10),
+    ]
+    print(f"{'benchmark':<26}{'Board (us)':>12}{'BitBoard (us)':>15}{'speedup':>10}")
+    for name, bench, n in benchmarks:
+        board_time = bench(Board, n) * 1e6
+        bit_time = bench(BitBoard, n) * 1e6
+        print(f"{name:<26}{board_time:>12.2f}{bit_time:>15.2f}{board_time / bit_time:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
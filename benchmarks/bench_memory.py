@@ -0,0 +1,65 @@
+# Measures the memory of live games (two computer players, fleets placed, 30 shots each)
+# in the default and in the compact state mode.
+# Run from the repository root with: python3 -m benchmarks.bench_memory
+from battleship.bitboard import BitBoard
+from battleship.player import ComputerPlayer
+import gc
+import random
+import time
+import tracemalloc
+
+
+def _play_shots(shooter, target, shots):
+    for _ in range(shots):
+        coordinates = shooter.choose_shot()
+        result, ship = target.board.fire_at(coordinates)
+        shooter.register_result(coordinates, result, ship.length if result == "Sunk" else None)
+
+
+def live_games(n_games, factory, shots=30):
+    games = []
+    for _ in range(n_games):
+        first = factory()
+        second = factory()
+        first.place_fleet()
+        second.place_fleet()
+        _play_shots(first, second, shots)
+        _play_shots(second, first, shots)
+        games.append((first, second))
+    return games
+
+
+def bytes_per_game(factory, n_games):
+    # Warm the shared caches first, so they are not counted per game
+    live_games(5, factory)
+    gc.collect()
+    tracemalloc.start()
+    games = live_games(n_games, factory)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del games
+    return used / n_games
+
+
+def seconds_per_game(factory, n_games):
+    start = time.perf_counter()
+    live_games(n_games, factory)
+    return (time.perf_counter() - start) / n_games
+
+
+def main(n_games=2000):
+    random.seed(0)
+    modes = [
+        ("default", ComputerPlayer),
+        ("compact", lambda: ComputerPlayer(board=BitBoard(), compact=True)),
+    ]
+    print(f"{'mode':<10}{'bytes/game':>12}{'us/game':>10}")
+    for name, factory in modes:
+        memory = bytes_per_game(factory, n_games)
+        seconds = seconds_per_game(factory, n_games)
+        print(f"{name:<10}{memory:>12,.0f}{seconds * 1e6:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# Compares random fleet generation through Board._place_ship_randomly and through a PlacementIndex
+# Run from the repository root with: python3 -m benchmarks.bench_placement
+from battleship.board import Board
+from battleship.layouts import UniformFleetSampler
+from battleship.placement import PlacementIndex
+import random
+import timeit
+
+
+def main(repeat=5000):
+    random.seed(0)
+    index = PlacementIndex.for_board(Board())
+    uniform = UniformFleetSampler()
+
+    def current():
+        board = Board()
+        board.place_fleet()
+
+    def indexed_board():
+        index.place_fleet(Board())
+
+    cases = [
+        ("Board.place_fleet", current),
+        ("PlacementIndex.place_fleet", indexed_board),
+        ("PlacementIndex.sample_mask", index.sample_mask),
+        ("UniformFleetSampler.sample_mask", uniform.sample_mask),
+    ]
+    reference = None
+    print(f"{'method':<34}{'us/fleet':>10}{'fleets/min':>14}{'speedup':>10}")
+    for name, function in cases:
+        seconds = timeit.timeit(function, number=repeat) / repeat
+        if reference is None:
+            reference = seconds
+        print(f"{name:<34}{seconds * 1e6:>10.2f}{60 / seconds:>14,.0f}{reference / seconds:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Measures how placement, firing and the computer players scale with the board size.
+# The fleet grows with the area of the board, so that ships always cover 20% of the cells.
+# Run from the repository root with: python3 -m benchmarks.bench_scaling [sizes...]
+from battleship.board import Board
+from battleship.density import DensityPlayer
+from battleship.player import ComputerPlayer
+import random
+import sys
+import time
+
+
+def scaled_fleet(size):
+    factor = max(1, round(size * size / (Board.SIZE * Board.SIZE)))
+    return {ship_type: count * factor for ship_type, count in Board.FLEET.items()}
+
+
+def sink_fleet(player, board):
+    # One player shoots at a board until the whole fleet is sunk, returns (seconds, shots)
+    start = time.perf_counter()
+    shots = 0
+    while not board.all_ships_sunk():
+        coordinates = player.choose_shot()
+        result, ship = board.fire_at(coordinates)
+        player.register_result(coordinates, result, ship.length if result == "Sunk" else None)
+        shots += 1
+    return time.perf_counter() - start, shots
+
+
+def main(sizes=(10, 25, 50, 100)):
+    random.seed(0)
+    print(f"{'size':>5}{'ships':>7}{'place (ms)':>12}"
+          f"{'computer (ms)':>15}{'us/shot':>9}{'density (ms)':>15}{'us/shot':>9}")
+    for size in sizes:
+        fleet = scaled_fleet(size)
+        start = time.perf_counter()
+        board = Board(size, fleet)
+        board.place_fleet()
+        place = time.perf_counter() - start
+        row = f"{size:>5}{sum(fleet.values()):>7}{place * 1e3:>12.2f}"
+        for player_class in (ComputerPlayer, DensityPlayer):
+            target = Board(size, fleet)
+            target.place_fleet()
+            # Building the player (and its tables) is part of the cost
+            start = time.perf_counter()
+            player = player_class(size=size, fleet=fleet)
+            setup = time.perf_counter() - start
+            seconds, shots = sink_fleet(player, target)
+            row += f"{(setup + seconds) * 1e3:>15.1f}{seconds / shots * 1e6:>9.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or (10, 25, 50, 100))
@@ -0,0 +1,297 @@
+# Benchmark suite: micro-benchmarks of the hot paths (fleet placement, firing, the computer
+# player, board drawing) and full headless games, kept apart from the correctness tests.
+# Results are printed and can be written as JSON. They are compared with a baseline recorded on
+# the same machine (benchmarks/baseline.json by default, not versioned: timings depend on the
+# machine): a benchmark slower than its baseline by more than the tolerance is reported as a
+# regression and the exit status is 1. Without a baseline nothing is compared.
+# Run from the repository root with: python3 -m benchmarks.run [--output results.json] [--save-baseline]
+from battleship.board import Board
+from battleship.game import Game
+from battleship.player import ComputerPlayer
+from battleship.density import DensityPlayer
+from battleship.events import NullSink
+from battleship.render import TerminalRenderer
+from battleship.ship import Cruiser
+from battleship.simulation import play_headless
+from benchmarks.bench_scaling import scaled_fleet
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Benchmarks by name: (function, number of operations per round, unit of an operation).
+# A function takes the number of operations and returns a callable performing them
+BENCHMARKS = {}
+
+
+def benchmark(name, number, unit):
+    def register(function):
+        BENCHMARKS[name] = (function, number, unit)
+        return function
+    return register
+
+
+def _placed_board():
+    board = Board()
+    board.place_fleet()
+    return board
+
+
+@benchmark("place_fleet", 500, "fleet")
+def bench_place_fleet(number):
+    def run():
+        for _ in range(number):
+            Board().place_fleet()
+    return run
+
+
+@benchmark("fire_at", 50, "shot")
+def bench_fire_at(number):
+    # Every cell of `number` boards, in random order (the boards are prepared before the timing)
+    cells = [(row, column) for row in range(Board.SIZE) for column in range(Board.SIZE)]
+    random.shuffle(cells)
+    rounds = []
+
+    def run():
+        for board in rounds.pop():
+            for coordinate in cells:
+                board.fire_at(coordinate)
+    # Fresh boards for every round, made outside of the timing
+    run.setup = lambda: rounds.append([_placed_board() for _ in range(number)])
+    run.operations = len(cells)
+    return run
+
+
+@benchmark("place_fleet (50x50, dense)", 5, "fleet")
+def bench_place_large_fleet(number):
+    # 250 ships covering 20% of the board
+    fleet = scaled_fleet(50)
+
+    def run():
+        for _ in range(number):
+            Board(50, fleet).place_fleet()
+    return run
+
+
+@benchmark("place_ship check (50x50, dense)", 2, "check")
+def bench_placement_checks(number):
+    # Manual placement: a cruiser tried at every start and orientation of boards with a dense fleet
+    fleet = scaled_fleet(50)
+    starts = [(row, column) for row in range(50) for column in range(50)]
+    rounds = []
+
+    def prepare():
+        boards = []
+        for _ in range(number):
+            board = Board(50, fleet)
+            board.place_fleet()
+            boards.append(board)
+        rounds.append(boards)
+
+    def run():
+        for board in rounds.pop():
+            for start in starts:
+                board.place_ship(Cruiser, start, "H")
+                board.place_ship(Cruiser, start, "V")
+    run.setup = prepare
+    run.operations = 2 * len(starts)
+    return run
+
+
+@benchmark("choose_shot + register_result", 50, "game")
+def bench_computer_move(number):
+    # A computer player sinks `number` fleets, one shot at a time (about 90 shots per fleet)
+    rounds = []
+
+    def prepare():
+        rounds.append([(ComputerPlayer(), _placed_board()) for _ in range(number)])
+
+    def run():
+        for player, board in rounds.pop():
+            while not board.all_ships_sunk():
+                coordinates = player.choose_shot()
+                result, ship = board.fire_at(coordinates)
+                player.register_result(coordinates, result, ship.length if result == "Sunk" else None)
+    run.setup = prepare
+    return run
+
+
+@benchmark("draw_boards", 200, "board")
+def bench_draw_boards(number):
+    # A board with its fleet shown and half of its cells shot at
+    game = Game()
+    board = _placed_board()
+    cells = [(row, column) for row in range(Board.SIZE) for column in range(Board.SIZE)]
+    random.shuffle(cells)
+    for coordinate in cells[:len(cells) // 2]:
+        board.fire_at(coordinate)
+
+    def run():
+        for _ in range(number):
+            game.draw_boards(board, True, board.hits, board.misses)
+    return run
+
+
+@benchmark("draw_boards (50x50)", 20, "board")
+def bench_draw_large_board(number):
+    game = Game(size=50)
+    board = game.human.board
+
+    def run():
+        for _ in range(number):
+            game.draw_boards(board, True, board.hits, board.misses)
+    return run
+
+
+@benchmark("render frame (50x50)", 200, "frame")
+def bench_render_frame(number):
+    # Frames of the incremental renderer, with one new shot on each of two 50x50 boards per frame
+    game = Game(size=50, renderer=TerminalRenderer(stream=io.StringIO(), height=80))
+    game.human.place_fleet()
+    game.renderer.render()
+    cells = [(row, column) for row in range(50) for column in range(50)]
+    random.shuffle(cells)
+    # Repeated shots (once every cell was used) change nothing, and make frames even cheaper
+    shots = itertools.cycle(cells)
+
+    def run():
+        for _ in range(number):
+            game.human.board.fire_at(next(shots))
+            game.human.opponent_view["misses"].add(next(shots))
+            game.renderer.frame()
+    return run
+
+
+def _game_turns(number, sink):
+    # Full games of Game between two computers (the same games in every round), per turn.
+    # The terminal output goes to memory: this is the cost of the presentation, not of the terminal
+    def run():
+        random.seed(1)
+        turns = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(number):
+                game = Game(human="computer", sink=sink)
+                game.play_game()
+                turns += game.round_number
+        run.operations = turns / number
+    return run
+
+
+@benchmark("game turn (terminal sink)", 10, "turn")
+def bench_terminal_turn(number):
+    return _game_turns(number, None)
+
+
+@benchmark("game turn (null sink)", 10, "turn")
+def bench_null_turn(number):
+    return _game_turns(number, NullSink())
+
+
+@benchmark("headless game (computer)", 20, "game")
+def bench_game(number):
+    def run():
+        for _ in range(number):
+            play_headless(ComputerPlayer(), ComputerPlayer())
+    return run
+
+
+@benchmark("headless game (density)", 10, "game")
+def bench_density_game(number):
+    def run():
+        for _ in range(number):
+            play_headless(DensityPlayer(), DensityPlayer())
+    return run
+
+
+def run_benchmarks(names=None, rounds=5, scale=1.0, seed=0):
+    # Seconds per operation of each benchmark (the best of `rounds` rounds)
+    results = {}
+    for name, (function, number, unit) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        random.seed(seed)
+        number = max(1, int(number * scale))
+        run = function(number)
+        setup = getattr(run, "setup", None)
+        times = []
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            times.append(timeit.timeit(run, number=1))
+        operations = number * getattr(run, "operations", 1)
+        results[name] = {"seconds": min(times) / operations, "unit": unit}
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # (name, ratio to the baseline or None, regression) for every result
+    rows = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            rows.append((name, None, False))
+            continue
+        ratio = result["seconds"] / reference["seconds"]
+        rows.append((name, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def _document(results):
+    return {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Battleship benchmark suite.")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file, recorded on this machine")
+    parser.add_argument("--save-baseline", "--update-baseline", dest="save_baseline", action="store_true",
+                        help="store the results as the baseline of this machine")
+    parser.add_argument("-t", "--tolerance", type=float, default=0.25, help="allowed slowdown (0.25: 25%%)")
+    parser.add_argument("-r", "--rounds", type=int, default=5, help="rounds per benchmark, the best one counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="factor for the operations per round")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)} (available: {', '.join(BENCHMARKS)})")
+
+    results = run_benchmarks(args.names, args.rounds, args.scale)
+    baseline = load_baseline(args.baseline)
+    rows = compare(results, baseline, args.tolerance)
+    print(f"{'benchmark':<32}{'us/op':>12}  {'unit':<6}{'vs baseline':>13}")
+    for name, ratio, regression in rows:
+        change = "-" if ratio is None else f"{ratio:.2f}x"
+        flag = "  REGRESSION" if regression else ""
+        print(f"{name:<32}{results[name]['seconds'] * 1e6:>12.2f}  {results[name]['unit']:<6}{change:>13}{flag}")
+    if not baseline and not args.save_baseline:
+        print(f"No baseline in {args.baseline}: record one on this machine with --save-baseline")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(_document(results), file, indent=2)
+    if args.save_baseline:
+        # Benchmarks that were not run keep their old baseline
+        merged = dict(baseline)
+        merged.update(results)
+        with open(args.baseline, "w") as file:
+            json.dump(_document(merged), file, indent=2)
+        return 0
+    return 1 if any(regression for _, _, regression in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
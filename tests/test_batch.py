@@ -0,0 +1,48 @@
+import pytest
+import random
+np = pytest.importorskip("numpy")
+from battleship.batch import BatchBoards
+from battleship.board import Board, RESULT_CODES
+
+def _scalar_results(boards, shots):
+    codes = []
+    lengths = []
+    for board, (row, column) in zip(boards, shots):
+        result, ship = board.fire_at((row, column))
+        codes.append(RESULT_CODES[result])
+        lengths.append(ship.length if result == "Sunk" else 0)
+    return codes, lengths
+
+def test_batch_matches_scalar_board_on_random_games():
+    rng = random.Random(7)
+    boards = []
+    for _ in range(50):
+        B = Board()
+        B.place_fleet()
+        boards.append(B)
+    batch = BatchBoards.from_boards(boards)
+    for _ in range(150):
+        # Some shots are outside the grid, many are repeated
+        shots = [(rng.randrange(-1, 11), rng.randrange(-1, 11)) for _ in boards]
+        expected_codes, expected_lengths = _scalar_results(boards, shots)
+        rows, columns = np.array(shots).T
+        codes, lengths = batch.fire(rows, columns)
+        assert codes.tolist() == expected_codes
+        assert lengths.tolist() == expected_lengths
+        assert batch.all_ships_sunk().tolist() == [B.all_ships_sunk() for B in boards]
+
+def test_batch_fires_on_a_subset_of_games():
+    batch = BatchBoards(4).place_fleets(random.Random(1))
+    games = np.array([1, 3])
+    codes, _ = batch.fire(np.array([0, 0]), np.array([0, 0]), games)
+    assert len(codes) == 2
+    assert batch.shot[:, 0].tolist() == [False, True, False, True]
+
+def test_random_shooting_sinks_every_fleet():
+    batch = BatchBoards(30).place_fleets(random.Random(2))
+    generator = np.random.default_rng(3)
+    for _ in range(Board.SIZE * Board.SIZE):
+        rows, columns = batch.random_unshot_cells(generator)
+        batch.fire(rows, columns)
+    assert batch.all_ships_sunk().all()
+    assert batch.shot.all()
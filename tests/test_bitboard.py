@@ -0,0 +1,59 @@
+import pytest
+import random
+from battleship.bitboard import BitBoard, neighbour_mask, cells_to_mask, mask_to_cells
+from battleship.board import Board
+from battleship.ship import Battleship, Destroyer
+
+def test_neighbour_mask_does_not_wrap_rows():
+    # The right neighbour of the last column is not the first cell of the next row
+    mask = cells_to_mask({(0, 9)}, 10)
+    assert mask_to_cells(neighbour_mask(mask, 10), 10) == {(0, 9), (0, 8), (1, 9)}
+
+def test_bitboard_placement_follows_board_rules():
+    B = BitBoard()
+    # Edges are fine, out of bounds is not
+    assert B.place_ship(Battleship, (0, 6), "H") is True
+    assert B.place_ship(Battleship, (0, 7), "H") is False
+    # Overlap, orthogonal neighbour and diagonal neighbour
+    assert B.place_ship(Destroyer, (0, 6), "V") is False
+    assert B.place_ship(Destroyer, (1, 6), "V") is False
+    assert B.place_ship(Destroyer, (1, 5), "V") is True
+    assert B.occupied[(0, 6)].LENGTH == Battleship.LENGTH
+    with pytest.raises(TypeError):
+        B.place_ship(int, (5, 5), "H")
+
+def test_bitboard_fire_at_results():
+    B = BitBoard()
+    B.place_ship(Destroyer, (2, 2), "H")
+    assert B.fire_at((9, 9)) == ("Miss", None)
+    assert B.fire_at((9, 9)) == ("Repeat", None)
+    assert B.fire_at((10, 0)) == ("Invalid", None)
+    assert B.fire_at((2, 2)) == ("Hit", None)
+    assert not B.all_ships_sunk()
+    result, ship = B.fire_at((2, 3))
+    assert result == "Sunk" and ship.LENGTH == Destroyer.LENGTH
+    assert B.all_ships_sunk()
+    # The set views are still available
+    assert B.hits == {(2, 2), (2, 3)}
+    assert B.misses == {(9, 9)}
+
+def test_bitboard_matches_board_on_random_games():
+    # Same fleet, same shots: both backends must give the same answers
+    rng = random.Random(1)
+    for _ in range(20):
+        reference = Board()
+        reference.place_fleet()
+        B = BitBoard()
+        for ship in reference.ships:
+            cells = sorted(ship.position)
+            orientation = "H" if len(cells) == 1 or cells[0][0] == cells[1][0] else "V"
+            assert B.place_ship(type(ship), cells[0], orientation)
+        shots = [(rng.randrange(-1, 11), rng.randrange(-1, 11)) for _ in range(150)]
+        for coordinate in shots:
+            expected, expected_ship = reference.fire_at(coordinate)
+            result, ship = B.fire_at(coordinate)
+            assert result == expected
+            assert (ship is None) == (expected_ship is None)
+            assert B.all_ships_sunk() == reference.all_ships_sunk()
+        assert B.hits == reference.hits
+        assert B.misses == reference.misses
@@ -0,0 +1,56 @@
+import pytest
+from battleship.bitboard import BitBoard
+from battleship.board import Board
+from battleship.game import Game
+from battleship.player import HumanPlayer, ComputerPlayer, CellPool
+from battleship.simulation import play_headless
+from battleship.ship import Cruiser, Destroyer, Submarine
+
+FLEET = {Cruiser: 3, Destroyer: 2, Submarine: 5}
+
+def test_board_uses_its_own_size_and_fleet():
+    B = Board(15, FLEET)
+    assert B.in_grid((14, 14)) and not B.in_grid((15, 0))
+    B.place_fleet()
+    assert len(B.ships) == 10
+    assert len(B.occupied) == 3 * 3 + 2 * 2 + 5
+    # The defaults are untouched
+    assert Board().SIZE == 10 and Board().FLEET == Board.FLEET
+
+def test_board_rejects_bad_configuration():
+    with pytest.raises(ValueError):
+        Board(0)
+    with pytest.raises(TypeError):
+        Board(10, {int: 1})
+
+def test_players_follow_the_board_configuration():
+    human = HumanPlayer(size=12, fleet=FLEET)
+    assert human.convert_coordinates("L12") == (11, 11)
+    assert human.convert_coordinates("M1") is None
+    assert human.convert_coordinates("A13") is None
+    assert human.enemy_afloat == FLEET
+    computer = ComputerPlayer(size=12, fleet=FLEET)
+    assert computer.counter == {3: 3, 2: 2, 1: 5}
+    assert len(computer.untried) == 144
+
+def test_game_draws_configured_boards():
+    game = Game(size=12, fleet=FLEET)
+    lines = game.draw_boards(game.computer.board, False, set(), set()).splitlines()
+    assert len(lines) == 13
+    assert lines[-1].startswith("L ")
+
+def test_headless_game_on_large_board():
+    big = {ship_type: count * 4 for ship_type, count in Board.FLEET.items()}
+    for board_class in (Board, BitBoard):
+        first = ComputerPlayer(board=board_class(20, big))
+        second = ComputerPlayer(board=board_class(20, big))
+        stats = play_headless(first, second)
+        assert stats.hits[stats.winner] == 4 * 20
+
+def test_cell_pool_draws_and_removes_cells():
+    pool = CellPool([(0, 0), (0, 1), (1, 1)])
+    pool.discard((0, 0))
+    pool.discard((5, 5))
+    assert len(pool) == 2 and (0, 0) not in pool
+    assert pool.choice() in {(0, 1), (1, 1)}
+    assert set(pool) == {(0, 1), (1, 1)}
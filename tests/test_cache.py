@@ -0,0 +1,65 @@
+import pytest
+import random
+from battleship.board import Board, MISS, HIT
+from battleship.cache import TranspositionCache, zobrist_keys, MISS_STATE, HIT_STATE, SUNK_STATE
+from battleship.density import DensityPlayer
+from battleship.player import ComputerPlayer
+
+def _hash_from_scratch(board):
+    # Zobrist hash of the shots fired at a board
+    keys = zobrist_keys(board.SIZE)
+    sunk = {cell for ship in board.ships if ship.is_sunk() for cell in ship.position}
+    value = 0
+    for row, column in board.misses:
+        value ^= keys[MISS_STATE][row * board.SIZE + column]
+    for row, column in board.hits:
+        value ^= keys[SUNK_STATE if (row, column) in sunk else HIT_STATE][row * board.SIZE + column]
+    return value
+
+def test_lru_eviction_and_statistics():
+    cache = TranspositionCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # "b" was the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 1, "evictions": 1, "hit_rate": 2 / 3}
+    assert TranspositionCache(max_bytes=10 * TranspositionCache.ENTRY_BYTES).max_entries == 10
+    assert TranspositionCache.shared() is TranspositionCache.shared()
+
+def test_incremental_hash_matches_the_board():
+    random.seed(8)
+    for player_class in (ComputerPlayer, DensityPlayer):
+        board = Board()
+        board.place_fleet()
+        player = player_class(cache=TranspositionCache())
+        while not board.all_ships_sunk():
+            cell = player.choose_cell()
+            player.observe(cell, *board.fire_at_cell(cell))
+            assert player.state_hash == _hash_from_scratch(board)
+        # Results registered twice do not change the hash
+        before = player.state_hash
+        player.observe(cell, HIT)
+        assert player.state_hash == before
+
+def test_players_share_decisions_through_the_cache():
+    cache = TranspositionCache()
+    first = DensityPlayer(cache=cache)
+    second = DensityPlayer(cache=cache)
+    # The same shots in a different order lead to the same state and the same decision
+    for player, cells in ((first, (0, 55, 99)), (second, (99, 0, 55))):
+        for cell in cells:
+            player.observe(cell, MISS)
+    assert first.state_hash == second.state_hash
+    shot = first.choose_shot()
+    assert second.choose_shot() == shot
+    assert cache.hits == 1 and cache.misses == 1
+    # Other strategies do not reuse the decisions of the density player
+    other = ComputerPlayer(cache=cache)
+    for cell in (0, 55, 99):
+        other.observe(cell, MISS)
+    other.choose_shot()
+    assert cache.misses == 2
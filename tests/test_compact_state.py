@@ -0,0 +1,49 @@
+import pytest
+import random
+from battleship.bitboard import BitBoard
+from battleship.density import DensityPlayer
+from battleship.player import ComputerPlayer, HumanPlayer, CellSet
+from battleship.simulation import play_headless
+from battleship.ship import Cruiser
+
+def test_cell_set_behaves_like_a_set():
+    cells = CellSet(10, [(0, 0), (9, 9)])
+    cells.add((4, 5))
+    cells.discard((0, 0))
+    cells.discard((20, 20))
+    assert len(cells) == 2
+    assert (4, 5) in cells and (0, 0) not in cells and "A1" not in cells
+    assert set(cells) == {(4, 5), (9, 9)}
+    assert cells == {(4, 5), (9, 9)}
+    both = cells & {(9, 9), (1, 1)}
+    assert isinstance(both, CellSet) and set(both) == {(9, 9)}
+    with pytest.raises(ValueError):
+        cells.add((10, 0))
+
+def test_cell_set_choice_covers_all_cells():
+    cells = CellSet(10, [(0, 0), (3, 3), (9, 9)])
+    rng = random.Random(0)
+    assert {cells.choice(rng) for _ in range(200)} == {(0, 0), (3, 3), (9, 9)}
+    with pytest.raises(IndexError):
+        CellSet(10).choice()
+
+def test_ship_is_slotted_and_packs_hits():
+    ship = Cruiser({(2, 1), (2, 2), (2, 3)})
+    assert not hasattr(ship, "__dict__")
+    ship.register_hit((2, 3))
+    assert ship.hits == {(2, 3)}
+
+def test_compact_players_play_full_games():
+    for player_class in (ComputerPlayer, DensityPlayer):
+        first = player_class(board=BitBoard(), compact=True)
+        second = player_class(board=BitBoard(), compact=True)
+        stats = play_headless(first, second)
+        assert stats.hits[stats.winner] == 20
+        assert isinstance(first.opponent_view["unknown"], CellSet)
+
+def test_compact_human_player_view():
+    human = HumanPlayer(compact=True)
+    human.register_result((1, 1), "MISS")
+    assert (1, 1) in human.opponent_view["misses"]
+    assert (1, 1) not in human.opponent_view["unknown"]
+    assert len(human.opponent_view["unknown"]) == 99
@@ -1,4 +1,7 @@
 import pytest
+from battleship.board import grid_cells
+from battleship.coordinates import coordinate_table, row_label
+from battleship.game import Game
 from battleship.player import HumanPlayer
 
 # Check coordinates conversions
@@ -41,3 +44,20 @@ def test_label_to_tuple_conversion():
     assert result is None
 
 
+def test_multi_letter_labels_on_large_boards():
+    table = coordinate_table(30)
+    assert [row_label(row) for row in (0, 25, 26, 27, 51, 52, 701, 702)] == ["A", "Z", "AA", "AB", "AZ", "BA", "ZZ", "AAA"]
+    assert table.parse("AD30") == (29, 29)
+    assert table.parse(" ab3 ") == (27, 2)
+    assert table.cell("AA1") == 26 * 30
+    assert table.cell_label(26 * 30) == "AA1" and table.cell_label(900) is None
+    # Every label parses back to its cell
+    assert all(table.cell(label) == cell for cell, label in enumerate(table.labels))
+    player = HumanPlayer(size=30)
+    assert player.convert_coordinates("AD1") == (29, 0)
+    assert player.convert_coordinate_back((29, 0)) == "AD1"
+    # Parsed coordinates are the shared tuples of the board, and tables are shared too
+    assert player.convert_coordinates("B2") is grid_cells(30)[31]
+    assert coordinate_table(30) is table
+    lines = Game(size=30).draw_boards(player.board, False, set(), set()).splitlines()
+    assert lines[-1].startswith("AD  ~") and lines[1].startswith("A   ~")
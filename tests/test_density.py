@@ -0,0 +1,72 @@
+import pytest
+import random
+from battleship.board import Board
+from battleship.density import DensityPlayer
+from battleship.ship import Destroyer
+
+def _recount(player):
+    # Density computed from scratch from the placements that are still possible
+    density = [0] * (player._size * player._size)
+    for length, (placements, _) in player._tables.items():
+        for number, cells in enumerate(placements):
+            if player._alive[length][number]:
+                for cell in cells:
+                    density[cell] += player.counter[length]
+    return density
+
+def _play(player, board):
+    shots = []
+    while not board.all_ships_sunk():
+        coordinates = player.choose_shot()
+        result, ship = board.fire_at(coordinates)
+        player.register_result(coordinates, result, ship.length if result == "Sunk" else None)
+        shots.append((coordinates, result))
+    return shots
+
+def test_empty_board_density_prefers_the_centre():
+    player = DensityPlayer()
+    density = player.density_map()
+    assert density[0][0] < density[4][4]
+    assert density[4][4] == density[5][5]
+    # The first shot is drawn evenly among the cells of highest density
+    flat = [value for row in density for value in row]
+    tied = [cell for cell, value in enumerate(flat) if value == max(flat)]
+    counts = {}
+    for seed in range(800):
+        cell = DensityPlayer(rng=random.Random(seed)).choose_cell()
+        counts[cell] = counts.get(cell, 0) + 1
+    assert set(counts) == set(tied)
+    assert max(counts.values()) < 3 * 800 / len(tied)
+
+def test_incremental_density_matches_recount():
+    for _ in range(10):
+        player = DensityPlayer()
+        board = Board()
+        board.place_fleet()
+        while not board.all_ships_sunk():
+            coordinates = player.choose_shot()
+            result, ship = board.fire_at(coordinates)
+            player.register_result(coordinates, result, ship.length if result == "Sunk" else None)
+            assert player._density == _recount(player)
+
+def test_density_player_never_repeats_a_shot():
+    for _ in range(10):
+        board = Board()
+        board.place_fleet()
+        shots = _play(DensityPlayer(), board)
+        assert all(result in ("Hit", "Miss", "Sunk") for _, result in shots)
+        assert len({coordinates for coordinates, _ in shots}) == len(shots)
+
+def test_density_player_finishes_a_hit_ship():
+    # After a hit, the next shots stay on the ship until it is sunk
+    board = Board()
+    board.place_ship(Destroyer, (4, 4), "H")
+    player = DensityPlayer()
+    player.register_result((4, 4), *board.fire_at((4, 4)))
+    for _ in range(4):
+        coordinates = player.choose_shot()
+        result, ship = board.fire_at(coordinates)
+        player.register_result(coordinates, result, ship.length if result == "Sunk" else None)
+        if result == "Sunk":
+            break
+    assert board.all_ships_sunk()
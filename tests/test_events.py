@@ -0,0 +1,60 @@
+import pytest
+import io
+from battleship.events import SetupStarted, GameStarted, ShotFired, ShotResult, ShipSunk, GameOver, NullSink, TerminalSink
+from battleship.game import Game
+from battleship.player import HumanPlayer
+from battleship.render import TerminalRenderer
+
+class ListSink:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+def test_null_sink_game_is_silent(capsys):
+    game = Game(human="computer", sink=NullSink())
+    # No sink is kept, so no event is even created
+    assert game.sinks == []
+    game.play_game()
+    assert capsys.readouterr().out == ""
+    assert game.opponent.board.all_ships_sunk()
+    # A renderer is closed at the end of the game, whatever the sinks
+    stream = io.StringIO()
+    game = Game(human="computer", renderer=TerminalRenderer(stream=stream, height=40), sink=NullSink())
+    game.show_boards()
+    game.play_game()
+    assert stream.getvalue().endswith("\x1b[r\x1b[40;1H\n")
+
+def test_events_of_a_game():
+    sink = ListSink()
+    game = Game(human="computer", sink=sink)
+    game.play_game()
+    events = sink.events
+    # The welcome comes before the fleets are placed
+    assert type(events[0]) is SetupStarted
+    assert type(events[1]) is GameStarted
+    assert events[1].boards == (game.human.board, game.computer.board)
+    over = events[-1]
+    assert type(over) is GameOver and over.name == game.current_player.name
+    results = [event for event in events if type(event) is ShotResult]
+    fired = [event for event in events if type(event) is ShotFired]
+    assert len(results) == len(fired) == game.round_number
+    # Every ship of the loser was sunk by the winner
+    sunk = [event for event in events if type(event) is ShipSunk and event.player == over.winner]
+    assert len(sunk) == len(game.opponent.board.ships)
+    assert all(event.result == "Sunk" for event in results if event.sunk_length is not None)
+
+def test_terminal_sink_and_injected_input():
+    lines = []
+    answers = iter(["Z9", "b7"])
+    human = HumanPlayer(read=lambda prompt: next(answers), write=lines.append)
+    # An invalid answer is refused and asked again
+    assert human.choose_shot() == (1, 6)
+    assert lines.count("Invalid coordinate, please try again.") == 1
+    game = Game(human="computer")
+    output = []
+    sink = TerminalSink(game, write=output.append)
+    sink.emit(ShotResult(1, "Computer", (1, 6), "Sunk", 2))
+    sink.emit(GameOver(1, "Computer", 40))
+    assert output == ["Computer shoots at B7 -> SUNK!", "And the winner is... Computer!", "Thanks for playing!"]
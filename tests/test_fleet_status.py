@@ -0,0 +1,65 @@
+import pytest
+from battleship.bitboard import BitBoard
+from battleship.board import Board
+from battleship.events import TerminalSink, TurnStarted
+from battleship.game import Game
+from battleship.player import HumanPlayer
+from battleship.ship import Battleship, Destroyer, Submarine
+
+def test_ship_counts_each_cell_once():
+    ship = Destroyer({(0, 0), (0, 1)})
+    ship.register_hit((0, 0))
+    ship.register_hit((0, 0))
+    assert ship.cells_left == 1 and not ship.is_sunk()
+    ship.register_hit((5, 5))
+    ship.register_hit((0, 1))
+    assert ship.cells_left == 0 and ship.is_sunk()
+    # Ships given cells that are not in a line are counted right too
+    for position in ({(0, 1), (1, 0)}, {(0, 5), (1, 0)}):
+        ship = Destroyer(position)
+        for coordinate in position:
+            assert ship.register_hit(coordinate)
+        assert ship.is_sunk() and ship.hits == position
+
+def test_fleet_status_follows_sunk_ships():
+    for board_class in (Board, BitBoard):
+        B = board_class()
+        B.place_ship(Battleship, (0, 0), "H")
+        B.place_ship(Submarine, (5, 5), "H")
+        B.place_ship(Submarine, (7, 7), "H")
+        assert B.ships_afloat == 3
+        assert B.fleet_status()[Submarine] == 2
+        assert B.fire_at((5, 5))[0] == "Sunk"
+        # Firing again at a sunk ship changes nothing
+        assert B.fire_at((5, 5))[0] == "Repeat"
+        assert B.ships_afloat == 2
+        expected = {ship_type: 0 for ship_type in B.FLEET}
+        expected[Battleship] = 1
+        expected[Submarine] = 1
+        assert B.fleet_status() == expected
+        for column in range(4):
+            B.fire_at((0, column))
+        B.fire_at((7, 7))
+        assert B.ships_afloat == 0
+        assert B.all_ships_sunk()
+        assert all(count == 0 for count in B.fleet_status().values())
+
+def test_fleet_status_of_random_fleet():
+    B = Board()
+    B.place_fleet()
+    assert B.fleet_status() == B.FLEET
+    assert B.ships_afloat == sum(B.FLEET.values())
+
+def test_enemy_fleet_status_comes_from_the_enemy_board(monkeypatch):
+    output = []
+    game = Game()
+    game.human = HumanPlayer(write=output.append)
+    monkeypatch.setattr(game, "show_boards", lambda: None)
+    board = game.computer.board
+    board.place_ship(Battleship, (0, 0), "H")
+    board.place_ship(Submarine, (5, 5), "H")
+    board.fire_at((5, 5))
+    TerminalSink(game).emit(TurnStarted(0, 2))
+    assert output[0] == "Enemy's fleet status:"
+    assert "Battleship (4 cells): remaining 1" in output
+    assert "Submarine (1 cells): remaining 0" in output
@@ -41,7 +41,7 @@ def test_play_game_loop(monkeypatch):
         log.append("Show boards")
 
     # It mimics show_enemy_fleet_status()
-    def fake_fleet_status():
+    def fake_fleet_status(fleet_status=None):
         draw_count["fleet"] += 1
         log.append("show_enemy_fleet_status")
 
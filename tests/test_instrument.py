@@ -0,0 +1,42 @@
+import pytest
+from battleship.board import Board
+from battleship.instrument import Profiler
+from battleship.player import ComputerPlayer
+from battleship.ship import Battleship, Submarine
+from battleship.simulation import play_headless
+
+def test_disabled_profiler_leaves_the_methods_untouched():
+    originals = (Board.__dict__["place_ship"], Board.__dict__["fire_at"], ComputerPlayer.__dict__["choose_shot"])
+    with Profiler() as profiler:
+        assert profiler.enabled
+        assert Board.__dict__["fire_at"] is not originals[1]
+        assert Board.placement_listener is not None
+    # Everything is restored on exit
+    assert not profiler.enabled
+    assert (Board.__dict__["place_ship"], Board.__dict__["fire_at"], ComputerPlayer.__dict__["choose_shot"]) == originals
+    assert Board.placement_listener is None
+
+def test_calls_and_placement_attempts_are_counted():
+    with Profiler() as profiler:
+        stats = play_headless(ComputerPlayer(), ComputerPlayer())
+    result = profiler.stats()
+    # Every shot goes through choose_shot and fire_at_cell
+    assert result["calls"]["ComputerPlayer.choose_shot"]["calls"] == sum(stats.shots)
+    assert result["calls"]["Board.fire_at_cell"]["calls"] == sum(stats.shots)
+    placement = result["placement"]
+    assert placement["fleets"] == 2
+    assert placement["ships"] == 2 * sum(Board.FLEET.values())
+    # Every random attempt is one call of place_ship
+    assert placement["attempts"] == result["calls"]["Board.place_ship"]["calls"]
+    assert sum(placement["fleet_histogram"].values()) == 2
+    assert "fleets placed: 2" in profiler.report()
+
+def test_fallback_is_counted():
+    # Without random attempts, every ship is placed by the deterministic fallback
+    board = Board(size=4, fleet={Battleship: 1, Submarine: 1})
+    board.MAX_TRIES = 0
+    with Profiler() as profiler:
+        board.place_fleet()
+    assert profiler.ships == 2
+    assert profiler.fallbacks == 2
+    assert profiler.attempts == 0
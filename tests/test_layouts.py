@@ -0,0 +1,44 @@
+import pytest
+import random
+from collections import Counter
+from battleship.board import Board
+from battleship.layouts import count_layouts, iter_layouts, UniformFleetSampler
+from battleship.ship import Battleship, Cruiser, Destroyer, Submarine
+
+SMALL_FLEET = {Cruiser: 1, Destroyer: 1, Submarine: 1}
+
+def _cells(layout):
+    return frozenset(cell for placement in layout for cell in placement.positions)
+
+def test_count_matches_enumeration():
+    for size, fleet in [(3, {Submarine: 2}), (4, {Destroyer: 1, Submarine: 2}), (5, SMALL_FLEET)]:
+        layouts = list(iter_layouts(size, fleet))
+        # Every layout is streamed once
+        assert len({_cells(layout) for layout in layouts}) == len(layouts)
+        assert count_layouts(size, fleet) == len(layouts)
+
+def test_streamed_layouts_are_legal():
+    for layout in iter_layouts(4, {Destroyer: 1, Submarine: 2}):
+        B = Board()
+        for placement in layout:
+            assert B.place_ship(placement.ship_type, placement.start, placement.orientation)
+
+def test_count_of_a_known_fleet():
+    fleet = {Battleship: 1, Cruiser: 1, Destroyer: 1, Submarine: 2}
+    assert count_layouts(6, fleet) == 759696
+
+def test_sampler_is_uniform():
+    # 120 layouts of a cruiser and a destroyer on a 4x4 board, drawn 24000 times
+    fleet = {Cruiser: 1, Destroyer: 1}
+    sampler = UniformFleetSampler(4, fleet)
+    assert sampler.count() == 120
+    rng = random.Random(2)
+    frequencies = Counter(_cells(sampler.sample(rng)) for _ in range(24000))
+    assert len(frequencies) == 120
+    # Expected 200 draws per layout, allow for statistical noise
+    assert min(frequencies.values()) > 130
+    assert max(frequencies.values()) < 270
+
+def test_sampler_places_full_fleet():
+    B = UniformFleetSampler().place_fleet(Board())
+    assert len(B.ships) == sum(Board.FLEET.values())
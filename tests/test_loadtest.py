@@ -0,0 +1,23 @@
+import pytest
+from battleship.loadtest import run_load_test, percentile, session_bytes
+
+def test_percentile_nearest_rank():
+    values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert percentile(values, 50) == 5
+    assert percentile(values, 90) == 9
+    assert percentile(values, 100) == 10
+    assert percentile(values, 1) == 1
+    assert percentile([], 50) == 0.0
+
+def test_load_test_plays_every_game():
+    report = run_load_test(n_games=20, concurrency=8, measure_memory=False)
+    assert report.games == 20 and report.errors == 0
+    # The client fires first, so it fires at least as many shots as the 20 fleet cells of the winner
+    assert report.moves >= 20 * 20
+    assert report.latencies == sorted(report.latencies)
+    assert 0 < report.latency(50) <= report.latency(99) <= report.latency(100)
+    assert report.games_per_second > 0
+    assert "games/s" in report.summary()
+
+def test_compact_sessions_are_smaller():
+    assert session_bytes(50, compact=True) < session_bytes(50, compact=False)
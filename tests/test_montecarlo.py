@@ -0,0 +1,52 @@
+import pytest
+import random
+import time
+from battleship import strategies
+from battleship.board import Board
+from battleship.montecarlo import MonteCarloPlayer
+
+def _recount(player):
+    # Occupancy counts computed from scratch from the samples
+    counts = [0] * (player._size * player._size)
+    for mask, layout in player._samples:
+        for length, number in layout:
+            for cell in player._tables[length][0][number]:
+                counts[cell] += 1
+    return counts
+
+def test_samples_stay_consistent_with_the_shots():
+    random.seed(2)
+    for _ in range(3):
+        board = Board()
+        board.place_fleet()
+        player = MonteCarloPlayer(samples=50)
+        shots = set()
+        while not board.all_ships_sunk():
+            cell = player.choose_cell()
+            assert cell not in shots
+            shots.add(cell)
+            player.observe(cell, *board.fire_at_cell(cell))
+            # Kept samples avoid misses and sunk ships, and cover every open hit
+            for mask, layout in player._samples:
+                assert not mask & player._forbidden
+                assert mask & player._open_hits == player._open_hits
+                assert sorted(length for length, _ in layout) == sorted(
+                    length for length, count in player.counter.items() for _ in range(count))
+            assert player._counts == _recount(player)
+
+def test_samples_are_reused_between_moves():
+    player = MonteCarloPlayer(samples=100)
+    player.choose_cell()
+    first = list(player._samples)
+    # A miss in a corner only drops the samples with a ship there
+    player.observe(99, 0, 0)
+    assert 0 < len(player._samples) <= 100
+    assert all(sample in first for sample in player._samples)
+
+def test_time_budget_limits_sampling():
+    player = MonteCarloPlayer(samples=10 ** 6, time_budget=0.005)
+    start = time.perf_counter()
+    player.choose_cell()
+    assert time.perf_counter() - start < 0.5
+    assert 0 < len(player._samples) < 10 ** 6
+    assert strategies.get("montecarlo") is MonteCarloPlayer
@@ -0,0 +1,55 @@
+import pytest
+import random
+from battleship import strategies
+from battleship.board import Board, MISS, HIT
+from battleship.opening_book import OpeningBook, build_book, default_book
+from battleship.player import ComputerPlayer
+from battleship.ship import Battleship
+from battleship.simulation import play_headless
+
+def test_book_round_trip_and_shape():
+    book = build_book(depth=4, n_layouts=2000, rng=random.Random(0))
+    assert len(book.moves) == 15
+    # The first shot is never on the edge of an empty board
+    first = book.move(1)
+    assert 0 < first // 10 < 9 and 0 < first % 10 < 9
+    # A path of the tree never shoots the same cell twice
+    assert book.move(2) != first and book.move(3) != first
+    loaded = OpeningBook.loads(book.dumps())
+    assert list(loaded.moves) == list(book.moves)
+    assert loaded.matches(10, Board.FLEET) and not loaded.matches(12, Board.FLEET)
+    assert not loaded.matches(10, {Battleship: 1})
+    assert len(book.dumps()) < 64
+    with pytest.raises(ValueError):
+        OpeningBook.loads(b"XXXX" + book.dumps()[4:])
+
+def test_player_follows_the_book_until_it_leaves_it():
+    book = build_book(depth=4, n_layouts=2000, rng=random.Random(0))
+    player = ComputerPlayer(book=book)
+    first = player.choose_cell()
+    assert first == book.move(1)
+    player.observe(first, MISS)
+    second = player.choose_cell()
+    assert second == book.move(2)
+    player.observe(second, HIT)
+    assert player.book_node == 5
+    # After a hit, the book goes on with its hit branch instead of the targeting
+    third = player.choose_cell()
+    assert third == book.move(5)
+    player.observe(third, MISS)
+    assert player.book_node == 10
+    # A shot that is not the book's leaves the book for good
+    fourth = next(cell for cell in range(100) if cell not in (first, second, third, book.move(10)))
+    player.observe(fourth, MISS)
+    assert player.book_node == 0
+
+def test_default_book_is_used_by_the_book_strategy():
+    book = default_book()
+    assert book is not None and book is default_book()
+    assert default_book(12) is None
+    player = strategies.create("book")
+    assert player.book is book
+    # A book for another board is ignored
+    assert ComputerPlayer(size=12, book="default").book is None
+    stats = play_headless(player, strategies.create("computer"))
+    assert stats.hits[stats.winner] == 20
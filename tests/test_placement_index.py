@@ -0,0 +1,28 @@
+import pytest
+import random
+from battleship.bitboard import BitBoard
+from battleship.board import Board
+from battleship.placement import PlacementIndex
+
+def test_sampled_fleet_follows_placement_rules():
+    # Every sampled fleet can be rebuilt with the checks of Board.place_ship
+    index = PlacementIndex()
+    rng = random.Random(5)
+    for _ in range(200):
+        layout = index.sample(rng)
+        assert len(layout) == sum(Board.FLEET.values())
+        B = Board()
+        for placement in layout:
+            assert B.place_ship(placement.ship_type, placement.start, placement.orientation)
+
+def test_index_places_fleet_on_boards():
+    for board_class in (Board, BitBoard):
+        B = PlacementIndex.for_board(board_class()).place_fleet(board_class())
+        counter = sum(ship.LENGTH * count for ship, count in B.FLEET.items())
+        assert len(B.occupied) == counter
+        # The board works as usual afterwards
+        coordinate = next(iter(B.occupied))
+        assert B.fire_at(coordinate)[0] in ("Hit", "Sunk")
+
+def test_index_is_shared_per_board_size():
+    assert PlacementIndex.for_board(Board()) is PlacementIndex.for_board(BitBoard())
@@ -0,0 +1,59 @@
+import pytest
+import io
+import re
+from battleship.game import Game
+from battleship.render import TerminalRenderer
+
+def _game(stream):
+    renderer = TerminalRenderer(stream=stream, height=40)
+    game = Game(renderer=renderer)
+    game.human.place_fleet()
+    game.computer.place_fleet()
+    return game, renderer
+
+def test_first_frame_matches_draw_boards():
+    game, renderer = _game(io.StringIO())
+    frame = renderer.frame()
+    # Clear screen, boards, scrolling region below the boards
+    assert frame.startswith("\x1b[2J\x1b[H")
+    assert frame.endswith("\x1b[13;40r\x1b[13;1H")
+    lines = frame[len("\x1b[2J\x1b[H"):frame.index("\x1b[13;40r")].split("\n")
+    left = game._render_human_board().splitlines()
+    right = game._render_computer_board().splitlines()
+    assert lines[0].startswith("YOUR BOARD") and lines[0].endswith("COMPUTER")
+    assert lines[1:] == [L + " " * 15 + R for L, R in zip(left, right)]
+
+def test_later_frames_redraw_changed_cells_only():
+    stream = io.StringIO()
+    game, renderer = _game(stream)
+    renderer.render()
+    # Nothing changed: nothing is written
+    assert renderer.frame() == ""
+    # The human misses at B3, the computer hits a ship of the human
+    game.human.register_result((1, 2), "Miss")
+    target = next(iter(game.human.board.occupied))
+    game.human.board.fire_at(target)
+    frame = renderer.frame()
+    moves = re.findall(r"\x1b\[(\d+);(\d+)H(.)", frame)
+    # Row 4 of the screen is board row B. A cell of column c is at screen column 4 + 3c, and
+    # the computer board starts 2 + 10 * 3 - 1 + 15 = 46 columns to the right
+    assert sorted(moves) == sorted([("4", str(46 + 4 + 2 * 3), "O"),
+                                    (str(target[0] + 3), str(4 + 3 * target[1]), "X")])
+    assert frame.startswith("\x1b7") and frame.endswith("\x1b8")
+
+def test_game_uses_the_renderer(monkeypatch):
+    stream = io.StringIO()
+    game, renderer = _game(stream)
+    game.show_boards()
+    first = stream.getvalue()
+    assert "YOUR BOARD" in first
+    # The second frame only has the new shot
+    game.human.register_result((0, 0), "Miss")
+    game.show_boards()
+    assert stream.getvalue()[len(first):] == "\x1b7\x1b[3;50HO\x1b8"
+    renderer.close()
+    closed = stream.getvalue()
+    assert closed.endswith("\x1b[r\x1b[40;1H\n")
+    # Closing twice (at the end of the game, then on the way out) writes nothing more
+    renderer.close()
+    assert stream.getvalue() == closed
@@ -0,0 +1,78 @@
+import pytest
+import random
+from battleship.board import INVALID, MISS, SUNK
+from battleship.game import Game
+from battleship.player import ComputerPlayer
+from battleship.replay import ReplayWriter, ReplayReader
+from battleship.simulation import simulate_games
+
+def test_simulated_games_are_logged(tmp_path):
+    path = tmp_path / "games.bsrl"
+    random.seed(1)
+    with ReplayWriter(path) as writer:
+        all_stats = simulate_games(5, recorder=writer)
+    with ReplayReader(path) as reader:
+        assert reader.n_games == 5
+        assert len(reader) == sum(stats.turns for stats in all_stats)
+        for (number, shots), stats in zip(reader.iter_games(), all_stats):
+            assert [shot.game for shot in shots] == [number] * stats.turns
+            # Shots alternate, starting with the first player
+            assert [shot.shooter for shot in shots] == [turn % 2 for turn in range(stats.turns)]
+            winner_shots = [shot for shot in shots if shot.shooter == stats.winner]
+            assert sum(shot.result == MISS for shot in winner_shots) == stats.misses[stats.winner]
+            assert sum(shot.sunk_length for shot in winner_shots if shot.result == SUNK) == stats.hits[stats.winner]
+        # Random access gives the same shots as streaming
+        assert reader.game(3) == list(reader.iter_games())[3][1]
+        assert reader.game(7) == []
+
+def test_log_is_appended_to(tmp_path):
+    path = tmp_path / "games.bsrl"
+    for _ in range(2):
+        with ReplayWriter(path) as writer:
+            simulate_games(2, recorder=writer)
+    # A record cut short is ignored by the reader and dropped by the next writer
+    with open(path, "ab") as file:
+        file.write(b"\x00\x01\x02")
+    with ReplayReader(path) as reader:
+        assert reader.n_games == 4
+        n_shots = len(reader)
+    with ReplayWriter(path) as writer:
+        assert writer.start_game() == 4
+        writer.record(1, (2, 3), "Sunk", 4)
+    with ReplayReader(path) as reader:
+        assert len(reader) == n_shots + 1
+        last = reader.shot(n_shots)
+        assert (last.game, last.shooter, last.coordinates, last.result_name, last.sunk_length) == (4, 1, (2, 3), "Sunk", 4)
+
+def test_game_play_turn_records_shots(tmp_path, monkeypatch):
+    path = tmp_path / "games.bsrl"
+    with ReplayWriter(path) as writer:
+        game = Game(recorder=writer)
+        # The human is replaced by a computer so that no input is needed
+        game.human = ComputerPlayer()
+        monkeypatch.setattr(game, "show_boards", lambda: None)
+        game.setup()
+        game.play_turn()
+        game.switch_turn()
+        game.play_turn()
+    with ReplayReader(path) as reader:
+        assert [shot.shooter for shot in reader] == [0, 1]
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"hello world, not a log")
+    with pytest.raises(ValueError):
+        ReplayReader(other)
+
+def test_foreign_files_and_invalid_shots(tmp_path):
+    # A file that is not a log is refused and left as it was
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"hello world, not a log")
+    with pytest.raises(ValueError):
+        ReplayWriter(other)
+    assert other.read_bytes() == b"hello world, not a log"
+    path = tmp_path / "games.bsrl"
+    with ReplayWriter(path) as writer:
+        writer.start_game()
+        writer.record(0, (-1, 3), INVALID)
+        writer.record(0, (1, 3), "Miss")
+    with ReplayReader(path) as reader:
+        assert [shot.coordinates for shot in reader] == [(1, 3)]
@@ -0,0 +1,141 @@
+import pytest
+import asyncio
+import json
+from battleship.board import grid_cells
+from battleship.coordinates import coordinate_table
+from battleship.replay import ReplayReader, ReplayWriter
+from battleship.server import ClientGone, GameServer, Session
+
+async def _connect(server, opponent):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(json.dumps({"type": "join", "opponent": opponent}).encode() + b"\n")
+    return reader, writer
+
+async def _receive(reader):
+    return json.loads(await reader.readline())
+
+async def _play_scripted(server, opponent, fire=True):
+    # A client that fires at every cell in row order until the game is over
+    reader, writer = await _connect(server, opponent)
+    cells = iter(grid_cells(10))
+    messages = []
+    while True:
+        message = await _receive(reader)
+        messages.append(message)
+        if message["type"] == "your_turn" and fire:
+            row, column = next(cells)
+            writer.write(json.dumps({"type": "shot", "row": row, "column": column}).encode() + b"\n")
+        elif message["type"] == "game_over":
+            writer.close()
+            return messages
+
+def test_many_concurrent_games_against_the_computer():
+    async def scenario():
+        async with GameServer() as server:
+            games = await asyncio.gather(*(_play_scripted(server, "computer") for _ in range(50)))
+            assert server.games_played == 50
+            return games
+    for messages in asyncio.run(scenario()):
+        start = messages[0]
+        assert start["type"] == "start" and start["player"] == 0
+        assert sum(len(ship) for ship in start["ships"]) == 20
+        over = messages[-1]
+        assert over["reason"] == "fleet_sunk"
+        # The winner is the one who made the last shot
+        results = [message for message in messages if message["type"] == "result"]
+        assert results[-1]["player"] == over["winner"]
+        assert sum(result["result"] in ("HIT", "SUNK") for result in results if result["player"] == over["winner"]) == 20
+
+def test_two_clients_play_each_other():
+    async def scenario():
+        async with GameServer() as server:
+            return await asyncio.gather(_play_scripted(server, "human"), _play_scripted(server, "human"))
+    first, second = asyncio.run(scenario())
+    assert first[0]["type"] == "waiting"
+    players = {first[1]["player"], second[0]["player"]}
+    assert players == {0, 1} and first[1]["game"] == second[0]["game"]
+    # Both clients see the same shots
+    assert [m for m in first if m["type"] == "result"] == [m for m in second if m["type"] == "result"]
+    assert first[-1] == second[-1] and first[-1]["reason"] == "fleet_sunk"
+
+def test_invalid_shots_and_turn_timeout():
+    async def scenario():
+        async with GameServer(turn_timeout=0.2) as server:
+            reader, writer = await _connect(server, "computer")
+            assert (await _receive(reader))["type"] == "start"
+            assert (await _receive(reader))["type"] == "your_turn"
+            for line in (b"not json\n", b'{"type": "shot", "cell": "Z99"}\n'):
+                writer.write(line)
+                assert (await _receive(reader))["type"] == "error"
+            # No valid shot arrives before the deadline: the computer wins
+            over = await _receive(reader)
+            writer.close()
+            return over
+    over = asyncio.run(scenario())
+    assert over == {"type": "game_over", "winner": 1, "reason": "timeout"}
+
+def test_concurrent_games_are_recorded_apart(tmp_path):
+    path = tmp_path / "games.bsrl"
+    async def scenario():
+        async with GameServer(recorder=writer) as server:
+            return await asyncio.gather(*(_play_scripted(server, "computer") for _ in range(10)))
+    with ReplayWriter(path) as writer:
+        games = asyncio.run(scenario())
+    labels = coordinate_table(10)
+    with ReplayReader(path) as reader:
+        # One game of the log per game played, with the shots of that game only
+        logged = sorted([[shot.shooter, labels.label(shot.coordinates), shot.result_name.upper()] for shot in shots]
+                        for _, shots in reader.iter_games())
+    played = sorted([[m["player"], m["cell"], m["result"]] for m in messages if m["type"] == "result"]
+                    for messages in games)
+    assert logged == played
+
+class _FakeClient:
+    # A seat of a session, without a network connection
+    def __init__(self, gone=False):
+        self.gone = gone
+        self.messages = []
+
+    async def send(self, message):
+        if self.gone:
+            raise ClientGone()
+        self.messages.append(message)
+
+    def close(self):
+        pass
+
+def test_disconnect_and_pairing_timeout():
+    # The second player leaves before its first turn: the first one wins
+    present, gone = _FakeClient(), _FakeClient(gone=True)
+    session = Session(0, [present, gone])
+    assert asyncio.run(session.run()) == 0
+    assert present.messages[-1] == {"type": "game_over", "winner": 0, "reason": "disconnect"}
+    async def scenario():
+        async with GameServer(pair_timeout=0.1) as server:
+            reader, writer = await _connect(server, "human")
+            messages = [await _receive(reader), await _receive(reader)]
+            assert await reader.readline() == b""
+            writer.close()
+            return messages, server._waiting
+    messages, waiting = asyncio.run(scenario())
+    assert [message["type"] for message in messages] == ["waiting", "error"]
+    assert waiting is None
+
+def test_waiting_client_that_left_is_released():
+    def handlers():
+        return [task for task in asyncio.all_tasks() if task.get_coro().__qualname__ == "GameServer._handle_client"]
+    async def scenario():
+        async with GameServer(pair_timeout=5) as server:
+            reader, writer = await _connect(server, "human")
+            assert (await _receive(reader))["type"] == "waiting"
+            stale, done = server._waiting
+            writer.close()
+            await asyncio.sleep(0.05)
+            # The next client waits in its place, and the handler of the first one ends
+            reader, writer = await _connect(server, "human")
+            assert (await _receive(reader))["type"] == "waiting"
+            await asyncio.sleep(0.05)
+            assert done.done() and stale.writer.is_closing()
+            assert len(handlers()) == 1
+            writer.close()
+    asyncio.run(scenario())
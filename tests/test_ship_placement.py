@@ -1,4 +1,5 @@
 import pytest
+from battleship.bitboard import BitBoard
 from battleship.board import Board
 from battleship.ship import Battleship
 
@@ -57,4 +58,22 @@ def test_placement_accepts_diagonal_neighbor():
     B.place_ship(Battleship, (0, 6), "H")
     # Place second ship
     result = B.place_ship(Battleship, (1, 5), "V")
-    assert result is True
\ No newline at end of file
+    assert result is True
+
+def test_forbidden_cells_follow_the_placements():
+    # The forbidden cells are the ships and their orthogonal neighbours, on both boards
+    for board_class in (Board, BitBoard):
+        B = board_class()
+        assert B.place_ship(Battleship, (0, 0), "H")
+        assert B.forbidden == {(0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (1, 0), (1, 1), (1, 2), (1, 3)}
+        # Diagonal contact is allowed, sharing a side is not
+        assert not B.place_ship(Battleship, (1, 3), "V")
+        assert B.place_ship(Battleship, (1, 4), "V")
+        # A whole fleet, placed on a fresh board
+        B = board_class()
+        B.place_fleet()
+        expected = set()
+        for ship in B.ships:
+            for row, column in ship.position:
+                expected |= {(row, column), (row - 1, column), (row + 1, column), (row, column - 1), (row, column + 1)}
+        assert B.forbidden == {cell for cell in expected if B.in_grid(cell)}
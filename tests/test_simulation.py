@@ -0,0 +1,28 @@
+import pytest
+from battleship.player import ComputerPlayer
+from battleship.simulation import play_headless, simulate_games
+
+def test_headless_game_sinks_whole_fleet():
+    # The winner must have hit every cell of the opponent's fleet
+    first = ComputerPlayer()
+    second = ComputerPlayer()
+    stats = play_headless(first, second)
+    loser = (second, first)[stats.winner]
+    fleet_cells = sum(ship.LENGTH * count for ship, count in loser.board.FLEET.items())
+    assert stats.hits[stats.winner] == fleet_cells
+    assert loser.board.all_ships_sunk()
+    # Every turn is exactly one shot
+    assert stats.turns == sum(stats.shots)
+    assert stats.shots_to_win == stats.hits[stats.winner] + stats.misses[stats.winner]
+
+def test_headless_game_first_player_starts():
+    # The first player shoots first, so it never has fewer shots than the second
+    for stats in simulate_games(20):
+        assert stats.shots[0] - stats.shots[1] in (0, 1)
+        if stats.winner == 0:
+            assert stats.turns % 2 == 1
+
+def test_headless_game_does_not_print(capsys):
+    simulate_games(3)
+    captured = capsys.readouterr()
+    assert captured.out == ""
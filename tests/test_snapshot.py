@@ -0,0 +1,78 @@
+import pytest
+import random
+from battleship.cache import TranspositionCache
+from battleship.density import DensityPlayer
+from battleship.game import Game
+from battleship.player import ComputerPlayer
+from battleship import snapshot
+
+def _fire(shooter, board):
+    # One shot of a computer player, as in Game.play_turn
+    coordinates = shooter.choose_shot()
+    result, ship = board.fire_at(coordinates)
+    shooter.register_result(coordinates, result, ship.length if result == "Sunk" else None)
+    return coordinates, result
+
+def _started_game(player_class, n_shots, **options):
+    random.seed(3)
+    game = Game()
+    game.computer = player_class(rng=random.Random(7), **options)
+    game.human.place_fleet()
+    game.computer.place_fleet()
+    game.current_player, game.opponent = game.human, game.computer
+    for _ in range(n_shots):
+        _fire(game.computer, game.human.board)
+    # The human has fired a few shots too
+    for coordinates in [(0, 0), (5, 5), (9, 9)]:
+        result, ship = game.computer.board.fire_at(coordinates)
+        game.human.register_result(coordinates, result, ship.length if result == "Sunk" else None)
+    return game
+
+def test_round_trip_keeps_the_game_state():
+    game = _started_game(DensityPlayer, 25)
+    loaded = snapshot.loads(snapshot.dumps(game), rng=random.Random())
+    assert loaded.current_player is loaded.human
+    for original, copy in ((game.human, loaded.human), (game.computer, loaded.computer)):
+        assert copy.board.hits == original.board.hits
+        assert copy.board.misses == original.board.misses
+        assert sorted(map(sorted, (s.position for s in copy.board.ships))) == sorted(map(sorted, (s.position for s in original.board.ships)))
+        assert copy.board.fleet_status() == original.board.fleet_status()
+        assert copy.opponent_view == original.opponent_view
+    assert loaded.human.enemy_afloat == game.human.enemy_afloat
+    # The density map is rebuilt from the shots
+    assert loaded.computer.density_map() == game.computer.density_map()
+
+def test_resumed_game_continues_identically():
+    for player_class in (ComputerPlayer, DensityPlayer):
+        for n_shots in (0, 12, 40):
+            game = _started_game(player_class, n_shots)
+            loaded = snapshot.loads(snapshot.dumps(game), rng=random.Random())
+            # Both copies fire the same shots until the end of the game
+            while not game.human.board.all_ships_sunk():
+                assert _fire(game.computer, game.human.board) == _fire(loaded.computer, loaded.human.board)
+            assert loaded.human.board.all_ships_sunk()
+
+def test_snapshot_is_compact_and_checked(tmp_path):
+    game = _started_game(DensityPlayer, 30)
+    # Without the random state: masks, a few counters and the order of the computer's cell pools
+    assert len(snapshot.dumps(game, include_rng=False)) < 600
+    path = tmp_path / "game.bsnp"
+    snapshot.save(game, path)
+    assert snapshot.load(path).round_number == game.round_number
+    with pytest.raises(ValueError):
+        snapshot.loads(b"XXXX" + snapshot.dumps(game)[4:])
+
+def test_cached_player_round_trip():
+    for cache in ("shared", TranspositionCache(500)):
+        game = _started_game(ComputerPlayer, 30, cache=cache)
+        resumed = snapshot.loads(snapshot.dumps(game))
+        player = resumed.computer
+        assert player.state_hash == game.computer.state_hash != 0
+        assert player.cache.max_entries == game.computer.cache.max_entries
+        assert (player.cache is TranspositionCache.shared()) == (cache == "shared")
+        # The restored player goes on hashing from the saved state
+        for _ in range(10):
+            coordinates, _ = _fire(game.computer, game.human.board)
+            result, ship = resumed.human.board.fire_at(coordinates)
+            player.register_result(coordinates, result, ship.length if result == "Sunk" else None)
+            assert player.state_hash == game.computer.state_hash
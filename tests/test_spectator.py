@@ -0,0 +1,73 @@
+import pytest
+import io
+import json
+import socket
+import threading
+import time
+from battleship.player import ComputerPlayer
+from battleship.simulation import play_headless
+from battleship.spectator import Feed, SpectatorServer
+
+class SlowStream:
+    # A spectator that does not read until it is released
+    def __init__(self):
+        self.release = threading.Event()
+        self.data = bytearray()
+
+    def write(self, data):
+        self.release.wait()
+        self.data += data
+
+    def flush(self):
+        pass
+
+def test_game_is_streamed_as_json_lines():
+    feed = Feed()
+    stream = io.BytesIO()
+    feed.subscribe(stream)
+    recorder = feed.recorder()
+    stats = play_headless(ComputerPlayer(), ComputerPlayer(), recorder=recorder)
+    feed.close()
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    start, *shots, over = events
+    assert start["type"] == "start" and start["size"] == 10
+    # Ships of both players, 10 each
+    assert [len(ships) for ships in start["ships"]] == [10, 10]
+    assert len(shots) == sum(stats.shots)
+    assert all(shot["type"] == "shot" and shot["game"] == start["game"] for shot in shots)
+    assert over == {"type": "game_over", "game": start["game"], "winner": stats.winner}
+
+def test_slow_spectator_never_stalls_the_game():
+    feed = Feed(max_pending=10)
+    slow = SlowStream()
+    subscriber = feed.subscribe(slow)
+    fast = io.BytesIO()
+    feed.subscribe(fast, max_pending=1000)
+    begin = time.perf_counter()
+    for number in range(100):
+        feed.publish({"type": "shot", "game": 0, "number": number})
+    # Publishing did not wait for the slow spectator, which lost the events beyond its queue
+    assert time.perf_counter() - begin < 0.5
+    slow.release.set()
+    feed.close()
+    assert len(fast.getvalue().splitlines()) == 100
+    events = [json.loads(line) for line in slow.data.splitlines()]
+    assert events[-1] == {"type": "dropped", "count": subscriber.dropped}
+    assert subscriber.dropped >= 100 - 11
+    assert len(events) - 1 + subscriber.dropped == 100
+
+def test_spectators_connect_over_tcp():
+    feed = Feed()
+    with SpectatorServer(feed) as server:
+        client = socket.create_connection(server.address)
+        reader = client.makefile("rb")
+        # Wait for the server to subscribe the spectator
+        while not feed.subscribers:
+            time.sleep(0.01)
+        recorder = feed.recorder()
+        stats = play_headless(ComputerPlayer(), ComputerPlayer(), recorder=recorder)
+        lines = [json.loads(reader.readline()) for _ in range(sum(stats.shots) + 2)]
+        assert lines[0]["type"] == "start"
+        assert lines[-1]["type"] == "game_over"
+        client.close()
+        feed.close()
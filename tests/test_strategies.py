@@ -0,0 +1,112 @@
+import pytest
+import random
+from battleship import strategies
+from battleship.board import Board, MISS, HIT, SUNK, REPEAT, INVALID
+from battleship.density import DensityPlayer
+from battleship.game import Game
+from battleship.player import ComputerPlayer
+from battleship.ship import Cruiser
+from battleship.simulation import play_headless, simulate_games
+from battleship.tournament import run_tournament
+
+def test_registry_lookup_and_registration():
+    assert {"human", "computer", "density"} <= set(strategies.names())
+    assert "human" not in strategies.names(interactive=False)
+    assert strategies.get("density") is DensityPlayer
+    with pytest.raises(ValueError):
+        strategies.get("nobody")
+
+    # A new strategy can be registered and used right away by name
+    @strategies.register("first-cell")
+    class FirstCellPlayer(ComputerPlayer):
+        def choose_shot(self):
+            return min(self.untried)
+    try:
+        stats = simulate_games(2, "first-cell", "computer")
+        assert len(stats) == 2
+        assert run_tournament("first-cell", "density", 4, workers=1).games == 4
+        game = Game(computer="first-cell")
+        assert isinstance(game.computer, FirstCellPlayer)
+        with pytest.raises(ValueError):
+            strategies.register("first-cell", ComputerPlayer)
+    finally:
+        strategies._STRATEGIES.pop("first-cell")
+
+def test_fire_at_cell_matches_fire_at():
+    B = Board()
+    B.ships = []
+    B.occupied = {}
+    B.place_ship(Cruiser, (2, 1), "H")
+    # Cell numbers are row * size + column
+    assert B.fire_at_cell(0) == (MISS, 0)
+    assert B.fire_at_cell(0) == (REPEAT, 0)
+    assert B.fire_at_cell(100) == (INVALID, 0)
+    assert B.fire_at_cell(21) == (HIT, 0)
+    assert B.fire_at((2, 2)) == ("Hit", None)
+    assert B.fire_at_cell(23) == (SUNK, 3)
+    assert B.all_ships_sunk()
+    assert B.hits == {(2, 1), (2, 2), (2, 3)}
+
+def test_observe_matches_register_result():
+    # The integer protocol leaves a player in the same state as the string one
+    for player_class in (ComputerPlayer, DensityPlayer):
+        random.seed(5)
+        target = Board()
+        target.place_fleet()
+        lean = player_class(rng=random.Random(1))
+        verbose = player_class(rng=random.Random(1))
+        while not target.all_ships_sunk():
+            cell = lean.choose_cell()
+            assert divmod(cell, 10) == verbose.choose_shot()
+            code, sunk_length = target.fire_at_cell(cell)
+            lean.observe(cell, code, sunk_length)
+            verbose.register_result(divmod(cell, 10), ("Miss", "Hit", "SUNK")[code], sunk_length or None)
+            assert lean.opponent_view == verbose.opponent_view
+            assert lean.counter == verbose.counter
+
+def test_legacy_register_result_override_is_called():
+    # A player written before the integer protocol still learns the results in a headless game
+    class LegacyPlayer(ComputerPlayer):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.results = []
+
+        def register_result(self, coordinates, result, sunk_len=None):
+            self.results.append(result)
+            super().register_result(coordinates, result, sunk_len)
+    random.seed(3)
+    legacy = LegacyPlayer()
+    stats = play_headless(legacy, ComputerPlayer())
+    assert len(legacy.results) == stats.shots[0]
+    assert set(legacy.results) <= {"Miss", "Hit", "Sunk"}
+    view = legacy.opponent_view
+    assert len(view["hits"]) + len(view["misses"]) == stats.shots[0]
+
+def test_off_grid_shot_is_invalid_in_headless_games():
+    # As with Board.fire_at, a shot off the board is invalid, not another cell of the board
+    class OffGridFirst(ComputerPlayer):
+        def choose_shot(self):
+            if not getattr(self, "tried", False):
+                self.tried = True
+                return (0, 10)
+            return super().choose_shot()
+
+    class ListRecorder:
+        def __init__(self):
+            self.shots = []
+
+        def start_game(self, boards=None):
+            pass
+
+        def record(self, shooter, coordinates, result, sunk_length=None):
+            self.shots.append((shooter, coordinates, result))
+    player = OffGridFirst()
+    assert player.choose_cell() == -1
+    assert Board().fire_at_cell(-1) == (INVALID, 0)
+    assert Board().fire_at((0, 10))[0] == "Invalid"
+    recorder = ListRecorder()
+    random.seed(4)
+    stats = play_headless(OffGridFirst(), ComputerPlayer(), recorder=recorder)
+    # The invalid shot counts as a turn but reaches neither the board nor the recorder
+    assert len(recorder.shots) == stats.turns - 1
+    assert recorder.shots[0][0] == 1
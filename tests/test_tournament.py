@@ -0,0 +1,27 @@
+import pytest
+from battleship.tournament import run_tournament, main
+
+def test_tournament_counts_every_game():
+    result = run_tournament("computer", "computer", 30, workers=1, chunk_size=7)
+    assert result.games == 30
+    assert sum(result.wins) == 30
+    # Every win appears exactly once in the histograms
+    assert sum(result.shots_to_win[0].values()) == result.wins[0]
+    assert sum(result.shots_to_win[1].values()) == result.wins[1]
+    assert result.win_rate(0) + result.win_rate(1) == pytest.approx(1.0)
+
+def test_tournament_is_reproducible_across_workers():
+    # The same seed gives the same results, no matter how many processes are used
+    serial = run_tournament("computer", "computer", 40, workers=1, seed=3, chunk_size=10)
+    parallel = run_tournament("computer", "computer", 40, workers=2, seed=3, chunk_size=10)
+    assert serial.wins == parallel.wins
+    assert serial.shots_to_win == parallel.shots_to_win
+
+def test_tournament_rejects_unknown_strategy():
+    with pytest.raises(ValueError):
+        run_tournament("computer", "nobody", 1, workers=1)
+
+def test_tournament_cli_prints_summary(capsys):
+    main(["-n", "4", "-w", "1", "-s", "1"])
+    captured = capsys.readouterr()
+    assert "Games played: 4" in captured.out